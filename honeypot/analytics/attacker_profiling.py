@@ -5,10 +5,11 @@ import os
 from datetime import datetime
 from collections import defaultdict
 
+from analytics.feature_store import AttackerFeatureStore
+from analytics.clustering import GridDBSCAN, PROFILE_NAMES, classify_profile, label_profiles
+
 # These imports would be used in a real implementation
 # In this mock version, we'll implement simplified versions of these algorithms
-# from sklearn.cluster import DBSCAN
-# from sklearn.preprocessing import StandardScaler
 # import matplotlib.pyplot as plt
 # import plotly.express as px
 
@@ -16,14 +17,95 @@ from collections import defaultdict
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def build_profiles(ips, clusters, labels):
+    """
+    Build the cluster membership result from per-attacker categories
+    
+    Args:
+        ips: Attacker IPs in feature row order
+        clusters: Profile category (index into PROFILE_NAMES) of every attacker
+        labels: Behavioural cluster label of every attacker (-1 for noise)
+        
+    Returns:
+        profiles: Dictionary of IP lists per profile plus stats
+    """
+    ips = np.array(ips, dtype=object)
+    total = len(ips)
+    profiles = {name: ips[clusters == index].tolist() for index, name in enumerate(PROFILE_NAMES)}
+    profiles["stats"] = {
+        "total_attackers": total,
+        **{f"{name}_pct": len(profiles[name]) / max(total, 1) * 100 for name in PROFILE_NAMES},
+        "behavioral_clusters": int(labels.max()) + 1 if len(labels) else 0,
+        "noise_attackers": int(np.sum(labels < 0))
+    }
+    return profiles
+
+def render_attacker_entries(items, features, clusters, offset=0):
+    """
+    Render the "attackers" section entries of a profile report
+    
+    Args:
+        items: Iterable of (ip, attacker data) in feature row order
+        features: Feature array
+        clusters: Profile category of every attacker
+        offset: Row of the first item in features/clusters
+        
+    Returns:
+        fragment: Comma-separated '"ip": {...}' JSON members
+    """
+    entries = []
+    for row, (ip, attacker) in enumerate(items, offset):
+        values = features[row]
+        entries.append(json.dumps(ip) + ': ' + json.dumps({
+            "cluster": PROFILE_NAMES[clusters[row]],
+            "features": {
+                "requests_per_minute": float(values[0]),
+                "path_variety": float(values[1]),
+                "error_rate": float(values[2]),
+                "sophistication": float(values[3]),
+                "threat_score": float(values[4])
+            },
+            "attack_types": list(attacker.get('attack_types', [])),
+            "paths": attacker.get('paths', [])[:10],  # Include up to 10 sample paths
+            "first_seen": attacker.get('first_seen', ""),
+            "last_seen": attacker.get('last_seen', ""),
+            "request_count": attacker.get('count', 0)
+        }))
+    return ',\n'.join(entries)
+
+def write_profile_report(path, profiles, chunks):
+    """
+    Stream a profile report to disk without building it in memory
+    
+    Args:
+        path: Report file to write
+        profiles: Result of build_profiles
+        chunks: Iterable of text chunks forming the attacker entries (see
+            render_attacker_entries), written in order
+    """
+    with open(path, 'w') as f:
+        f.write('{\n"timestamp": ' + json.dumps(datetime.now().isoformat()))
+        f.write(',\n"summary": ' + json.dumps(profiles['stats']))
+        f.write(',\n"clusters": {')
+        for index, name in enumerate(PROFILE_NAMES):
+            f.write((',' if index else '') + f'\n"{name}": [')
+            members = profiles[name]
+            for start in range(0, len(members), 10000):
+                f.write((',' if start else '') + ','.join(json.dumps(ip) for ip in members[start:start + 10000]))
+            f.write(']')
+        f.write('\n},\n"attackers": {\n')
+        
+        for chunk in chunks:
+            f.write(chunk)
+        f.write('\n}\n}\n')
+
 class AttackerProfiler:
     def __init__(self):
-        # In a real implementation:
-        # self.scaler = StandardScaler()
-        # self.model = DBSCAN(eps=0.5, min_samples=5)
+        # Density-based clustering on standardized features
+        self.model = GridDBSCAN(eps=0.5, min_samples=5)
         
-        # For mock implementation
         self.clusters = []
+        self.labels = []
         self.profiles = {}
         self.profiling_dir = 'analytics/profiles'
         os.makedirs(self.profiling_dir, exist_ok=True)
@@ -40,58 +122,8 @@ class AttackerProfiler:
         """
         logger.info(f"Extracting features from {len(attacks)} attacks")
         
-        # Calculate features for each attacker
-        features = []
-        for attacker in attacks:
-            # Basic features
-            request_count = attacker.get('count', 0)
-            distinct_paths = len(set(attacker.get('paths', [])))
-            path_variety = distinct_paths / max(request_count, 1)  # Normalize by request count
-            
-            # Calculate error rate (% of 4xx/5xx responses if status codes available)
-            error_count = sum(1 for path in attacker.get('status_codes', {}).values() 
-                             if path >= 400)
-            error_rate = error_count / max(request_count, 1)
-            
-            # Calculate time-based features
-            if 'first_seen' in attacker and 'last_seen' in attacker:
-                try:
-                    first_seen = datetime.fromisoformat(attacker['first_seen'])
-                    last_seen = datetime.fromisoformat(attacker['last_seen'])
-                    duration_seconds = (last_seen - first_seen).total_seconds()
-                    requests_per_minute = (request_count / max(duration_seconds, 60)) * 60
-                except (ValueError, TypeError):
-                    requests_per_minute = 0
-            else:
-                requests_per_minute = 0
-            
-            # Attack sophistication score based on attack types
-            attack_types = attacker.get('attack_types', [])
-            sophistication_score = 0
-            if 'SQL Injection' in attack_types:
-                sophistication_score += 0.7
-            if 'Command Injection' in attack_types:
-                sophistication_score += 0.8
-            if 'Path Traversal' in attack_types:
-                sophistication_score += 0.6
-            if 'Scanner' in attack_types:
-                sophistication_score += 0.4
-                
-            # Normalize sophistication score to [0,1]
-            sophistication_score = min(sophistication_score, 1.0)
-            
-            # Create feature vector
-            feature_vector = [
-                requests_per_minute,
-                path_variety,
-                error_rate,
-                sophistication_score,
-                attacker.get('threat_score', 0)
-            ]
-            
-            features.append(feature_vector)
-        
-        return np.array(features)
+        # Build the columnar representation once and compute all features vectorized
+        return AttackerFeatureStore.from_attackers(attacks).feature_matrix()
     
     def _mock_clustering(self, features):
         """
@@ -104,154 +136,81 @@ class AttackerProfiler:
             clusters: Cluster labels for each attacker
         """
         # Very simple mock clustering - just divide into 3 groups based on threat score
-        # In a real implementation, use DBSCAN or another clustering algorithm
-        n_samples = features.shape[0]
-        
-        # Use the threat score (features[:, 4]) to divide into groups
-        clusters = np.zeros(n_samples, dtype=int)
+        # Kept as the baseline for benchmarks/clustering_benchmark.py
+        return classify_profile(features[:, 4], features[:, 3])
+    
+    def _cluster(self, features):
+        """
+        Cluster attackers by behaviour and name each cluster by its centroid
         
-        for i in range(n_samples):
-            threat_score = features[i, 4]
-            sophistication = features[i, 3]
+        Args:
+            features: Feature array for clustering
             
-            if threat_score > 0.7 and sophistication > 0.7:
-                # Advanced attacker
-                clusters[i] = 2
-            elif threat_score > 0.4 or sophistication > 0.5:
-                # Intermediate attacker
-                clusters[i] = 1
-            else:
-                # Basic attacker / scanner
-                clusters[i] = 0
-        
-        return clusters
+        Returns:
+            clusters: Profile category (index into PROFILE_NAMES) for each attacker
+        """
+        self.labels = self.model.fit_predict(features)
+        return label_profiles(features, self.labels)
     
-    def analyze_attackers(self, attackers):
+    def analyze_attackers(self, attackers, feature_store=None):
         """
         Analyze attackers to identify clusters and behaviors
         
         Args:
             attackers: Dictionary of attacker profiles
+            feature_store: Optional AttackerFeatureStore kept up to date by the
+                AttackDetector; features are read from it instead of recomputed
             
         Returns:
             profiles: Dictionary with attacker profiles
         """
         logger.info(f"Analyzing {len(attackers)} attackers")
         
-        # Convert to list for processing
-        attacker_list = []
-        for ip, data in attackers.items():
-            attacker_data = data.copy()
-            attacker_data['ip'] = ip
-            attacker_list.append(attacker_data)
-        
-        # Extract features for clustering
-        features = self._extract_features(attacker_list)
+        ips = list(attackers)
         
         # Skip clustering if too few samples
-        if len(attacker_list) < 3:
+        if len(ips) < 3:
             logger.warning("Too few attackers for meaningful clustering")
             return {
-                "script_kiddies": [a['ip'] for a in attacker_list if a.get('threat_score', 0) <= 0.4],
-                "advanced_attackers": [a['ip'] for a in attacker_list if a.get('threat_score', 0) > 0.7],
-                "opportunistic": [a['ip'] for a in attacker_list if 0.4 < a.get('threat_score', 0) <= 0.7]
+                "script_kiddies": [ip for ip, a in attackers.items() if a.get('threat_score', 0) <= 0.4],
+                "advanced_attackers": [ip for ip, a in attackers.items() if a.get('threat_score', 0) > 0.7],
+                "opportunistic": [ip for ip, a in attackers.items() if 0.4 < a.get('threat_score', 0) <= 0.7]
             }
         
-        # Perform clustering (mock implementation)
-        clusters = self._mock_clustering(features)
-        self.clusters = clusters
-        
-        # Generate profiles for each cluster
-        script_kiddies = []
-        opportunistic = []
-        advanced_attackers = []
+        # Extract features for clustering
+        if feature_store is not None:
+            features = feature_store.features_for(ips)
+        else:
+            features = self._extract_features(attackers)
         
-        for i, (attacker, cluster) in enumerate(zip(attacker_list, clusters)):
-            if cluster == 0:
-                script_kiddies.append(attacker['ip'])
-            elif cluster == 1:
-                opportunistic.append(attacker['ip'])
-            elif cluster == 2:
-                advanced_attackers.append(attacker['ip'])
+        # Perform density-based clustering
+        clusters = self._cluster(features)
+        self.clusters = clusters
         
-        # Create profile results
-        profiles = {
-            "script_kiddies": script_kiddies,
-            "opportunistic": opportunistic,
-            "advanced_attackers": advanced_attackers,
-            "stats": {
-                "total_attackers": len(attacker_list),
-                "script_kiddies_pct": len(script_kiddies) / max(len(attacker_list), 1) * 100,
-                "opportunistic_pct": len(opportunistic) / max(len(attacker_list), 1) * 100,
-                "advanced_attackers_pct": len(advanced_attackers) / max(len(attacker_list), 1) * 100
-            }
-        }
+        profiles = build_profiles(ips, clusters, self.labels)
         
         # Save the analysis
-        self._save_profiles(profiles, attacker_list, features)
+        self._save_profiles(profiles, attackers, features, clusters)
         
         self.profiles = profiles
         return profiles
     
-    def _save_profiles(self, profiles, attackers, features):
+    def _save_profiles(self, profiles, attackers, features, clusters):
         """
         Save attacker profiles to file
         
         Args:
             profiles: Dictionary of profiles
-            attackers: List of attacker data
+            attackers: Dictionary of attacker data, in feature row order
             features: Feature array
+            clusters: Profile category of every attacker
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = f'{self.profiling_dir}/attacker_profiles_{timestamp}.json'
         
-        # Create detailed profile with feature data
-        detailed_profiles = {
-            "timestamp": datetime.now().isoformat(),
-            "summary": profiles['stats'],
-            "clusters": {
-                "script_kiddies": profiles['script_kiddies'],
-                "opportunistic": profiles['opportunistic'],
-                "advanced_attackers": profiles['advanced_attackers']
-            },
-            "attackers": {}
-        }
-        
-        # Add detailed attacker data
-        for i, attacker in enumerate(attackers):
-            ip = attacker['ip']
+        write_profile_report(path, profiles, [render_attacker_entries(attackers.items(), features, clusters)])
             
-            # Find which cluster this IP belongs to
-            if ip in profiles['script_kiddies']:
-                cluster = "script_kiddies"
-            elif ip in profiles['opportunistic']:
-                cluster = "opportunistic"
-            elif ip in profiles['advanced_attackers']:
-                cluster = "advanced_attackers"
-            else:
-                cluster = "unknown"
-            
-            # Create attacker profile with features
-            detailed_profiles['attackers'][ip] = {
-                "cluster": cluster,
-                "features": {
-                    "requests_per_minute": float(features[i, 0]),
-                    "path_variety": float(features[i, 1]),
-                    "error_rate": float(features[i, 2]),
-                    "sophistication": float(features[i, 3]),
-                    "threat_score": float(features[i, 4])
-                },
-                "attack_types": list(attacker.get('attack_types', [])),
-                "paths": attacker.get('paths', [])[:10],  # Include up to 10 sample paths
-                "first_seen": attacker.get('first_seen', ""),
-                "last_seen": attacker.get('last_seen', ""),
-                "request_count": attacker.get('count', 0)
-            }
-        
-        # Save to file
-        with open(f'{self.profiling_dir}/attacker_profiles_{timestamp}.json', 'w') as f:
-            json.dump(detailed_profiles, f, indent=2)
-            
-        logger.info(f"Saved attacker profiles to {self.profiling_dir}/attacker_profiles_{timestamp}.json")
+        logger.info(f"Saved attacker profiles to {path}")
     
     def plot_clusters_3d(self, attackers=None):
         """
@@ -301,18 +260,27 @@ class AttackerProfiler:
             
         return plot_data
     
-    def generate_attack_timeline(self, attackers):
+    def generate_attack_timeline(self, attackers, timeline_store=None, start=None, end=None, limit=10000):
         """
         Generate a timeline of attack events
         
         Args:
             attackers: Dictionary of attacker profiles
+            timeline_store: Optional TimelineStore; when given, the recorded
+                events in [start, end] are returned instead of events derived
+                from the aggregated profiles
+            start: Range start for the timeline store (epoch or ISO string)
+            end: Range end for the timeline store (epoch or ISO string)
+            limit: Maximum number of events read from the timeline store
             
         Returns:
             timeline: List of timeline events
         """
         logger.info("Generating attack timeline")
         
+        if timeline_store is not None:
+            return timeline_store.query(start=start, end=end, limit=limit)["events"]
+        
         timeline = []
         
         # Process each attacker
@@ -0,0 +1,277 @@
+import itertools
+import logging
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Profile categories, indexed by the values returned from classify_profile
+PROFILE_NAMES = ["script_kiddies", "opportunistic", "advanced_attackers"]
+
+# Feature columns used to name clusters (see analytics.feature_store.FEATURE_NAMES)
+SOPHISTICATION_COLUMN = 3
+THREAT_SCORE_COLUMN = 4
+
+def classify_profile(threat_score, sophistication):
+    """
+    Map threat score / sophistication values to profile category indices
+
+    Args:
+        threat_score: Array of threat scores
+        sophistication: Array of sophistication scores
+
+    Returns:
+        categories: Array of indices into PROFILE_NAMES
+    """
+    threat_score = np.asarray(threat_score)
+    sophistication = np.asarray(sophistication)
+    return np.select(
+        [(threat_score > 0.7) & (sophistication > 0.7), (threat_score > 0.4) | (sophistication > 0.5)],
+        [2, 1],
+        default=0
+    )
+
+def standardize(features):
+    """Scale every column to zero mean and unit variance (constant columns are only centred)"""
+    mean = features.mean(axis=0)
+    std = features.std(axis=0)
+    std[std == 0] = 1.0
+    return (features - mean) / std
+
+class GridDBSCAN:
+    """
+    Density-based clustering on a hashed grid, implemented on NumPy
+
+    Features are standardized and identical rows are merged into weighted
+    points. A coarse grid of side eps limits every range query to the 3^d
+    neighbouring cells, distances are computed block-wise per cell pair in
+    bounded chunks, and core points are joined with a vectorized union-find.
+
+    When the number of candidate pairs would exceed max_pairs, points are
+    first snapped to a fine grid of side eps/q and every occupied fine cell
+    becomes one weighted point at the centroid of its members, trying each q
+    in quantization_levels in turn. This bounds the work in dense regions at
+    the cost of accuracy; data small or discrete enough is clustered exactly.
+
+    Args:
+        eps: Neighbourhood radius in standardized feature space
+        min_samples: Minimum neighbourhood weight (including the point) for a core point
+        quantization_levels: Fine grid cells per eps to fall back to, finest first
+        max_pairs: Candidate pair budget that selects the quantization level
+        chunk_size: Maximum number of point pairs evaluated at once
+    """
+    def __init__(self, eps=0.5, min_samples=5, quantization_levels=(8, 4, 2, 1),
+                 max_pairs=20_000_000, chunk_size=65_536):
+        self.eps = eps
+        self.min_samples = min_samples
+        self.quantization_levels = quantization_levels
+        self.max_pairs = max_pairs
+        self.chunk_size = chunk_size
+        # Quantization used by the last fit (None when clustered exactly)
+        self.quantization = None
+
+    def fit_predict(self, features):
+        """
+        Cluster the feature matrix
+
+        Args:
+            features: Array of shape (n, d)
+
+        Returns:
+            labels: Cluster label per row, -1 for noise
+        """
+        features = np.asarray(features, dtype=np.float64)
+        if len(features) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        scaled = standardize(features)
+        cell_of, pairs = self._coarse_cells(scaled)
+        n_cells = int(cell_of.max()) + 1
+
+        # Use the finest representation whose candidate pairs fit the budget
+        for quantization in (None,) + tuple(self.quantization_levels):
+            atom_keys = self._atom_keys(scaled, cell_of, quantization)
+            if atom_keys is None:
+                continue
+            keys, inverse = np.unique(atom_keys, return_inverse=True)
+            atom_cells = np.empty(len(keys), dtype=np.int64)
+            atom_cells[inverse] = cell_of
+            counts = np.bincount(atom_cells, minlength=n_cells)
+            work = int(np.sum(counts[pairs[:, 0]] * counts[pairs[:, 1]]))
+            if work <= self.max_pairs:
+                break
+        self.quantization = quantization
+
+        weights = np.bincount(inverse).astype(np.float64)
+        points = np.empty((len(weights), scaled.shape[1]))
+        for dim in range(scaled.shape[1]):
+            points[:, dim] = np.bincount(inverse, weights=scaled[:, dim]) / weights
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+        logger.info(f"Clustering {len(features)} rows as {len(points)} weighted points "
+                    f"(quantization={quantization}, candidate pairs={work})")
+
+        # Pass 1: weighted neighbourhood size of every point
+        neighbours = np.zeros(len(points))
+        for i, j, same_cell in self._within_eps(points, starts, counts, pairs):
+            neighbours += np.bincount(i, weights=weights[j], minlength=len(points))
+            neighbours += np.bincount(j[~same_cell], weights=weights[i[~same_cell]], minlength=len(points))
+        core = neighbours >= self.min_samples
+
+        # Pass 2: join core points and attach border points to a core neighbour
+        parent = np.arange(len(points))
+        border = np.full(len(points), -1)
+        for i, j, _ in self._within_eps(points, starts, counts, pairs):
+            both = core[i] & core[j]
+            self._union(parent, i[both], j[both])
+            attach = core[i] & ~core[j]
+            border[j[attach]] = i[attach]
+            attach = core[j] & ~core[i]
+            border[i[attach]] = j[attach]
+
+        self._compress(parent)
+        roots = np.where(core, parent, -1)
+        has_core = border >= 0
+        roots[has_core & ~core] = parent[border[has_core & ~core]]
+
+        labels = np.full(len(points), -1, dtype=np.int64)
+        clustered = roots >= 0
+        labels[clustered] = np.unique(roots[clustered], return_inverse=True)[1]
+
+        return labels[inverse]
+
+    def _coarse_cells(self, scaled):
+        """
+        Hash rows into coarse cells of side eps and find adjacent cell pairs
+
+        Returns:
+            cell_of: Cell index of every row, cells numbered in key order
+            pairs: Array of (cell, neighbour cell) index pairs with cell <= neighbour
+        """
+        d = scaled.shape[1]
+        coords = np.floor(scaled / self.eps).astype(np.int64)
+        coords -= coords.min(axis=0) - 1    # keep a one-cell margin for the offsets
+
+        # Pack coordinates into one key; if the extent does not fit, clip each
+        # dimension. Clipping only merges far-away cells, which costs distance
+        # computations but never loses a neighbour.
+        extent = coords.max(axis=0) + 2
+        if np.sum(np.log2(extent.astype(np.float64))) >= 62:
+            limit = (1 << (62 // d)) - 2
+            coords = np.minimum(coords, limit)
+            extent = np.minimum(extent, limit + 2)
+        strides = np.cumprod(np.concatenate([[1], extent[:-1]]))
+        cell_keys, cell_of = np.unique(coords @ strides, return_inverse=True)
+
+        pairs = []
+        cell_index = np.arange(len(cell_keys))
+        for offset in itertools.product((-1, 0, 1), repeat=d):
+            target = cell_keys + np.dot(offset, strides)
+            pos = np.minimum(np.searchsorted(cell_keys, target), len(cell_keys) - 1)
+            hit = cell_keys[pos] == target
+            pairs.append(np.column_stack([cell_index[hit], pos[hit]]))
+
+        # Every cell pair is visited once; the block of a cell with itself
+        # already holds both orderings of each point pair
+        pairs = np.concatenate(pairs)
+        return cell_of.reshape(-1), pairs[pairs[:, 0] <= pairs[:, 1]]
+
+    def _atom_keys(self, scaled, cell_of, quantization):
+        """
+        Key every row by (cell, atom) so rows sharing a key are merged
+
+        Without quantization an atom is a distinct row; with quantization q it
+        is a fine grid cell of side eps/q. Returns None if the keys would not
+        fit in 64 bits.
+        """
+        if quantization is None:
+            _, row_ids = np.unique(scaled, axis=0, return_inverse=True)
+            return cell_of * (int(row_ids.max()) + 1) + row_ids.reshape(-1)
+
+        d = scaled.shape[1]
+        if np.log2(len(cell_of) + 1) + d * np.log2(quantization) >= 62:
+            return None
+        fine = np.floor((scaled / self.eps - np.floor(scaled / self.eps)) * quantization).astype(np.int64)
+        fine = np.clip(fine, 0, quantization - 1)
+        code = fine @ (quantization ** np.arange(d, dtype=np.int64))
+        return cell_of * quantization ** d + code
+
+    def _within_eps(self, points, starts, counts, pairs):
+        """Yield (i, j, same_cell) arrays of point pairs within eps, in bounded chunks"""
+        eps2 = self.eps * self.eps
+        columns = [np.ascontiguousarray(points[:, dim]) for dim in range(points.shape[1])]
+        sizes = counts[pairs[:, 0]] * counts[pairs[:, 1]]
+        ends = np.cumsum(sizes)
+
+        first = 0
+        while first < len(pairs):
+            # Take cell pairs until the chunk is full (at least one pair per chunk)
+            base = ends[first] - sizes[first]
+            last = max(int(np.searchsorted(ends, base + self.chunk_size, side='right')), first + 1)
+            chunk = pairs[first:last]
+            chunk_sizes = sizes[first:last]
+
+            # Enumerate the block of point pairs of every cell pair
+            k = np.arange(int(chunk_sizes.sum())) - np.repeat(ends[first:last] - chunk_sizes - base, chunk_sizes)
+            width = np.repeat(counts[chunk[:, 1]], chunk_sizes)
+            row = k // width
+            i = np.repeat(starts[chunk[:, 0]], chunk_sizes) + row
+            j = np.repeat(starts[chunk[:, 1]], chunk_sizes) + (k - row * width)
+
+            distance = np.zeros(len(k))
+            for column in columns:
+                diff = column[i] - column[j]
+                distance += diff * diff
+            within = distance <= eps2
+            same_cell = np.repeat(chunk[:, 0] == chunk[:, 1], chunk_sizes)
+            yield i[within], j[within], same_cell[within]
+            first = last
+
+    @staticmethod
+    def _compress(parent):
+        """Point every node directly at its root"""
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                return
+            parent[:] = grandparent
+
+    @classmethod
+    def _union(cls, parent, i, j):
+        """Merge the components of every (i, j) edge, hooking larger roots onto smaller ones"""
+        while len(i):
+            cls._compress(parent)
+            root_i, root_j = parent[i], parent[j]
+            differ = root_i != root_j
+            if not differ.any():
+                return
+            i, j = i[differ], j[differ]
+            root_i, root_j = root_i[differ], root_j[differ]
+            np.minimum.at(parent, np.maximum(root_i, root_j), np.minimum(root_i, root_j))
+
+def label_profiles(features, labels):
+    """
+    Name clusters after the profile of their centroid
+
+    Each cluster is assigned the category of its mean threat score and
+    sophistication; noise points are categorized individually.
+
+    Args:
+        features: Unscaled feature matrix (see analytics.feature_store.FEATURE_NAMES)
+        labels: Cluster labels from GridDBSCAN.fit_predict
+
+    Returns:
+        categories: Index into PROFILE_NAMES for every row
+    """
+    threat = features[:, THREAT_SCORE_COLUMN]
+    sophistication = features[:, SOPHISTICATION_COLUMN]
+    categories = classify_profile(threat, sophistication)
+
+    clustered = labels >= 0
+    if clustered.any():
+        sizes = np.bincount(labels[clustered])
+        mean_threat = np.bincount(labels[clustered], weights=threat[clustered]) / sizes
+        mean_sophistication = np.bincount(labels[clustered], weights=sophistication[clustered]) / sizes
+        categories[clustered] = classify_profile(mean_threat, mean_sophistication)[labels[clustered]]
+    return categories
@@ -0,0 +1,197 @@
+import time
+import logging
+import threading
+from datetime import datetime
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Attack types contributing to the sophistication score, as (bit, weight)
+SOPHISTICATION_BITS = {
+    'SQL Injection': (1, 0.7),
+    'Command Injection': (2, 0.8),
+    'Path Traversal': (4, 0.6),
+    'Scanner': (8, 0.4)
+}
+
+# Sophistication score for every bitmask, capped at 1.0
+SOPHISTICATION_LUT = np.array([
+    min(sum(weight for bit, weight in SOPHISTICATION_BITS.values() if mask & bit), 1.0)
+    for mask in range(16)
+])
+
+FEATURE_NAMES = [
+    "requests_per_minute",
+    "path_variety",
+    "error_rate",
+    "sophistication",
+    "threat_score"
+]
+
+def sophistication_mask(attack_types):
+    """Bitmask of the sophistication-relevant attack types"""
+    mask = 0
+    for attack_type in attack_types:
+        if attack_type in SOPHISTICATION_BITS:
+            mask |= SOPHISTICATION_BITS[attack_type][0]
+    return mask
+
+class AttackerFeatureStore:
+    """
+    Columnar, incrementally updated attacker metrics
+
+    Each attacker owns one row in a set of NumPy arrays (request count,
+    distinct paths, errors, first/last seen as epoch seconds, sophistication
+    bitmask, threat score). Rows are updated in place as requests arrive, so
+    building the feature matrix is a few vectorized operations.
+    """
+    def __init__(self, capacity=1024):
+        self.index = {}            # ip -> row
+        self.ips = []              # row -> ip
+        self.seen_paths = []       # row -> set of path hashes
+        self.lock = threading.Lock()
+
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.distinct_paths = np.zeros(capacity, dtype=np.int64)
+        self.error_count = np.zeros(capacity, dtype=np.int64)
+        self.first_seen = np.full(capacity, np.nan)
+        self.last_seen = np.full(capacity, np.nan)
+        self.sophistication = np.zeros(capacity, dtype=np.uint8)
+        self.threat_score = np.zeros(capacity, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.ips)
+
+    def _grow(self):
+        """Double the capacity of every column"""
+        for name in ('count', 'distinct_paths', 'error_count', 'sophistication', 'threat_score'):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.zeros_like(column)]))
+        for name in ('first_seen', 'last_seen'):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.full_like(column, np.nan)]))
+
+    def _row(self, ip):
+        """Get the row for an IP, allocating one if needed (caller holds the lock)"""
+        row = self.index.get(ip)
+        if row is None:
+            row = len(self.ips)
+            if row >= len(self.count):
+                self._grow()
+            self.index[ip] = row
+            self.ips.append(ip)
+            self.seen_paths.append(set())
+        return row
+
+    def update(self, ip, log_entry, threat_score=None, timestamp=None):
+        """
+        Update an attacker's row from an analyzed request
+
+        Args:
+            ip: Attacker IP
+            log_entry: Log entry produced by AttackDetector.analyze_request
+            threat_score: The attacker's current aggregate threat score
+            timestamp: Epoch time of the request (defaults to now)
+        """
+        timestamp = timestamp or time.time()
+        with self.lock:
+            row = self._row(ip)
+            self.count[row] += 1
+
+            path_hash = hash(log_entry.get("path", ""))
+            paths = self.seen_paths[row]
+            if path_hash not in paths:
+                paths.add(path_hash)
+                self.distinct_paths[row] += 1
+
+            if np.isnan(self.first_seen[row]):
+                self.first_seen[row] = timestamp
+            self.last_seen[row] = timestamp
+
+            self.sophistication[row] |= sophistication_mask(log_entry.get("attack_types", []))
+            if threat_score is not None:
+                self.threat_score[row] = threat_score
+
+    def record_status(self, ip, status_code):
+        """Count an error response for a known attacker"""
+        if status_code < 400:
+            return
+        with self.lock:
+            row = self.index.get(ip)
+            if row is not None:
+                self.error_count[row] += 1
+
+    @classmethod
+    def from_attackers(cls, attackers):
+        """
+        Build a store from attacker profile dictionaries
+
+        Args:
+            attackers: Dictionary of ip -> profile, or list of profiles with an 'ip' key
+        """
+        items = attackers.items() if isinstance(attackers, dict) else \
+            ((attacker.get('ip'), attacker) for attacker in attackers)
+
+        store = cls(capacity=max(len(attackers), 1))
+        for ip, attacker in items:
+            row = store._row(ip)
+            store.count[row] = attacker.get('count', 0)
+            store.distinct_paths[row] = len(set(attacker.get('paths', [])))
+            store.error_count[row] = sum(
+                1 for status in attacker.get('status_codes', {}).values() if status >= 400
+            )
+            if 'first_seen' in attacker and 'last_seen' in attacker:
+                try:
+                    store.first_seen[row] = datetime.fromisoformat(attacker['first_seen']).timestamp()
+                    store.last_seen[row] = datetime.fromisoformat(attacker['last_seen']).timestamp()
+                except (ValueError, TypeError):
+                    store.first_seen[row] = store.last_seen[row] = np.nan
+            store.sophistication[row] = sophistication_mask(attacker.get('attack_types', []))
+            store.threat_score[row] = attacker.get('threat_score', 0)
+        return store
+
+    def feature_matrix(self, rows=None):
+        """
+        Compute the clustering feature matrix
+
+        Args:
+            rows: Optional array of row numbers to compute (defaults to all rows)
+
+        Returns:
+            features: Array of shape (n, 5) with columns in FEATURE_NAMES order
+        """
+        with self.lock:
+            n = len(self.ips)
+            if rows is None:
+                rows = slice(0, n)
+            count = self.count[rows].astype(np.float64)
+            distinct_paths = self.distinct_paths[rows]
+            error_count = self.error_count[rows]
+            first_seen = self.first_seen[rows]
+            last_seen = self.last_seen[rows]
+            sophistication = self.sophistication[rows]
+            threat_score = self.threat_score[rows].copy()
+
+        requests = np.maximum(count, 1)
+        duration = last_seen - first_seen
+        has_times = ~np.isnan(duration)
+        requests_per_minute = np.where(
+            has_times,
+            count / np.maximum(np.nan_to_num(duration), 60) * 60,
+            0.0
+        )
+
+        return np.column_stack([
+            requests_per_minute,
+            distinct_paths / requests,
+            error_count / requests,
+            SOPHISTICATION_LUT[sophistication & 0xF],
+            threat_score
+        ])
+
+    def features_for(self, ips):
+        """Feature matrix rows for the given IPs, in order"""
+        rows = np.fromiter((self.index[ip] for ip in ips), dtype=np.int64, count=len(ips))
+        return self.feature_matrix(rows)
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+from analytics.feature_store import AttackerFeatureStore, FEATURE_NAMES
+from analytics.clustering import GridDBSCAN, label_profiles
+from analytics.attacker_profiling import build_profiles, render_attacker_entries, write_profile_report
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _attach(name, shape, dtype):
+    """Attach to a shared memory array created by the job runner"""
+    # Pool workers share the runner's resource tracker; the runner unlinks the segment
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def _extract_shard(features_name, shape, start, items):
+    """Worker: compute the feature rows of one shard into shared memory"""
+    shm, features = _attach(features_name, shape, np.float64)
+    try:
+        features[start:start + len(items)] = AttackerFeatureStore.from_attackers(dict(items)).feature_matrix()
+    finally:
+        del features
+        shm.close()
+    return len(items)
+
+def _render_shard(features_name, categories_name, shape, start, items, part_path):
+    """Worker: render the report entries of one shard to a part file"""
+    features_shm, features = _attach(features_name, shape, np.float64)
+    categories_shm, categories = _attach(categories_name, (shape[0],), np.int64)
+    try:
+        fragment = render_attacker_entries(items, features, categories, offset=start)
+        with open(part_path, 'w') as f:
+            # Every shard is non-empty, so all but the first need a separator
+            f.write((',\n' if start else '') + fragment)
+    finally:
+        del features, categories
+        features_shm.close()
+        categories_shm.close()
+    return part_path
+
+def _read_parts(part_paths, chunk_size=1 << 20):
+    """Yield the part files' contents in order, one chunk at a time"""
+    for part_path in part_paths:
+        with open(part_path, 'r') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+class ProfilingJob:
+    """
+    Batch attacker profiling across a process pool
+
+    Attackers are split into shards; workers compute feature rows straight
+    into a shared-memory NumPy matrix, the runner clusters the whole matrix,
+    and workers render the report entries of their shard to part files that
+    are streamed into the final report.
+
+    Args:
+        workers: Number of worker processes (defaults to the CPU count)
+        shard_size: Attackers per task
+        profiling_dir: Directory the reports are written to
+        model: Clustering model (defaults to GridDBSCAN(eps=0.5, min_samples=5))
+    """
+    def __init__(self, workers=None, shard_size=50000, profiling_dir='analytics/profiles', model=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.profiling_dir = profiling_dir
+        self.model = model or GridDBSCAN(eps=0.5, min_samples=5)
+        os.makedirs(profiling_dir, exist_ok=True)
+
+    def run(self, attackers):
+        """
+        Profile every attacker and write the report
+
+        Args:
+            attackers: Dictionary of attacker profiles
+
+        Returns:
+            profiles: Dictionary with attacker profiles (see AttackerProfiler.analyze_attackers)
+        """
+        items = list(attackers.items())
+        ips = [ip for ip, _ in items]
+        shape = (len(items), len(FEATURE_NAMES))
+        shards = [(start, items[start:start + self.shard_size]) for start in range(0, len(items), self.shard_size)]
+        logger.info(f"Profiling {len(items)} attackers in {len(shards)} shards on {self.workers} workers")
+
+        features_shm = shared_memory.SharedMemory(create=True, size=max(shape[0] * shape[1] * 8, 1))
+        categories_shm = shared_memory.SharedMemory(create=True, size=max(shape[0] * 8, 1))
+        features = np.ndarray(shape, dtype=np.float64, buffer=features_shm.buf)
+        categories = np.ndarray((shape[0],), dtype=np.int64, buffer=categories_shm.buf)
+        part_dir = tempfile.mkdtemp(prefix='profiling_', dir=self.profiling_dir)
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                started = time.time()
+                futures = [
+                    pool.submit(_extract_shard, features_shm.name, shape, start, shard)
+                    for start, shard in shards
+                ]
+                for future in futures:
+                    future.result()
+                logger.info(f"Extracted features in {time.time() - started:.1f}s")
+
+                started = time.time()
+                labels = self.model.fit_predict(features)
+                categories[:] = label_profiles(features, labels)
+                logger.info(f"Clustered in {time.time() - started:.1f}s")
+
+                started = time.time()
+                futures = [
+                    pool.submit(
+                        _render_shard, features_shm.name, categories_shm.name, shape, start, shard,
+                        os.path.join(part_dir, f'part_{index:05d}.json')
+                    )
+                    for index, (start, shard) in enumerate(shards)
+                ]
+                part_paths = [future.result() for future in futures]
+                logger.info(f"Rendered report entries in {time.time() - started:.1f}s")
+
+            profiles = build_profiles(ips, categories, labels)
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = f'{self.profiling_dir}/attacker_profiles_{timestamp}.json'
+            write_profile_report(path, profiles, _read_parts(part_paths))
+            logger.info(f"Saved attacker profiles to {path}")
+        finally:
+            del features, categories
+            for shm in (features_shm, categories_shm):
+                shm.close()
+                shm.unlink()
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+        return profiles
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a batch attacker profiling job")
+    parser.add_argument('--input', default='analytics/attacker_profiles.json',
+                        help="Attacker profiles saved by AttackDetector")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes")
+    parser.add_argument('--shard-size', type=int, default=50000, help="Attackers per task")
+    args = parser.parse_args()
+
+    with open(args.input, 'r') as f:
+        attackers = json.load(f)
+
+    profiles = ProfilingJob(workers=args.workers, shard_size=args.shard_size).run(attackers)
+    print(json.dumps(profiles['stats'], indent=2))
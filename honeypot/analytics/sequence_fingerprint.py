@@ -0,0 +1,266 @@
+import re
+import hashlib
+import itertools
+import logging
+import threading
+from collections import deque, defaultdict
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Path parts that vary between runs of the same tool
+HEX_ID = re.compile(r'\b[0-9a-fA-F]{8,}\b')
+NUMBER = re.compile(r'\d+')
+
+def normalize_request(method, path):
+    """Reduce a request to a token that is stable across targets and runs"""
+    path = path.split('?', 1)[0].lower()
+    path = NUMBER.sub('N', HEX_ID.sub('H', path))
+    return f"{(method or 'GET').upper()} {path}"
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+class AttackerSequence:
+    """Incremental MinHash state of one attacker's request sequence"""
+    __slots__ = ('recent', 'signature', 'shingles', 'band_keys', 'sample')
+
+    def __init__(self, ngram, num_perm):
+        self.recent = deque(maxlen=ngram)
+        self.signature = np.full(num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        self.shingles = 0
+        self.band_keys = None
+        self.sample = []
+
+class SequenceFingerprinter:
+    """
+    Behavioural fingerprints of attackers' request sequences
+
+    Each request is normalized to "METHOD /path" (numbers and hex ids
+    collapsed) and every run of ngram consecutive requests forms a shingle.
+    Attackers are summarized by a MinHash signature over their shingles,
+    updated incrementally per request, and indexed with LSH banding so
+    attackers running the same tool or playbook from different IPs are found
+    without comparing against every attacker. Attackers whose estimated
+    similarity exceeds the threshold are merged into the same campaign.
+
+    Args:
+        ngram: Requests per shingle
+        num_perm: MinHash signature length
+        bands: LSH bands (num_perm must be divisible by bands)
+        similarity_threshold: Estimated Jaccard similarity joining a campaign
+        min_shingles: Shingles an attacker needs before being indexed
+        max_candidates: Candidates compared per signature change
+    """
+    def __init__(self, ngram=3, num_perm=64, bands=16, similarity_threshold=0.6,
+                 min_shingles=3, max_candidates=50, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.ngram = ngram
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.similarity_threshold = similarity_threshold
+        self.min_shingles = min_shingles
+        self.max_candidates = max_candidates
+
+        # Multiply-shift hash family: h_i(x) = (a_i * x + b_i) mod 2^64 >> 32, a_i odd
+        rng = np.random.default_rng(seed)
+        self.perm_a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.perm_b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+        self.sequences = {}                                        # ip -> AttackerSequence
+        self.buckets = [defaultdict(set) for _ in range(bands)]   # band -> key -> ips
+        self.parent = {}                                           # campaign union-find
+        self.sizes = {}                                            # campaign root -> members
+        self.lock = threading.Lock()
+
+    def _permute(self, shingle):
+        with np.errstate(over='ignore'):
+            return ((self.perm_a * np.uint64(_hash64(shingle)) + self.perm_b) >> np.uint64(32)).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        return [hash(signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def observe(self, ip, method, path):
+        """
+        Add a request to an attacker's fingerprint
+
+        Returns:
+            campaign: The attacker's campaign id, or None while not yet indexed
+        """
+        token = normalize_request(method, path)
+        with self.lock:
+            sequence = self.sequences.get(ip)
+            if sequence is None:
+                sequence = self.sequences[ip] = AttackerSequence(self.ngram, self.num_perm)
+            sequence.recent.append(token)
+            if len(sequence.sample) < 20:
+                sequence.sample.append(token)
+            if len(sequence.recent) < self.ngram:
+                return None
+
+            sequence.shingles += 1
+            updated = np.minimum(sequence.signature, self._permute('\x1f'.join(sequence.recent)))
+            changed = not np.array_equal(updated, sequence.signature)
+            sequence.signature = updated
+
+            if sequence.shingles < self.min_shingles:
+                return None
+            if changed or sequence.band_keys is None:
+                self._reindex(ip, sequence)
+            return self._find(ip)
+
+    def _reindex(self, ip, sequence):
+        """Move an attacker to its new LSH buckets and join similar campaigns (caller holds the lock)"""
+        keys = self._band_keys(sequence.signature)
+        old_keys = sequence.band_keys or [None] * self.bands
+        for band, (old, new) in enumerate(zip(old_keys, keys)):
+            if old == new:
+                continue
+            if old is not None:
+                bucket = self.buckets[band][old]
+                bucket.discard(ip)
+                if not bucket:
+                    del self.buckets[band][old]
+            self.buckets[band][new].add(ip)
+        sequence.band_keys = keys
+        if ip not in self.parent:
+            self.parent[ip] = ip
+            self.sizes[ip] = 1
+
+        for other, similarity in self._candidates(sequence.signature, keys, exclude=ip, limit=self.max_candidates):
+            if similarity < self.similarity_threshold:
+                break
+            self._union(ip, other)
+
+    def _candidates(self, signature, keys, exclude=None, limit=None):
+        """
+        Attackers sharing an LSH bucket, with estimated similarity, most similar first
+
+        With a limit, only that many candidates are compared; campaign
+        membership is transitive, so a sample of a large bucket is enough.
+        """
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates.update(self.buckets[band].get(key, ()))
+        candidates.discard(exclude)
+        if not candidates:
+            return []
+
+        ips = list(itertools.islice(candidates, limit))
+        signatures = np.stack([self.sequences[other].signature for other in ips])
+        similarity = np.mean(signatures == signature, axis=1)
+        order = np.argsort(-similarity, kind='stable')
+        return [(ips[i], float(similarity[i])) for i in order]
+
+    def _find(self, ip):
+        root = ip
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[ip] != root:
+            self.parent[ip], ip = root, self.parent[ip]
+        return root
+
+    def _union(self, a, b):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            # The larger campaign keeps its id
+            if self.sizes[root_b] > self.sizes[root_a]:
+                root_a, root_b = root_b, root_a
+            self.parent[root_b] = root_a
+            self.sizes[root_a] += self.sizes.pop(root_b)
+
+    def signature_for(self, requests):
+        """
+        Compute the MinHash signature of a request sequence
+
+        Args:
+            requests: List of (method, path) tuples
+        """
+        tokens = [normalize_request(method, path) for method, path in requests]
+        signature = np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        for start in range(len(tokens) - self.ngram + 1):
+            signature = np.minimum(signature, self._permute('\x1f'.join(tokens[start:start + self.ngram])))
+        return signature
+
+    def _query_signature(self, ip, requests):
+        if ip is not None:
+            sequence = self.sequences.get(ip)
+            if sequence is None or sequence.band_keys is None:
+                return None
+            return sequence.signature
+        return self.signature_for(requests or [])
+
+    def similar(self, ip=None, requests=None, limit=10):
+        """
+        Find attackers with a similar request sequence
+
+        Args:
+            ip: Attacker to compare against
+            requests: Alternatively, a list of (method, path) tuples
+
+        Returns:
+            matches: List of dictionaries with ip, estimated similarity and campaign
+        """
+        with self.lock:
+            signature = self._query_signature(ip, requests)
+            if signature is None:
+                return []
+            candidates = self._candidates(signature, self._band_keys(signature), exclude=ip)[:limit]
+            return [
+                {"ip": other, "similarity": round(similarity, 3), "campaign": self._find(other)}
+                for other, similarity in candidates
+            ]
+
+    def nearest_campaigns(self, ip=None, requests=None, limit=5):
+        """
+        Find the known campaigns closest to an attacker or request sequence
+
+        Returns:
+            campaigns: List of dictionaries with campaign id, best similarity,
+                matched members and size, most similar first
+        """
+        with self.lock:
+            signature = self._query_signature(ip, requests)
+            if signature is None:
+                return []
+
+            best = {}
+            for other, similarity in self._candidates(signature, self._band_keys(signature), exclude=ip):
+                campaign = self._find(other)
+                entry = best.setdefault(campaign, {"campaign": campaign, "similarity": similarity, "matched": 0})
+                entry["matched"] += 1
+
+            campaigns = sorted(best.values(), key=lambda entry: -entry["similarity"])[:limit]
+            for entry in campaigns:
+                entry["similarity"] = round(entry["similarity"], 3)
+                entry["size"] = self.sizes[entry["campaign"]]
+                entry["sample_sequence"] = self.sequences[entry["campaign"]].sample
+            return campaigns
+
+    def campaigns(self, min_size=2):
+        """
+        List campaigns with at least min_size attackers
+
+        Returns:
+            campaigns: List of dictionaries with campaign id, members and sample sequence, largest first
+        """
+        with self.lock:
+            members = defaultdict(list)
+            for ip in self.parent:
+                members[self._find(ip)].append(ip)
+            return sorted(
+                (
+                    {
+                        "campaign": root,
+                        "size": len(ips),
+                        "members": ips[:100],
+                        "sample_sequence": self.sequences[root].sample
+                    }
+                    for root, ips in members.items() if len(ips) >= min_size
+                ),
+                key=lambda campaign: -campaign["size"]
+            )
@@ -0,0 +1,268 @@
+import time
+import logging
+import threading
+import numpy as np
+
+from analytics.clustering import PROFILE_NAMES, classify_profile, SOPHISTICATION_COLUMN, THREAT_SCORE_COLUMN
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class StreamingClusterer:
+    """
+    Online attacker clustering with mini-batch k-means
+
+    An attacker whose profile changed is assigned to the nearest centre at
+    once and queued; queued attackers are fitted in small batches, nudging
+    the centres towards them, whenever a batch fills up or every
+    flush_interval seconds. Until there are enough attackers to place the
+    first centres, they stay queued. A periodic re-centre (in a background
+    thread) refreshes the feature scaling, runs a few full k-means iterations
+    from the current centres and reassigns every attacker. Assignments live
+    in an array indexed by feature store row, so a lookup is O(1).
+
+    Args:
+        feature_store: AttackerFeatureStore the attackers are read from
+        n_clusters: Number of behavioural clusters
+        batch_size: Queued attackers that trigger a mini-batch update
+        flush_interval: Seconds between mini-batch updates of a partial batch
+        recentre_interval: Seconds between full re-centres
+        recentre_iterations: k-means iterations per re-centre
+    """
+    def __init__(self, feature_store, n_clusters=8, batch_size=256, flush_interval=5,
+                 recentre_interval=300, recentre_iterations=5, seed=0):
+        self.feature_store = feature_store
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.recentre_interval = recentre_interval
+        self.recentre_iterations = recentre_iterations
+        self.rng = np.random.default_rng(seed)
+
+        self.centers = None                        # standardized, shape (k, d)
+        self.center_counts = np.zeros(n_clusters)
+        self.center_profiles = np.zeros(n_clusters, dtype=np.int64)
+        self.mean = None
+        self.scale = None
+        self.assignments = np.full(1024, -1, dtype=np.int64)   # store row -> cluster
+
+        self.pending = set()
+        self.last_recentre = time.time()
+        self.recentring = False
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        """Start the thread fitting queued attackers and re-centring on schedule"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name='streaming-clusters', daemon=True)
+            self.thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Cluster update failed: {e}")
+
+    def observe(self, ip):
+        """Assign an attacker whose features changed and queue it for the next batch"""
+        row = self.feature_store.index.get(ip)
+        if row is None:
+            return
+
+        with self.lock:
+            if self.centers is not None:
+                # Centres only move with the batch; the assignment is current right away
+                features = self.feature_store.feature_matrix(np.array([row]))
+                self._ensure_capacity(row + 1)
+                self.assignments[row] = self._nearest(self._scale(features))[0]
+            self.pending.add(row)
+            if len(self.pending) < self.batch_size:
+                return
+            self._fit_pending()
+        self._start_recentre_if_due()
+
+    def flush(self):
+        """Fit the queued attackers now and start a re-centre if one is due"""
+        with self.lock:
+            self._fit_pending()
+        self._start_recentre_if_due()
+
+    def _fit_pending(self):
+        """Mini-batch update from the queue (caller holds the lock)"""
+        # The first centres need n_clusters attackers; keep them queued until then
+        if not self.pending or (self.centers is None and len(self.pending) < self.n_clusters):
+            return
+        rows = np.fromiter(self.pending, dtype=np.int64, count=len(self.pending))
+        self.pending.clear()
+        self._partial_fit(rows)
+
+    def _start_recentre_if_due(self):
+        with self.lock:
+            if self.recentring or time.time() - self.last_recentre < self.recentre_interval:
+                return
+            self.recentring = True
+        threading.Thread(target=self.recentre, daemon=True).start()
+
+    def _partial_fit(self, rows):
+        """Assign a batch to its nearest centres and move the centres (caller holds the lock)"""
+        features = self.feature_store.feature_matrix(rows)
+        if self.centers is None:
+            self._fit_scaling(features)
+            self.centers = self._kmeans_plus_plus(self._scale(features))
+
+        scaled = self._scale(features)
+        labels = self._nearest(scaled)
+
+        # Per-centre learning rate 1/count: each centre tracks the mean of its points
+        batch_counts = np.bincount(labels, minlength=self.n_clusters)
+        moved = batch_counts > 0
+        self.center_counts += batch_counts
+        for dim in range(scaled.shape[1]):
+            sums = np.bincount(labels, weights=scaled[:, dim], minlength=self.n_clusters)
+            self.centers[moved, dim] += (sums[moved] - batch_counts[moved] * self.centers[moved, dim]) \
+                / self.center_counts[moved]
+
+        self._update_profiles()
+        self._ensure_capacity(int(rows.max()) + 1)
+        self.assignments[rows] = labels
+
+    def recentre(self):
+        """Refresh scaling, run full k-means iterations and reassign every attacker"""
+        try:
+            features = self.feature_store.feature_matrix()
+            if len(features) < self.n_clusters:
+                return
+
+            with self.lock:
+                centers = self.centers
+                mean, scale = self.mean, self.scale
+
+            # Carry the current centres over to the new scaling
+            if centers is not None:
+                centers = centers * scale + mean
+            mean, scale = self._scaling(features)
+            scaled = (features - mean) / scale
+            centers = self._kmeans_plus_plus(scaled) if centers is None else (centers - mean) / scale
+
+            for _ in range(self.recentre_iterations):
+                labels = self._nearest(scaled, centers)
+                counts = np.bincount(labels, minlength=self.n_clusters)
+                for dim in range(scaled.shape[1]):
+                    sums = np.bincount(labels, weights=scaled[:, dim], minlength=self.n_clusters)
+                    centers[counts > 0, dim] = sums[counts > 0] / counts[counts > 0]
+                # Reseed empty clusters with the points farthest from their centre
+                empty = np.flatnonzero(counts == 0)
+                if len(empty):
+                    distance = np.sum((scaled - centers[labels]) ** 2, axis=1)
+                    centers[empty] = scaled[np.argsort(distance)[-len(empty):]]
+            labels = self._nearest(scaled, centers)
+
+            with self.lock:
+                self.mean, self.scale = mean, scale
+                self.centers = centers
+                self.center_counts = np.bincount(labels, minlength=self.n_clusters).astype(np.float64)
+                self._update_profiles()
+                self._ensure_capacity(len(labels))
+                self.assignments[:len(labels)] = labels
+                self.last_recentre = time.time()
+
+            logger.info(f"Re-centred {self.n_clusters} clusters over {len(labels)} attackers")
+        finally:
+            self.recentring = False
+
+    def lookup(self, ip):
+        """
+        Get an attacker's current cluster
+
+        Returns:
+            assignment: Dictionary with cluster id and profile name, or None if unassigned
+        """
+        row = self.feature_store.index.get(ip)
+        if row is None or row >= len(self.assignments):
+            return None
+        cluster = int(self.assignments[row])
+        if cluster < 0:
+            return None
+        return {"cluster": cluster, "profile": PROFILE_NAMES[self.center_profiles[cluster]]}
+
+    def profiles(self):
+        """Current assignments in the AttackerProfiler.analyze_attackers output format"""
+        with self.lock:
+            n = len(self.feature_store)
+            labels = self.assignments[:n].copy()
+            center_profiles = self.center_profiles.copy()
+
+        ips = np.array(self.feature_store.ips[:n], dtype=object)
+        assigned = labels >= 0
+        categories = np.full(n, -1)
+        categories[assigned] = center_profiles[labels[assigned]]
+
+        profiles = {name: ips[categories == index].tolist() for index, name in enumerate(PROFILE_NAMES)}
+        profiles["stats"] = {
+            "total_attackers": n,
+            "unassigned": int(np.sum(~assigned)),
+            **{f"{name}_pct": len(profiles[name]) / max(n, 1) * 100 for name in PROFILE_NAMES}
+        }
+        return profiles
+
+    def get_clusters(self):
+        """Summary of every cluster: size, profile and centre in feature units"""
+        with self.lock:
+            if self.centers is None:
+                return []
+            centers = self.centers * self.scale + self.mean
+            sizes = np.bincount(self.assignments[self.assignments >= 0], minlength=self.n_clusters)
+            return [
+                {
+                    "cluster": index,
+                    "profile": PROFILE_NAMES[self.center_profiles[index]],
+                    "size": int(sizes[index]),
+                    "center": [round(float(value), 4) for value in centers[index]]
+                }
+                for index in range(self.n_clusters)
+            ]
+
+    def _scaling(self, features):
+        mean = features.mean(axis=0)
+        scale = features.std(axis=0)
+        scale[scale == 0] = 1.0
+        return mean, scale
+
+    def _fit_scaling(self, features):
+        self.mean, self.scale = self._scaling(features)
+
+    def _scale(self, features):
+        return (features - self.mean) / self.scale
+
+    def _nearest(self, scaled, centers=None):
+        """Index of the nearest centre for every row"""
+        centers = self.centers if centers is None else centers
+        distance = -2 * scaled @ centers.T + np.sum(centers ** 2, axis=1)
+        return np.argmin(distance, axis=1)
+
+    def _kmeans_plus_plus(self, scaled):
+        """Pick well-spread initial centres"""
+        centers = [scaled[self.rng.integers(len(scaled))]]
+        distance = np.sum((scaled - centers[0]) ** 2, axis=1)
+        for _ in range(1, self.n_clusters):
+            total = distance.sum()
+            index = self.rng.choice(len(scaled), p=distance / total) if total > 0 else self.rng.integers(len(scaled))
+            centers.append(scaled[index])
+            distance = np.minimum(distance, np.sum((scaled - scaled[index]) ** 2, axis=1))
+        return np.array(centers, dtype=np.float64)
+
+    def _update_profiles(self):
+        """Name every cluster by the profile of its centre"""
+        centers = self.centers * self.scale + self.mean
+        self.center_profiles = classify_profile(centers[:, THREAT_SCORE_COLUMN], centers[:, SOPHISTICATION_COLUMN])
+
+    def _ensure_capacity(self, size):
+        if size > len(self.assignments):
+            grown = np.full(max(size, 2 * len(self.assignments)), -1, dtype=np.int64)
+            grown[:len(self.assignments)] = self.assignments
+            self.assignments = grown
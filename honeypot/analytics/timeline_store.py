@@ -0,0 +1,386 @@
+import os
+import re
+import json
+import time
+import bisect
+import logging
+import threading
+from datetime import datetime, timezone
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SEGMENT_FILE = re.compile(r'^events_(\d{10})\.jsonl$')
+
+def parse_time(value):
+    """Parse an epoch number or ISO 8601 string (naive means UTC) into epoch seconds"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    value = value.strip()
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+class Segment:
+    """
+    One hour of events: the log file, its sparse time index and the IPs it contains
+
+    Only the open segment keeps its IP set in memory; closed segments keep
+    the number of distinct IPs and read their IP file when asked about one.
+    """
+    def __init__(self, store_dir, hour):
+        self.hour = hour
+        name = datetime.fromtimestamp(hour * 3600, tz=timezone.utc).strftime('%Y%m%d%H')
+        self.path = os.path.join(store_dir, f'events_{name}.jsonl')
+        self.index_path = os.path.join(store_dir, f'events_{name}.idx')
+        self.ips_path = os.path.join(store_dir, f'events_{name}.ips')
+        self.rollup_path = os.path.join(store_dir, f'events_{name}.rollup.json')
+        self.index_ts = []        # sparse: timestamp of every Nth event
+        self.index_offsets = []   # sparse: byte offset of those events
+        self.ips = None
+        self.unique_ips = 0
+        self.count = 0
+        self.size = 0
+
+    def load(self):
+        """Load the sidecar index and count the distinct IPs"""
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                for line in f:
+                    ts, offset, count = line.split('\t')
+                    self.index_ts.append(float(ts))
+                    self.index_offsets.append(int(offset))
+                    self.count = int(count)
+        self.unique_ips = sum(1 for _ in self._read_ips())
+        self.size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def load_ips(self):
+        """Keep the IP set in memory, while this is the open segment"""
+        self.ips = set(self._read_ips())
+
+    def has_ip(self, ip):
+        if self.ips is not None:
+            return ip in self.ips
+        return any(seen == ip for seen in self._read_ips())
+
+    def _read_ips(self):
+        if not os.path.exists(self.ips_path):
+            return
+        with open(self.ips_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+class TimelineStore:
+    """
+    Append-only, time-partitioned store of individual attack events
+
+    Events are appended to hourly JSONL segments. Every segment keeps a sparse
+    index (timestamp and byte offset of every Nth event) and the set of IPs
+    it contains, so range queries seek close to the start time and per-IP
+    queries skip segments the IP never touched. Per-minute rollups are kept
+    for the current hour and written next to each segment when the hour
+    closes, so dashboards can chart long ranges from the rollups alone.
+
+    Args:
+        store_dir: Directory holding the segments
+        index_every: Events between sparse index entries
+    """
+    def __init__(self, store_dir='analytics/timeline', index_every=256):
+        self.store_dir = store_dir
+        self.index_every = index_every
+        os.makedirs(store_dir, exist_ok=True)
+
+        self.segments = {}        # epoch hour -> Segment
+        self.hours = []           # sorted epoch hours
+        self.minutes = {}         # epoch minute -> rollup, for the open segment
+        self.last_ts = 0.0
+        self.current = None
+        self.handle = None
+        self.lock = threading.Lock()
+
+        self._load()
+
+    def _load(self):
+        """Load segment metadata and restore rollups for the most recent hour"""
+        for name in sorted(os.listdir(self.store_dir)):
+            match = SEGMENT_FILE.match(name)
+            if not match:
+                continue
+            hour = int(datetime.strptime(match.group(1), '%Y%m%d%H').replace(tzinfo=timezone.utc).timestamp()) // 3600
+            segment = Segment(self.store_dir, hour)
+            segment.load()
+            self.segments[hour] = segment
+            self.hours.append(hour)
+
+        # Segments closed without their rollup (e.g. after a crash) are rolled up now
+        for hour in self.hours[:-1]:
+            segment = self.segments[hour]
+            if not os.path.exists(segment.rollup_path):
+                self._write_rollup(segment, self._scan_rollups(segment))
+
+        if self.hours:
+            segment = self.segments[self.hours[-1]]
+            self.minutes = self._scan_rollups(segment)
+            segment.count = sum(bucket["events"] for bucket in self.minutes.values())
+            segment.load_ips()
+            self.current = segment
+            self.last_ts = self._last_ts(segment)
+            logger.info(f"Loaded {len(self.hours)} timeline segments from {self.store_dir}")
+
+    def _last_ts(self, segment):
+        """Timestamp of the last event in a segment"""
+        if not segment.size:
+            return 0.0
+        with open(segment.path, 'rb') as f:
+            f.seek(max(segment.size - 4096, 0))
+            for line in reversed(f.read().splitlines()):
+                try:
+                    return json.loads(line)["ts"]
+                except (ValueError, KeyError):
+                    continue
+        return 0.0
+
+    def append(self, log_entry, ts=None):
+        """
+        Record one analyzed request
+
+        Args:
+            log_entry: Log entry produced by AttackDetector.analyze_request
+            ts: Event time in epoch seconds (defaults to now)
+        """
+        with self.lock:
+            # Keep timestamps strictly increasing so the sparse index and
+            # resume points stay valid
+            ts = ts or time.time()
+            if ts <= self.last_ts:
+                ts = self.last_ts + 1e-6
+            self.last_ts = ts
+            event = {
+                "ts": ts,
+                "timestamp": log_entry.get("timestamp"),
+                "ip": log_entry.get("ip"),
+                "method": log_entry.get("method"),
+                "path": log_entry.get("path"),
+                "threat_score": log_entry.get("threat_score", 0),
+                "threat_level": log_entry.get("threat_level"),
+                "attack_types": log_entry.get("attack_types", [])
+            }
+            line = (json.dumps(event, separators=(',', ':')) + '\n').encode('utf-8')
+
+            segment = self._segment_for(int(ts // 3600))
+            if segment.count % self.index_every == 0:
+                segment.index_ts.append(ts)
+                segment.index_offsets.append(segment.size)
+                with open(segment.index_path, 'a') as f:
+                    f.write(f"{ts}\t{segment.size}\t{segment.count}\n")
+            if event["ip"] not in segment.ips:
+                segment.ips.add(event["ip"])
+                segment.unique_ips += 1
+                with open(segment.ips_path, 'a') as f:
+                    f.write(f"{event['ip']}\n")
+
+            self.handle.write(line)
+            self.handle.flush()
+            segment.size += len(line)
+            segment.count += 1
+
+            self._add_to_rollup(self.minutes, event)
+
+    def _segment_for(self, hour):
+        """Get the open segment, rolling over to a new hour if needed (caller holds the lock)"""
+        if self.current is not None and self.current.hour == hour and self.handle is not None:
+            return self.current
+
+        if self.current is not None and self.current.hour != hour:
+            self._write_rollup(self.current, self.minutes)
+            self.minutes = {}
+            self.current.ips = None
+        if self.handle is not None:
+            self.handle.close()
+
+        segment = self.segments.get(hour)
+        if segment is None:
+            segment = Segment(self.store_dir, hour)
+            self.segments[hour] = segment
+            bisect.insort(self.hours, hour)
+        if segment.ips is None:
+            segment.load_ips()
+        self.current = segment
+        self.handle = open(segment.path, 'ab')
+        segment.size = self.handle.tell()
+        return segment
+
+    def _add_to_rollup(self, minutes, event):
+        minute = int(event["ts"] // 60)
+        bucket = minutes.get(minute)
+        if bucket is None:
+            bucket = minutes[minute] = {"events": 0, "threat_sum": 0.0, "high_threat": 0,
+                                        "attack_types": {}, "ips": set()}
+        bucket["events"] += 1
+        bucket["threat_sum"] += event["threat_score"] or 0
+        bucket["high_threat"] += int(event["threat_level"] == "HIGH")
+        for attack_type in event["attack_types"]:
+            bucket["attack_types"][attack_type] = bucket["attack_types"].get(attack_type, 0) + 1
+        bucket["ips"].add(event["ip"])
+
+    def _scan_rollups(self, segment):
+        """Rebuild per-minute rollups by reading a whole segment"""
+        minutes = {}
+        if os.path.exists(segment.path):
+            with open(segment.path, 'rb') as f:
+                for line in f:
+                    try:
+                        self._add_to_rollup(minutes, json.loads(line))
+                    except ValueError:
+                        continue
+        return minutes
+
+    def _write_rollup(self, segment, minutes):
+        with open(segment.rollup_path, 'w') as f:
+            json.dump({str(minute): self._export_bucket(bucket) for minute, bucket in minutes.items()}, f)
+
+    @staticmethod
+    def _export_bucket(bucket):
+        exported = dict(bucket)
+        exported["unique_ips"] = len(bucket["ips"]) if isinstance(bucket["ips"], set) else bucket["unique_ips"]
+        exported.pop("ips", None)
+        return exported
+
+    def _segment_minutes(self, segment):
+        """Per-minute rollups of a segment (from memory for the open one)"""
+        if segment is self.current:
+            return {minute: self._export_bucket(bucket) for minute, bucket in self.minutes.items()}
+        if not os.path.exists(segment.rollup_path):
+            return {}
+        with open(segment.rollup_path, 'r') as f:
+            return {int(minute): bucket for minute, bucket in json.load(f).items()}
+
+    def _unique_ips(self, segment, start, end):
+        """Distinct IPs of a segment within the requested range, scanning events only if it cuts the hour"""
+        first_minute, last_minute = segment.hour * 60, segment.hour * 60 + 59
+        lo = first_minute if start is None else max(first_minute, int(start // 60))
+        hi = last_minute if end is None else min(last_minute, int(end // 60))
+        if lo == first_minute and hi == last_minute:
+            return segment.unique_ips
+        return len({event["ip"] for event in self.iter_events(lo * 60, (hi + 1) * 60 - 1e-6)})
+
+    def _hours_between(self, start, end):
+        lo = bisect.bisect_left(self.hours, int(start // 3600)) if start is not None else 0
+        hi = bisect.bisect_right(self.hours, int(end // 3600)) if end is not None else len(self.hours)
+        return self.hours[lo:hi]
+
+    def iter_events(self, start=None, end=None, ip=None):
+        """
+        Iterate over events in time order
+
+        Args:
+            start: Only events at or after this time (epoch or ISO string)
+            end: Only events at or before this time (epoch or ISO string)
+            ip: Only events from this IP
+        """
+        start, end = parse_time(start), parse_time(end)
+        with self.lock:
+            hours = self._hours_between(start, end)
+            segments = [self.segments[hour] for hour in hours]
+            if self.handle is not None:
+                self.handle.flush()
+
+        for segment in segments:
+            if ip is not None and not segment.has_ip(ip):
+                continue
+            if not os.path.exists(segment.path):
+                continue
+
+            # Seek to the last indexed event before the start time
+            offset = 0
+            if start is not None and segment.index_ts:
+                position = bisect.bisect_left(segment.index_ts, start) - 1
+                if position >= 0:
+                    offset = segment.index_offsets[position]
+
+            with open(segment.path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    if start is not None and event["ts"] < start:
+                        continue
+                    if end is not None and event["ts"] > end:
+                        return
+                    if ip is None or event["ip"] == ip:
+                        yield event
+
+    def query(self, start=None, end=None, ip=None, limit=1000):
+        """
+        Get up to limit events in a time range
+
+        Returns:
+            result: Dictionary with the events and the timestamp to resume from
+        """
+        events = []
+        for event in self.iter_events(start, end, ip):
+            if len(events) == limit:
+                return {"events": events, "next": event["ts"]}
+            events.append(event)
+        return {"events": events, "next": None}
+
+    def rollups(self, start=None, end=None, resolution='minute'):
+        """
+        Get pre-aggregated event counts per minute or hour
+
+        Args:
+            start: Range start (epoch or ISO string)
+            end: Range end (epoch or ISO string)
+            resolution: 'minute' or 'hour'
+
+        Returns:
+            buckets: List of bucket dictionaries in time order
+        """
+        start, end = parse_time(start), parse_time(end)
+        with self.lock:
+            segments = [self.segments[hour] for hour in self._hours_between(start, end)]
+            minutes = {}
+            for segment in segments:
+                minutes[segment.hour] = self._segment_minutes(segment)
+
+        buckets = []
+        for segment in segments:
+            selected = [
+                (minute, bucket) for minute, bucket in sorted(minutes[segment.hour].items())
+                if (start is None or (minute + 1) * 60 > start) and (end is None or minute * 60 <= end)
+            ]
+            if resolution == 'hour':
+                if not selected:
+                    continue
+                hour = {"events": 0, "threat_sum": 0.0, "high_threat": 0, "attack_types": {}}
+                for _, bucket in selected:
+                    hour["events"] += bucket["events"]
+                    hour["threat_sum"] += bucket["threat_sum"]
+                    hour["high_threat"] += bucket["high_threat"]
+                    for attack_type, count in bucket["attack_types"].items():
+                        hour["attack_types"][attack_type] = hour["attack_types"].get(attack_type, 0) + count
+                hour["unique_ips"] = self._unique_ips(segment, start, end)
+                selected = [(segment.hour * 60, hour)]
+
+            for minute, bucket in selected:
+                buckets.append({
+                    "timestamp": datetime.fromtimestamp(minute * 60, tz=timezone.utc).isoformat(),
+                    "events": bucket["events"],
+                    "avg_threat_score": round(bucket["threat_sum"] / max(bucket["events"], 1), 4),
+                    "high_threat": bucket["high_threat"],
+                    "unique_ips": bucket["unique_ips"],
+                    "attack_types": bucket["attack_types"]
+                })
+        return buckets
@@ -1,4 +1,4 @@
-from flask import Flask, jsonify, request, render_template, redirect, url_for, send_from_directory
+from flask import Flask, jsonify, request, render_template, redirect, url_for, send_from_directory, g
 import logging
 import random
 import time
@@ -9,13 +9,21 @@ from datetime import datetime
 
 # Import our custom modules
 from data_generator import HoneypotData
-from analytics import AttackDetector
+from decoy_universe import universe_for, USERS, TRANSACTIONS, LOGS
+from attack_detector import AttackDetector
 from utils.geolocation import IPGeolocation
+from utils.http_client import get_http_client
 from threat_intelligence.misp_integration import ThreatIntelSender
+from threat_intelligence.taxii_server import create_taxii_blueprint
+from threat_intelligence.reputation import ReputationIndex
 from analytics.attacker_profiling import AttackerProfiler
+from analytics.feature_store import AttackerFeatureStore
+from analytics.streaming_clusters import StreamingClusterer
+from analytics.timeline_store import TimelineStore
+from analytics.sequence_fingerprint import SequenceFingerprinter
 from forensics.blockchain_evidence import BlockchainLogger, log_attack_evidence
 # Import deception technology module
-from deception import deception_bp, DeceptionAnalytics
+from deception import deception_bp, DeceptionAnalytics, event_bus, ProtocolDecoyServer, s3_decoy_bp
 # Import Zero Trust security module
 from security import ztna_manager, auth_bp, ztna_login_required, ztna_role_required
 
@@ -26,6 +34,8 @@ app.secret_key = os.getenv('FLASK_SECRET_KEY', 'honeypot_secret_key_change_in_pr
 
 # Register the deception blueprint
 app.register_blueprint(deception_bp, url_prefix='/services')
+# Register the S3-compatible decoy bucket (path-style, at the site root)
+app.register_blueprint(s3_decoy_bp)
 # Register the authentication blueprint
 app.register_blueprint(auth_bp, url_prefix='/auth')
 
@@ -44,14 +54,42 @@ logging.basicConfig(
 
 # Initialize our modules
 honeypot_data = HoneypotData()
-attack_detector = AttackDetector()
+reputation_index = ReputationIndex()
+attacker_features = AttackerFeatureStore()
+attack_timeline = TimelineStore()
+sequence_fingerprinter = SequenceFingerprinter()
+attack_detector = AttackDetector(
+    reputation_index=reputation_index,
+    feature_store=attacker_features,
+    timeline_store=attack_timeline,
+    sequence_fingerprinter=sequence_fingerprinter
+)
+streaming_clusters = StreamingClusterer(attacker_features).start()
 geo_locator = IPGeolocation()
 threat_intel = ThreatIntelSender()
+# Incremental STIX bundles of the attacker profiles, daily by default (STIX_BUNDLE_INTERVAL)
+threat_intel.schedule_stix_bundles(attack_detector.attackers)
 attacker_profiler = AttackerProfiler()
 blockchain_logger = BlockchainLogger()
 # Initialize deception analytics
 deception_analytics = DeceptionAnalytics()
 
+# Deliver decoy interactions and issued trackers to the analytics as they happen
+event_bus.subscribe(deception_analytics.handle_events)
+event_bus.start()
+
+# Native Redis/MySQL protocol decoys for attackers using the leaked URLs (opt-in)
+if os.getenv('PROTOCOL_DECOYS', 'false').lower() == 'true':
+    protocol_decoys = ProtocolDecoyServer(
+        redis_port=int(os.getenv('DECOY_REDIS_PORT', '6379')),
+        mysql_port=int(os.getenv('DECOY_MYSQL_PORT', '3306')),
+        max_connections=int(os.getenv('DECOY_MAX_CONNECTIONS', '5000'))
+    )
+    protocol_decoys.start()
+
+# Serve generated indicators as a read-only TAXII feed
+app.register_blueprint(create_taxii_blueprint(threat_intel.indicator_store), url_prefix='/taxii2')
+
 # Create directories for static content
 os.makedirs('static/js', exist_ok=True)
 os.makedirs('static/css', exist_ok=True)
@@ -68,12 +106,39 @@ def add_random_delay():
 def log_suspicious_activity(route, request):
     # Use our new attack detector to analyze the request
     log_entry = attack_detector.analyze_request(request)
+    g.analyzed = True
+    streaming_clusters.observe(log_entry["ip"])
+    
+    # Queue an indicator for attackers caught attacking (served over TAXII)
+    if log_entry["attack_types"] or log_entry["threat_level"] == "HIGH":
+        attacker = attack_detector.attackers[log_entry["ip"]]
+        threat_intel.queue_stix({
+            "ip": log_entry["ip"],
+            "attack_types": sorted(attacker["attack_types"]),
+            "threat_score": attacker["threat_score"],
+            "first_seen": attacker["first_seen"]
+        })
     
     # Log the activity
     logging.info(f"HONEYPOT ACTIVITY: {json.dumps(log_entry)}")
     
     return log_entry["threat_level"]
 
+# Page through an attacker's decoy universe, with Link, ETag and total headers
+def decoy_listing(stream, per_page):
+    """The requested page, and an error message for a bad cursor or sort key"""
+    try:
+        return universe_for(request.remote_addr).listing(stream, request.args, request.path, per_page), None
+    except ValueError as e:
+        return None, str(e)
+
+def listing_response(body, listing):
+    response = jsonify(body)
+    response.headers['Link'] = ', '.join(f'<{url}>; rel="{rel}"' for rel, url in listing['links'].items())
+    response.headers['X-Total-Count'] = str(listing['total'])
+    response.set_etag(listing['etag'], weak=True)
+    return response.make_conditional(request)
+
 # Middleware to check for deception tracking payloads
 @app.before_request
 def check_tracked_payloads():
@@ -127,6 +192,14 @@ def check_tracked_payloads():
         
     return None
 
+# Count error responses towards the attacker's error rate feature; only
+# analyzed requests are counted, so the rate stays a share of their count
+@app.after_request
+def record_response_status(response):
+    if g.get('analyzed'):
+        attacker_features.record_status(request.remote_addr, response.status_code)
+    return response
+
 # Root route - nothing suspicious here
 @app.route('/')
 def index():
@@ -161,14 +234,22 @@ def fake_users():
     elif threat_level == "HIGH":
         time.sleep(random.uniform(8, 10))
     
-    return jsonify({
-        "users": honeypot_data.generate_users(50),
+    # Each attacker pages through the same virtual user base
+    listing, error = decoy_listing(USERS, 50)
+    if error:
+        return jsonify({"error": error}), 400
+    
+    return listing_response({
+        "users": listing['items'],
         "pagination": {
-            "next": f"/api/v1/users?page={random.randint(2,5)}",
-            "total": random.randint(1000, 5000)
+            "page": listing['page'],
+            "per_page": listing['per_page'],
+            "next": listing['links'].get('next'),
+            "next_cursor": listing['next_cursor'],
+            "total": listing['total']
         },
         "rate_limit": f"{random.randint(90, 100)}/100"
-    })
+    }, listing)
 
 # Fake admin endpoint
 @app.route('/admin')
@@ -194,7 +275,22 @@ def fake_transactions():
     add_random_delay()
     log_suspicious_activity('/api/v1/transactions', request)
     
-    return jsonify(honeypot_data.generate_financial_data(20))
+    listing, error = decoy_listing(TRANSACTIONS, 20)
+    if error:
+        return jsonify({"error": error}), 400
+    
+    return listing_response(listing['items'], listing)
+
+# Fake transaction lookup, consistent with the listing
+@app.route('/api/v1/transactions/<transaction_id>')
+def fake_transaction(transaction_id):
+    add_random_delay()
+    log_suspicious_activity(f'/api/v1/transactions/{transaction_id}', request)
+    
+    transaction = universe_for(request.remote_addr).transaction_by_id(transaction_id)
+    if transaction is None:
+        return jsonify({"error": "Transaction not found"}), 404
+    return jsonify(transaction)
 
 # Fake .env file - looks like it leaked into public directory
 @app.route('/.env')
@@ -261,7 +357,7 @@ def fake_wordpress():
     log_suspicious_activity('/wp-admin/config.json', request)
     
     return jsonify({
-        "db_creds": honeypot_data.generate_fake_credentials(),
+        "db_creds": honeypot_data.generate_fake_credentials(seed=request.remote_addr),
         "admin_user": "wp_admin",
         "admin_hash": "$P$B7fakedhashfakehash12345"
     })
@@ -272,10 +368,14 @@ def fake_logs():
     add_random_delay()
     log_suspicious_activity('/api/v1/logs', request)
     
-    return jsonify({
-        "logs": honeypot_data.generate_system_logs(30),
-        "total": random.randint(500, 2000)
-    })
+    listing, error = decoy_listing(LOGS, 30)
+    if error:
+        return jsonify({"error": error}), 400
+    
+    return listing_response({
+        "logs": listing['items'],
+        "total": listing['total']
+    }, listing)
 
 # NEW: User profile image generator
 @app.route('/api/v1/users/<user_id>/avatar')
@@ -303,6 +403,80 @@ def analytics_dashboard():
     return render_template('dashboard.html', 
                           analytics=attack_detector.get_attack_analytics())
 
+# Outbound integration health (latency, errors, circuit state)
+@app.route('/admin/integrations/metrics')
+@ztna_login_required
+@ztna_role_required(['admin'])
+def integration_metrics():
+    return jsonify(get_http_client().get_metrics())
+
+# Live attacker clusters maintained by the streaming clusterer
+@app.route('/admin/clusters')
+@ztna_login_required
+@ztna_role_required(['admin'])
+def attacker_clusters():
+    return jsonify({
+        "clusters": streaming_clusters.get_clusters(),
+        "stats": streaming_clusters.profiles()["stats"]
+    })
+
+@app.route('/admin/clusters/<ip>')
+@ztna_login_required
+@ztna_role_required(['admin'])
+def attacker_cluster(ip):
+    assignment = streaming_clusters.lookup(ip)
+    if assignment is None:
+        return jsonify({"error": "Attacker not clustered yet"}), 404
+    return jsonify({"ip": ip, **assignment})
+
+# Attack timeline: raw events, or per-minute/hour rollups for charts
+@app.route('/admin/timeline')
+@ztna_login_required
+@ztna_role_required(['admin'])
+def attack_timeline_view():
+    start = request.args.get('start')
+    end = request.args.get('end')
+    resolution = request.args.get('resolution')
+    
+    try:
+        if resolution in ('minute', 'hour'):
+            return jsonify({"buckets": attack_timeline.rollups(start, end, resolution)})
+        limit = max(1, min(request.args.get('limit', 1000, type=int), 10000))
+        return jsonify(attack_timeline.query(start, end, ip=request.args.get('ip'), limit=limit))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+# Campaigns: attackers running the same tool or playbook across IPs
+@app.route('/admin/campaigns')
+@ztna_login_required
+@ztna_role_required(['admin'])
+def attack_campaigns():
+    min_size = request.args.get('min_size', type=int) if 'min_size' in request.args else 2
+    if min_size is None or min_size < 1:
+        return jsonify({"error": "min_size must be a positive integer"}), 400
+    return jsonify({"campaigns": sequence_fingerprinter.campaigns(min_size=min_size)})
+
+@app.route('/admin/campaigns/nearest', methods=['GET', 'POST'])
+@ztna_login_required
+@ztna_role_required(['admin'])
+def nearest_campaigns():
+    # Query by attacker IP, or POST a sequence: {"requests": [["GET", "/path"], ...]}
+    ip = request.args.get('ip')
+    requests_seen = None
+    if request.method == 'POST':
+        body = request.get_json(silent=True)
+        items = body.get('requests') if isinstance(body, dict) else None
+        if not isinstance(items, list) or not all(
+            isinstance(item, list) and len(item) == 2 and all(isinstance(part, str) for part in item)
+            for item in items
+        ):
+            return jsonify({"error": "Expected {\"requests\": [[method, path], ...]}"}), 400
+        requests_seen = [tuple(item) for item in items]
+    return jsonify({
+        "campaigns": sequence_fingerprinter.nearest_campaigns(ip=ip, requests=requests_seen),
+        "similar_attackers": sequence_fingerprinter.similar(ip=ip, requests=requests_seen)
+    })
+
 # 404 handler
 @app.errorhandler(404)
 def page_not_found(e):
@@ -331,11 +505,30 @@ def deception_dashboard():
         exfil_attempts=exfil_attempts,
         stats={
             'total_attackers': len(attacker_profiles),
-            'tracked_payloads': len(tracking_report.get('payloads', [])),
+            'tracked_payloads': tracking_report.get('tracked_payloads', 0),
             'exfil_attempts': len(exfil_attempts)
         }
     )
 
+# Deception alerts, newest first
+@app.route('/admin/deception-analytics/alerts')
+@ztna_login_required
+@ztna_role_required(['admin', 'threat_hunter'])
+def deception_alerts():
+    alert_type = request.args.get('type')
+    tracker = request.args.get('tracker')
+    limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+    
+    if tracker:
+        alerts = deception_analytics.alerts.for_tracker(tracker, alert_type)[::-1][:limit]
+    else:
+        alerts = deception_analytics.alerts.recent(limit, alert_type)
+    
+    return jsonify({
+        "total": deception_analytics.alerts.count(alert_type),
+        "alerts": alerts
+    })
+
 # ZTNA Security Dashboard
 @app.route('/admin/security/ztna')
 @ztna_login_required
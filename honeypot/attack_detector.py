@@ -49,7 +49,17 @@ class AttackDetector:
         r"(?:\.\.|%2e%2e)(?:\/|%2f)",
     ]
     
-    def __init__(self):
+    def __init__(self, reputation_index=None, feature_store=None, timeline_store=None,
+                 sequence_fingerprinter=None):
+        # Optional ReputationIndex built from ingested blocklists
+        self.reputation_index = reputation_index
+        # Optional AttackerFeatureStore kept in sync with the attacker profiles
+        self.feature_store = feature_store
+        # Optional TimelineStore recording every analyzed request
+        self.timeline_store = timeline_store
+        # Optional SequenceFingerprinter linking attackers by request sequence
+        self.sequence_fingerprinter = sequence_fingerprinter
+        
         self.attackers = defaultdict(lambda: {
             "first_seen": datetime.utcnow().isoformat(),
             "last_seen": datetime.utcnow().isoformat(),
@@ -130,6 +140,14 @@ class AttackDetector:
                 log_entry["threat_indicators"].append(f"Scanner: {agent}")
                 log_entry["attack_types"].append("Scanner")
         
+        # Add external reputation from ingested blocklists
+        if self.reputation_index is not None:
+            reputation = self.reputation_index.lookup(ip)
+            if reputation > 0:
+                threat_score += reputation
+                log_entry["threat_indicators"].append(f"Reputation: {reputation:.2f}")
+                log_entry["reputation"] = reputation
+        
         # Calculate final threat score (max 1.0)
         threat_score = min(threat_score, 1.0)
         log_entry["threat_score"] = threat_score
@@ -145,6 +163,9 @@ class AttackDetector:
         # Update attacker profile
         self._update_attacker_profile(ip, log_entry)
         
+        if self.timeline_store is not None:
+            self.timeline_store.append(log_entry)
+        
         return log_entry
     
     def _update_attacker_profile(self, ip, log_entry):
@@ -168,6 +189,11 @@ class AttackDetector:
         for attack_type in log_entry.get("attack_types", []):
             attacker["attack_types"].add(attack_type)
         
+        if self.feature_store is not None:
+            self.feature_store.update(ip, log_entry, attacker["threat_score"])
+        if self.sequence_fingerprinter is not None:
+            self.sequence_fingerprinter.observe(ip, log_entry["method"], log_entry["path"])
+        
         # Log if this is a high-threat attacker
         if attacker["threat_score"] > 0.7 and attacker["count"] > 5:
             logging.warning(f"HIGH THREAT ATTACKER: {ip} Score: {attacker['threat_score']:.2f} Attacks: {list(attacker['attack_types'])}")
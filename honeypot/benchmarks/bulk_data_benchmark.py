@@ -0,0 +1,44 @@
+"""
+Benchmark the vectorised bulk data generator
+
+Run from the honeypot directory:
+    python benchmarks/bulk_data_benchmark.py --rows 1000000
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_generator import BulkDataGenerator, generate_mock_users
+
+def bulk_throughput(rows):
+    """Rows per second: drawing the columns, then materialising every record"""
+    generator = BulkDataGenerator(seed=0)
+    print(f"{'dataset':<14} {'arrays rows/s':>14} {'records rows/s':>15}")
+    for name in ('users', 'transactions', 'system_logs'):
+        start = time.perf_counter()
+        batch = getattr(generator, name)(rows)
+        drawn = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in batch:
+            pass
+        built = time.perf_counter() - start
+        print(f"{name:<14} {rows / drawn:>14,.0f} {rows / (drawn + built):>15,.0f}")
+
+def per_record_throughput(rows):
+    """Rows per second of the per-record Faker generator, for comparison"""
+    start = time.perf_counter()
+    generate_mock_users(rows)
+    print(f"\ngenerate_mock_users: {rows / (time.perf_counter() - start):,.0f} rows/s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark bulk fake data generation")
+    parser.add_argument('--rows', type=int, default=1000000, help="Rows per dataset")
+    parser.add_argument('--reference-rows', type=int, default=5000, help="Rows for the per-record generator")
+    args = parser.parse_args()
+
+    bulk_throughput(args.rows)
+    per_record_throughput(args.reference_rows)
@@ -0,0 +1,80 @@
+"""
+Benchmark the attacker clustering engine against the threshold mock
+
+Run from the honeypot directory:
+    python benchmarks/clustering_benchmark.py --sizes 10000 100000 300000
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.clustering import GridDBSCAN, PROFILE_NAMES, classify_profile, label_profiles
+
+def generate_features(n, seed=0):
+    """
+    Synthetic attacker features (see analytics.feature_store.FEATURE_NAMES)
+
+    Mixes scanners, brute-forcers, injection attackers and background noise.
+    Sophistication takes the discrete values produced by the real feature store.
+    """
+    rng = np.random.default_rng(seed)
+    kind = rng.choice(4, size=n, p=[0.45, 0.25, 0.2, 0.1])
+    features = np.empty((n, 5))
+
+    # requests_per_minute, path_variety, error_rate, sophistication, threat_score
+    scanners = kind == 0
+    features[scanners] = np.column_stack([
+        rng.gamma(4, 10, scanners.sum()), rng.beta(8, 2, scanners.sum()),
+        rng.beta(6, 3, scanners.sum()), np.full(scanners.sum(), 0.4), rng.beta(2, 6, scanners.sum())
+    ])
+    brute = kind == 1
+    features[brute] = np.column_stack([
+        rng.gamma(6, 5, brute.sum()), rng.beta(1, 20, brute.sum()),
+        rng.beta(9, 1, brute.sum()), np.zeros(brute.sum()), rng.beta(4, 4, brute.sum())
+    ])
+    injection = kind == 2
+    features[injection] = np.column_stack([
+        rng.gamma(2, 3, injection.sum()), rng.beta(3, 3, injection.sum()),
+        rng.beta(3, 5, injection.sum()), rng.choice([0.7, 0.8, 1.0], injection.sum()),
+        rng.beta(8, 2, injection.sum())
+    ])
+    noise = kind == 3
+    features[noise] = np.column_stack([
+        rng.exponential(20, noise.sum()), rng.random(noise.sum()), rng.random(noise.sum()),
+        rng.choice([0, 0.4, 0.6, 0.7, 0.8, 1.0], noise.sum()), rng.random(noise.sum())
+    ])
+    return features
+
+def run(sizes, eps, min_samples):
+    print(f"{'attackers':>10} {'mock s':>8} {'dbscan s':>9} {'quant':>6} {'clusters':>9} "
+          f"{'noise':>7} {'agree %':>8}  profile counts")
+    for n in sizes:
+        features = generate_features(n)
+
+        start = time.perf_counter()
+        mock = classify_profile(features[:, 4], features[:, 3])
+        mock_time = time.perf_counter() - start
+
+        model = GridDBSCAN(eps=eps, min_samples=min_samples)
+        start = time.perf_counter()
+        labels = model.fit_predict(features)
+        categories = label_profiles(features, labels)
+        dbscan_time = time.perf_counter() - start
+
+        counts = np.bincount(categories, minlength=len(PROFILE_NAMES))
+        print(f"{n:>10} {mock_time:>8.3f} {dbscan_time:>9.3f} {str(model.quantization):>6} "
+              f"{labels.max() + 1:>9} {np.sum(labels < 0):>7} {np.mean(mock == categories) * 100:>8.1f}  "
+              + ", ".join(f"{name}={count}" for name, count in zip(PROFILE_NAMES, counts)))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark attacker clustering")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 300000])
+    parser.add_argument('--eps', type=float, default=0.5)
+    parser.add_argument('--min-samples', type=int, default=5)
+    args = parser.parse_args()
+
+    run(args.sizes, args.eps, args.min_samples)
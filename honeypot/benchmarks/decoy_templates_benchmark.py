@@ -0,0 +1,88 @@
+"""
+Benchmark the pre-rendered decoy response templates
+
+Run from the honeypot directory:
+    python benchmarks/decoy_templates_benchmark.py --requests 2000
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import argparse
+
+# Downloads are benchmarked without the per-attacker bandwidth limit
+os.environ['DECOY_DOWNLOAD_RATE'] = '0'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from deception import deception_bp
+from deception.api_honeypot import TEMPLATES
+
+ENDPOINTS = [
+    ('GET', '/services/redis/config'),
+    ('POST', '/services/redis/master/auth'),
+    ('POST', '/services/mysql/connection'),
+    ('GET', '/services/mysql/backup'),
+    ('GET', '/services/aws/s3/config'),
+    ('GET', '/services/aws/s3/list'),
+    ('GET', '/services/aws/s3/download/credentials.json'),
+    ('GET', '/services/aws/s3/download/customer_data.sql'),
+]
+
+# Streamed downloads are measured on their first 64 KB
+STREAMED = {
+    '/services/mysql/backup',
+    '/services/aws/s3/download/credentials.json',
+    '/services/aws/s3/download/customer_data.sql',
+}
+
+def endpoint_throughput(n):
+    """Requests per second through the full Flask stack"""
+    app = Flask(__name__)
+    app.register_blueprint(deception_bp, url_prefix='/services')
+    client = app.test_client()
+
+    print(f"{'endpoint':<48} {'req/s':>9} {'bytes':>7}")
+    for method, path in ENDPOINTS:
+        kwargs = {'json': {}} if method == 'POST' else {}
+        if path in STREAMED:
+            kwargs['headers'] = {'Range': 'bytes=0-65535'}
+        size = len(client.open(path, method=method, **kwargs).data)
+        start = time.perf_counter()
+        for _ in range(n):
+            client.open(path, method=method, **kwargs)
+        print(f"{method + ' ' + path:<48} {n / (time.perf_counter() - start):>9.0f} {size:>7}")
+
+def render_cost(n):
+    """Body construction: template splice versus serializing the body per request"""
+    print(f"\n{'template':<34} {'splice us':>10} {'json.dumps us':>14}")
+    for name, template in TEMPLATES.items():
+        values = {slot: str(uuid.uuid4()) for slot in template.slots}
+
+        start = time.perf_counter()
+        for _ in range(n):
+            template.render(**values)
+        splice = (time.perf_counter() - start) / n * 1e6
+
+        reference = '-'
+        if template.content_type == 'application/json':
+            data = json.loads(template.render(**values))
+            start = time.perf_counter()
+            for _ in range(n):
+                json.dumps(data, sort_keys=True, separators=(',', ':'))
+            reference = f"{(time.perf_counter() - start) / n * 1e6:.2f}"
+        print(f"{name:<34} {splice:>10.2f} {reference:>14}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark decoy response templates")
+    parser.add_argument('--requests', type=int, default=2000, help="Requests per endpoint")
+    parser.add_argument('--renders', type=int, default=100000, help="Body renders per template")
+    args = parser.parse_args()
+
+    # Every decoy request logs a warning
+    logging.disable(logging.WARNING)
+    endpoint_throughput(args.requests)
+    render_cost(args.renders)
@@ -1,9 +1,47 @@
 import os
 import json
+import time
+import threading
 import numpy as np
 import random
 from faker import Faker
-from datetime import datetime, timedelta
+from datetime import datetime
+
+CORPORATE_DOMAINS = ["acme.com", "example.org", "techinc.co", "dataflow.net", "cloudpeak.io"]
+
+# Job titles with realistic distribution
+JOB_TITLES = [
+    "Software Engineer", "Project Manager", "Data Analyst", 
+    "Marketing Specialist", "HR Coordinator", "Systems Administrator",
+    "Product Manager", "Business Analyst", "UX Designer",
+    "Customer Support Specialist", "Sales Representative"
+]
+
+TRANSACTION_TYPES = ["deposit", "withdrawal", "transfer", "payment"]
+CURRENCIES = ["USD", "EUR", "GBP", "JPY"]
+TRANSACTION_STATUSES = ["completed", "pending", "failed"]
+TRANSACTION_STATUS_WEIGHTS = [0.85, 0.1, 0.05]
+PAYMENT_CATEGORIES = ["retail", "entertainment", "food", "utilities"]
+
+LOG_TYPES = ["access", "error", "system", "security"]
+LOG_SERVICES = ["web-server", "database", "auth-service", "api-gateway", "cron"]
+ACCESS_PATHS = [
+    "/api/v1/users", "/login", "/admin", "/dashboard", 
+    "/api/v1/transactions", "/settings", "/profile"
+]
+ACCESS_METHODS = ["GET", "POST", "PUT", "DELETE"]
+ACCESS_STATUSES = [200, 200, 200, 201, 400, 401, 403, 404, 500]
+ERROR_MESSAGES = [
+    "Connection refused", "Timeout exceeded", "Unauthorized access",
+    "Invalid input", "Database query failed", "Resource not found"
+]
+SECURITY_MESSAGES = [
+    "Login attempt failed", "Brute force attack detected", 
+    "File permission changed", "Suspicious activity detected",
+    "New SSH key added", "Firewall rule updated"
+]
+ERROR_LEVEL_WEIGHTS = [0.3, 0.6, 0.1]
+SECURITY_LEVEL_WEIGHTS = [0.5, 0.3, 0.2]
 
 # Mocked imports for demonstration since these would require actual API keys
 # In a real implementation, you would need to install and configure these properly
@@ -37,24 +75,16 @@ class MockMessage:
 def generate_mock_users(count):
     faker = Faker()
     users = []
-    corporate_domains = ["acme.com", "example.org", "techinc.co", "dataflow.net", "cloudpeak.io"]
     
     for _ in range(count):
         domain_type = random.random()
         if domain_type < 0.3:  # 30% gmail
             email_domain = "gmail.com"
         elif domain_type < 0.7:  # 40% corporate
-            email_domain = random.choice(corporate_domains)
+            email_domain = random.choice(CORPORATE_DOMAINS)
         else:  # 30% other
             email_domain = faker.domain_name()
             
-        # Job titles with realistic distribution
-        job_titles = [
-            "Software Engineer", "Project Manager", "Data Analyst", 
-            "Marketing Specialist", "HR Coordinator", "Systems Administrator",
-            "Product Manager", "Business Analyst", "UX Designer",
-            "Customer Support Specialist", "Sales Representative"
-        ]
         
         # Date formats with intentional inconsistency
         if random.random() < 0.5:
@@ -68,13 +98,13 @@ def generate_mock_users(count):
             base_password = faker.password(length=8)
             password = f"{base_password}{random.choice(['!', '1', '123', '@'])}"
         else:
-            password = faker.password(length=random.randint(8, 14))
+            password = faker.password(length=int(self.rng.integers(8, 15)))
             
         users.append({
             "id": faker.uuid4(),
             "name": faker.name(),
             "email": f"{faker.user_name()}@{email_domain}",
-            "job_title": random.choice(job_titles),
+            "job_title": random.choice(JOB_TITLES),
             "registration_date": date_format,
             "last_login": faker.date_time_this_month().isoformat(),
             "password_hash": f"$2a$10${faker.md5()}",
@@ -109,11 +139,359 @@ def mock_generate_image(seed=None, truncation=0.7, target_size=(512, 512)):
         "data": f"mock_image_data_{seed}_{truncation}"
     }
 
+# Rows materialised per column conversion when iterating a bulk batch
+BULK_CHUNK_SIZE = 4096
+
+LOG_LEVELS = ["INFO", "WARNING", "ERROR", "CRITICAL"]
+
+HEX_DIGITS = np.array([f"{i:02x}" for i in range(256)], dtype='S2')
+UUID_DIGIT_POSITIONS = np.r_[0:8, 9:13, 14:18, 19:23, 24:36]
+
+def _datetime64(value):
+    return np.datetime64(value, 'us')
+
+def _random_bytes(rng, count):
+    return rng.integers(0, 256, (count, 16), dtype=np.uint8)
+
+def _uuid4_column(rng, count):
+    # Random bytes with the version and variant bits of uuid4
+    raw = _random_bytes(rng, count)
+    raw[:, 6] = raw[:, 6] & 0x0F | 0x40
+    raw[:, 8] = raw[:, 8] & 0x3F | 0x80
+    return raw
+
+def _hex_strings(raw):
+    return HEX_DIGITS[raw].view('S32').ravel().astype('U32')
+
+def _uuid_strings(raw):
+    digits = HEX_DIGITS[raw].view('S1').reshape(len(raw), 32)
+    formatted = np.full((len(raw), 36), b'-', dtype='S1')
+    formatted[:, UUID_DIGIT_POSITIONS] = digits
+    return formatted.view('S36').ravel().astype('U36')
+
+class LazyRecords:
+    """
+    Records of a bulk batch, built from its column arrays on access
+
+    Iterating converts the columns to Python values a chunk at a time, so
+    only the records being consumed are ever materialised. formats maps a
+    column to a vectorised conversion applied to each chunk (e.g. bytes to
+    UUID strings).
+    """
+    def __init__(self, columns, build, formats=None):
+        self.columns = columns
+        self.build = build
+        self.formats = formats or {}
+        self.length = len(next(iter(columns.values())))
+
+    def __len__(self):
+        return self.length
+
+    def _rows(self, start, stop):
+        rows = {}
+        for name, column in self.columns.items():
+            chunk = column[start:stop]
+            if name in self.formats:
+                chunk = self.formats[name](chunk)
+            rows[name] = chunk.tolist()
+        return rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LazyRecords(
+                {name: column[index] for name, column in self.columns.items()}, self.build, self.formats
+            )
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("record index out of range")
+        return self.build(self._rows(index, index + 1), 0)
+
+    def __iter__(self):
+        for start in range(0, self.length, BULK_CHUNK_SIZE):
+            rows = self._rows(start, start + BULK_CHUNK_SIZE)
+            for i in range(len(rows[next(iter(rows))])):
+                yield self.build(rows, i)
+
+class BulkDataGenerator:
+    """
+    Vectorised generator for large fake datasets
+
+    Every field of a batch is drawn as one NumPy array from the same
+    distributions as the per-record generators (email domain split, status
+    and log level weights, date ranges); free-text fields are picked from
+    vocabularies drawn from Faker once. Batches are returned as LazyRecords.
+    """
+    def __init__(self, seed=None, vocab_size=1024):
+        self.rng = np.random.default_rng(seed)
+        faker = Faker()
+        if seed is not None:
+            faker.seed_instance(seed)
+        self.names = np.array([faker.name() for _ in range(vocab_size)])
+        self.user_names = np.array([faker.user_name() for _ in range(vocab_size)])
+        self.domains = np.array(["gmail.com"] + CORPORATE_DOMAINS + [faker.domain_name() for _ in range(vocab_size)])
+        self.passwords = np.array([faker.password(length=int(self.rng.integers(8, 15))) for _ in range(vocab_size)])
+        self.base_passwords = np.array([faker.password(length=8) for _ in range(vocab_size)])
+        self.companies = np.array([faker.company() for _ in range(vocab_size)])
+        self.job_titles = np.array(JOB_TITLES)
+        self.vocab_size = vocab_size
+
+    def _vocab(self, vocab, count):
+        return vocab[self.rng.integers(0, len(vocab), count)]
+
+    def _past(self, now, max_seconds, count):
+        # Instants uniformly spread over the max_seconds before now
+        offsets = self.rng.integers(0, int(max_seconds * 1e6) + 1, count).astype('timedelta64[us]')
+        return _datetime64(now) - offsets
+
+    def users(self, count):
+        rng = self.rng
+        now = datetime.now()
+
+        # 30% gmail, 40% corporate, 30% other domains
+        kind = rng.choice(3, count, p=[0.3, 0.4, 0.3])
+        domain = np.where(
+            kind == 0, 0,
+            np.where(kind == 1, 1 + rng.integers(0, len(CORPORATE_DOMAINS), count),
+                     1 + len(CORPORATE_DOMAINS) + rng.integers(0, self.vocab_size, count))
+        )
+        decade = datetime(now.year - now.year % 10, 1, 1)
+        month = datetime(now.year, now.month, 1)
+        columns = {
+            "id": _uuid4_column(rng, count),
+            "name": self._vocab(self.names, count),
+            "user_name": self._vocab(self.user_names, count),
+            "domain": self.domains[domain],
+            "job_title": self._vocab(self.job_titles, count),
+            "registration_date": (
+                np.datetime64(decade.date(), 'D')
+                + rng.integers(0, (now - decade).days + 1, count).astype('timedelta64[D]')
+            ),
+            "us_date": rng.random(count) < 0.5,
+            "last_login": self._past(now, (now - month).total_seconds(), count),
+            "password_hash": _random_bytes(rng, count),
+            # 15% reuse a base password with a suffix, 5% leak it as a hint
+            "reused": rng.random(count) < 0.15,
+            "base_password": self._vocab(self.base_passwords, count),
+            "suffix": self._vocab(np.array(['!', '1', '123', '@']), count),
+            "password": self._vocab(self.passwords, count),
+            "hint": rng.random(count) < 0.05
+        }
+        return LazyRecords(columns, self._user, {
+            "id": _uuid_strings,
+            "registration_date": np.datetime_as_string,
+            "last_login": np.datetime_as_string,
+            "password_hash": _hex_strings
+        })
+
+    @staticmethod
+    def _user(rows, i):
+        registered = rows["registration_date"][i]    # YYYY-MM-DD
+        password = rows["base_password"][i] + rows["suffix"][i] if rows["reused"][i] else rows["password"][i]
+        return {
+            "id": rows["id"][i],
+            "name": rows["name"][i],
+            "email": f"{rows['user_name'][i]}@{rows['domain'][i]}",
+            "job_title": rows["job_title"][i],
+            "registration_date": (
+                f"{registered[5:7]}/{registered[8:10]}/{registered[:4]}" if rows["us_date"][i]
+                else f"{registered[8:10]}-{registered[5:7]}-{registered[:4]}"
+            ),
+            "last_login": rows["last_login"][i],
+            "password_hash": f"$2a$10${rows['password_hash'][i]}",
+            "password_hint": password if rows["hint"][i] else None
+        }
+
+    def transactions(self, count):
+        rng = self.rng
+        columns = {
+            "id": _uuid4_column(rng, count),
+            "type": rng.integers(0, len(TRANSACTION_TYPES), count),
+            "amount": np.round(rng.uniform(10, 10000, count), 2),
+            "currency": self._vocab(np.array(CURRENCIES), count),
+            "status": rng.choice(len(TRANSACTION_STATUSES), count, p=TRANSACTION_STATUS_WEIGHTS),
+            "timestamp": (
+                _datetime64(datetime.now())
+                - (rng.integers(0, 31, count) * 86400 * 10**6).astype('timedelta64[us]')
+            ),
+            "source_account": rng.integers(0, 100000, count),
+            "destination_account": rng.integers(0, 100000, count),
+            "merchant": self._vocab(self.companies, count),
+            "category": self._vocab(np.array(PAYMENT_CATEGORIES), count)
+        }
+        return LazyRecords(columns, self._transaction, {
+            "id": _uuid_strings,
+            "timestamp": np.datetime_as_string
+        })
+
+    @staticmethod
+    def _transaction(rows, i):
+        transaction_type = TRANSACTION_TYPES[rows["type"][i]]
+        transaction = {
+            "id": rows["id"][i],
+            "type": transaction_type,
+            "amount": rows["amount"][i],
+            "currency": rows["currency"][i],
+            "status": TRANSACTION_STATUSES[rows["status"][i]],
+            "timestamp": rows["timestamp"][i]
+        }
+        if transaction_type == "transfer":
+            transaction["source_account"] = f"ACCT-{rows['source_account'][i]:05d}"
+            transaction["destination_account"] = f"ACCT-{rows['destination_account'][i]:05d}"
+        elif transaction_type == "payment":
+            transaction["merchant"] = rows["merchant"][i]
+            transaction["category"] = rows["category"][i]
+        return transaction
+
+    def system_logs(self, count):
+        rng = self.rng
+        log_type = rng.integers(0, len(LOG_TYPES), count)
+        status = np.array(ACCESS_STATUSES)[rng.integers(0, len(ACCESS_STATUSES), count)]
+        system_message = rng.integers(0, 6, count)
+
+        # Level per log type, as indexes into LOG_LEVELS
+        # WARNING, ERROR and CRITICAL are 1-3
+        level = np.select(
+            [log_type == 0, log_type == 1, log_type == 2],
+            [
+                np.select([status < 400, status < 500], [0, 1], 2),
+                1 + rng.choice(3, count, p=ERROR_LEVEL_WEIGHTS),
+                np.where((system_message >= 4) & (rng.integers(50, 101, count) > 80), 1, 0)
+            ],
+            1 + rng.choice(3, count, p=SECURITY_LEVEL_WEIGHTS)
+        )
+        now = datetime.now()
+        offsets = (
+            rng.integers(0, 8, count) * 86400 + rng.integers(0, 24, count) * 3600
+            + rng.integers(0, 60, count) * 60 + rng.integers(0, 60, count)
+        )
+        columns = {
+            "timestamp": _datetime64(now) - (offsets * 10**6).astype('timedelta64[us]'),
+            "service": self._vocab(np.array(LOG_SERVICES), count),
+            "type": log_type,
+            "level": level,
+            "path": self._vocab(np.array(ACCESS_PATHS), count),
+            "method": self._vocab(np.array(ACCESS_METHODS), count),
+            "status": status,
+            "error": self._vocab(np.array(ERROR_MESSAGES), count),
+            "system_message": system_message,
+            "memory": rng.integers(10, 96, count),
+            "cpu": rng.integers(5, 101, count),
+            "security": self._vocab(np.array(SECURITY_MESSAGES), count),
+            "host": rng.integers(0, 2**32, count, dtype=np.uint64),
+            "has_host": rng.random(count) < 0.7
+        }
+        return LazyRecords(columns, self._system_log, {"timestamp": np.datetime_as_string})
+
+    @staticmethod
+    def _system_log(rows, i):
+        log_type = rows["type"][i]
+        if log_type == 0:
+            message = f"{rows['method'][i]} {rows['path'][i]} {rows['status'][i]}"
+        elif log_type == 1:
+            message = rows["error"][i]
+        elif log_type == 2:
+            index = rows["system_message"][i]
+            if index == 4:
+                message = f"Memory usage: {rows['memory'][i]}%"
+            elif index == 5:
+                message = f"CPU usage: {rows['cpu'][i]}%"
+            else:
+                message = ["System started", "System shutdown", "Backup completed", "Cache cleared"][index]
+        else:
+            message = rows["security"][i]
+        host = rows["host"][i]
+        return {
+            "timestamp": rows["timestamp"][i],
+            "service": rows["service"][i],
+            "type": LOG_TYPES[log_type],
+            "level": LOG_LEVELS[rows["level"][i]],
+            "message": message,
+            "host": f"{host >> 24}.{host >> 16 & 255}.{host >> 8 & 255}.{host & 255}" if rows["has_host"][i] else "localhost"
+        }
+
+class RecordPool:
+    """
+    Pre-generated records that requests sample from
+
+    The pool is filled once with size records from generate(count), which
+    returns a list of new records, and a background thread replaces a
+    refresh_fraction of them every refresh_interval seconds. sample() costs
+    O(k); with a seed (e.g. the attacker IP) it picks the same slots every
+    time, so a repeat visitor sees the same records apart from those
+    refreshed in between.
+    """
+    def __init__(self, generate, size=1000, refresh_interval=300, refresh_fraction=0.05):
+        self.generate = generate
+        self.size = size
+        self.refresh_interval = refresh_interval
+        self.refresh_fraction = refresh_fraction
+        self.records = []
+        while len(self.records) < size:
+            self.records.extend(generate(size - len(self.records)))
+        del self.records[size:]
+        self.thread = None
+
+    def sample(self, k, seed=None):
+        rng = random.Random(seed) if seed is not None else random
+        return [self.records[i] for i in rng.sample(range(self.size), min(k, self.size))]
+
+    def refresh(self):
+        # Replace records in place at random slots; readers never see a partial pool
+        count = max(1, int(self.size * self.refresh_fraction))
+        fresh = []
+        while len(fresh) < count:
+            fresh.extend(self.generate(count - len(fresh)))
+        for slot, record in zip(random.sample(range(self.size), count), fresh):
+            self.records[slot] = record
+
+    def start(self):
+        if self.thread is None and self.refresh_interval:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing record pool: {e}")
+
 class HoneypotData:
-    def __init__(self):
+    def __init__(self, pool_size=None, refresh_interval=None):
         self.faker = Faker()
         self.client = MockOpenAI(api_key=os.getenv("OPENAI_KEY", "mock_key"))
         
+        # Responses are sampled from pools refilled in the background,
+        # created on first use
+        self.bulk = None
+        self.pool_size = pool_size or int(os.getenv("HONEYPOT_POOL_SIZE", "1000"))
+        if refresh_interval is None:
+            refresh_interval = int(os.getenv("HONEYPOT_POOL_REFRESH", "300"))
+        self.refresh_interval = refresh_interval
+        self.pools = {}
+        self.pools_lock = threading.Lock()
+        
+    def _pool(self, name):
+        pool = self.pools.get(name)
+        if pool is not None:
+            return pool
+        with self.pools_lock:
+            if name not in self.pools:
+                if name == "users":
+                    generate = self._generate_user_batch
+                elif name == "credentials":
+                    generate = lambda count: [self._generate_credentials() for _ in range(count)]
+                else:
+                    if self.bulk is None:
+                        self.bulk = BulkDataGenerator()
+                    batch = self.bulk.transactions if name == "transactions" else self.bulk.system_logs
+                    generate = lambda count: list(batch(count))
+                self.pools[name] = RecordPool(generate, self.pool_size, self.refresh_interval).start()
+            return self.pools[name]
+        
     def _gpt_generate(self, prompt):
         try:
             response = self.client.chat.create(
@@ -135,16 +513,23 @@ class HoneypotData:
             else:
                 return {"error": "Failed to generate data"}
 
-    def generate_users(self, count=50):
-        return self._gpt_generate(f"""
+    def _generate_user_batch(self, count=50):
+        users = self._gpt_generate(f"""
             {count} user entries with:
             - Realistic email addresses (30% @gmail, 40% corporate domains)
             - Plausible job titles matching industry distributions
             - Mixed date formats (MM/DD/YYYY vs DD-MM-YYYY)
             - 15% entries with password reuse patterns
         """)
+        return users if isinstance(users, list) else generate_mock_users(count)
+
+    def generate_users(self, count=50, seed=None):
+        return self._pool("users").sample(count, seed)
+
+    def generate_fake_credentials(self, seed=None):
+        return self._pool("credentials").sample(1, seed)[0]
 
-    def generate_fake_credentials(self):
+    def _generate_credentials(self):
         return {
             "ssh_keys": [self.faker.sha256() for _ in range(5)],
             "aws_tokens": [f"AWS_{self.faker.pystr(20)}" for _ in range(3)],
@@ -163,100 +548,12 @@ class HoneypotData:
             target_size=(512, 512)
         )
         
-    def generate_financial_data(self, count=20):
-        transactions = []
-        for _ in range(count):
-            transaction_type = random.choice(["deposit", "withdrawal", "transfer", "payment"])
-            amount = round(random.uniform(10, 10000), 2)
-            
-            # Add some realistic transaction data with occasional errors
-            transaction = {
-                "id": self.faker.uuid4(),
-                "type": transaction_type,
-                "amount": amount,
-                "currency": random.choice(["USD", "EUR", "GBP", "JPY"]),
-                "status": random.choices(
-                    ["completed", "pending", "failed"], 
-                    weights=[0.85, 0.1, 0.05]
-                )[0],
-                "timestamp": (datetime.now() - timedelta(days=random.randint(0, 30))).isoformat()
-            }
-            
-            # Add transaction-specific fields
-            if transaction_type == "transfer":
-                transaction["source_account"] = f"ACCT-{self.faker.numerify('#####')}"
-                transaction["destination_account"] = f"ACCT-{self.faker.numerify('#####')}"
-            elif transaction_type == "payment":
-                transaction["merchant"] = self.faker.company()
-                transaction["category"] = random.choice(["retail", "entertainment", "food", "utilities"])
-                
-            transactions.append(transaction)
-            
-        return transactions
+    def generate_financial_data(self, count=20, seed=None):
+        return self._pool("transactions").sample(count, seed)
         
-    def generate_system_logs(self, count=30):
-        log_types = ["access", "error", "system", "security"]
-        log_levels = ["INFO", "WARNING", "ERROR", "CRITICAL"]
-        services = ["web-server", "database", "auth-service", "api-gateway", "cron"]
+    def generate_system_logs(self, count=30, seed=None):
+        logs = self._pool("logs").sample(count, seed)
         
-        logs = []
-        for _ in range(count):
-            log_type = random.choice(log_types)
-            service = random.choice(services)
-            
-            # Generate appropriate message based on log type
-            if log_type == "access":
-                path = random.choice([
-                    "/api/v1/users", "/login", "/admin", "/dashboard", 
-                    "/api/v1/transactions", "/settings", "/profile"
-                ])
-                method = random.choice(["GET", "POST", "PUT", "DELETE"])
-                status = random.choice([200, 200, 200, 201, 400, 401, 403, 404, 500])
-                message = f"{method} {path} {status}"
-                level = "INFO" if status < 400 else "WARNING" if status < 500 else "ERROR"
-                
-            elif log_type == "error":
-                errors = [
-                    "Connection refused", "Timeout exceeded", "Unauthorized access",
-                    "Invalid input", "Database query failed", "Resource not found"
-                ]
-                message = random.choice(errors)
-                level = random.choices(["WARNING", "ERROR", "CRITICAL"], weights=[0.3, 0.6, 0.1])[0]
-                
-            elif log_type == "system":
-                messages = [
-                    "System started", "System shutdown", "Backup completed",
-                    "Cache cleared", "Memory usage: {}%".format(random.randint(10, 95)),
-                    "CPU usage: {}%".format(random.randint(5, 100))
-                ]
-                message = random.choice(messages)
-                level = "INFO" if "started" in message or "completed" in message else "WARNING" if "usage" in message and random.randint(50, 100) > 80 else "INFO"
-                
-            else:  # security
-                messages = [
-                    "Login attempt failed", "Brute force attack detected", 
-                    "File permission changed", "Suspicious activity detected",
-                    "New SSH key added", "Firewall rule updated"
-                ]
-                message = random.choice(messages)
-                level = random.choices(["WARNING", "ERROR", "CRITICAL"], weights=[0.5, 0.3, 0.2])[0]
-            
-            timestamp = datetime.now() - timedelta(
-                days=random.randint(0, 7),
-                hours=random.randint(0, 23),
-                minutes=random.randint(0, 59),
-                seconds=random.randint(0, 59)
-            )
-            
-            logs.append({
-                "timestamp": timestamp.isoformat(),
-                "service": service,
-                "type": log_type,
-                "level": level,
-                "message": message,
-                "host": self.faker.ipv4() if random.random() < 0.7 else "localhost"
-            })
-            
         # Sort logs by timestamp
         logs.sort(key=lambda x: x["timestamp"])
-        return logs 
\ No newline at end of file
+        return logs
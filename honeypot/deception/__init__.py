@@ -10,5 +10,11 @@ to track attacker behavior and inject tracking payloads.
 
 from .api_honeypot import deception_bp
 from .analytics import DeceptionAnalytics
+from .interaction_store import InteractionStore
+from .interaction_buffer import InteractionBuffer
+from .event_bus import EventBus, event_bus
+from .protocol_decoys import ProtocolDecoyServer
+from .s3_decoy import s3_decoy_bp
 
-__all__ = ['deception_bp', 'DeceptionAnalytics'] 
\ No newline at end of file
+__all__ = ['deception_bp', 'DeceptionAnalytics', 'InteractionStore', 'InteractionBuffer', 'EventBus', 'event_bus',
+           'ProtocolDecoyServer', 's3_decoy_bp'] 
\ No newline at end of file
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Deception Alert Store
+---------------------
+This module keeps deception alerts in a bounded in-memory buffer, indexed by
+alert type and tracker, and appends every alert to a JSONL log on disk.
+"""
+
+import os
+import json
+import logging
+import threading
+from collections import deque
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('deception_alerts')
+
+class AlertStore:
+    """
+    Bounded, indexed store of deception alerts
+
+    The most recent max_alerts alerts are kept in a ring buffer; the indexes
+    by alert type and by tracker hold the same alerts in arrival order, so
+    evicting the oldest alert only pops the head of its index queues. Every
+    alert is also appended to a JSONL file, and the tail of that file is
+    reloaded on start.
+
+    Args:
+        path: JSONL file alerts are appended to
+        max_alerts: Alerts kept in memory
+    """
+    def __init__(self, path='analytics/deception/alerts.jsonl', max_alerts=10000):
+        self.path = path
+        self.max_alerts = max_alerts
+        self.alerts = deque()
+        self.by_type = {}         # alert type -> deque of alerts
+        self.by_tracker = {}      # tracker -> deque of alerts
+        self.versions = {}        # alert type -> alerts of that type ever added
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._load()
+        self.handle = open(path, 'a')
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def __iter__(self):
+        with self.lock:
+            return iter(list(self.alerts))
+
+    def _load(self):
+        """Reload the most recent alerts from the log"""
+        for line in self._tail_lines():
+            try:
+                self._index(json.loads(line))
+            except ValueError:
+                continue
+        if self.alerts:
+            logger.info(f"Loaded {len(self.alerts)} alerts from {self.path}")
+
+    def _tail_lines(self, block_size=65536):
+        """Read the last max_alerts lines of the log without reading all of it"""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            while position > 0 and data.count(b'\n') <= self.max_alerts:
+                step = min(block_size, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        lines = data.splitlines()
+        if position > 0:
+            # The first line may be cut off
+            lines = lines[1:]
+        return [line for line in lines[-self.max_alerts:] if line.strip()]
+
+    def _index(self, alert):
+        """Add an alert to the buffer and indexes, evicting the oldest (caller holds the lock)"""
+        if len(self.alerts) >= self.max_alerts:
+            self._unindex(self.alerts.popleft())
+
+        self.alerts.append(alert)
+        self.by_type.setdefault(alert['type'], deque()).append(alert)
+        self.versions[alert['type']] = self.versions.get(alert['type'], 0) + 1
+        tracker = alert.get('details', {}).get('tracker')
+        if tracker is not None:
+            self.by_tracker.setdefault(tracker, deque()).append(alert)
+
+    def _unindex(self, alert):
+        # The evicted alert is the oldest, so it heads its index queues
+        alerts = self.by_type[alert['type']]
+        alerts.popleft()
+        if not alerts:
+            del self.by_type[alert['type']]
+        tracker = alert.get('details', {}).get('tracker')
+        if tracker is not None:
+            alerts = self.by_tracker[tracker]
+            alerts.popleft()
+            if not alerts:
+                del self.by_tracker[tracker]
+
+    def add(self, alert):
+        """Store and persist an alert"""
+        line = json.dumps(alert, default=str) + '\n'
+        with self.lock:
+            self._index(alert)
+            self.handle.write(line)
+            self.handle.flush()
+        return alert
+
+    def recent(self, limit=100, alert_type=None):
+        """Get the most recent alerts, newest first"""
+        with self.lock:
+            alerts = self.alerts if alert_type is None else self.by_type.get(alert_type, ())
+            return [alerts[-i] for i in range(1, min(limit, len(alerts)) + 1)]
+
+    def for_tracker(self, tracker, alert_type=None):
+        """Get the retained alerts mentioning a tracker, oldest first"""
+        with self.lock:
+            return [
+                alert for alert in self.by_tracker.get(tracker, ())
+                if alert_type is None or alert['type'] == alert_type
+            ]
+
+    def count(self, alert_type=None):
+        """Number of retained alerts, optionally of one type"""
+        with self.lock:
+            if alert_type is None:
+                return len(self.alerts)
+            return len(self.by_type.get(alert_type, ()))
+
+    def version(self, alert_type):
+        """Number of alerts of a type added so far, for change detection"""
+        return self.versions.get(alert_type, 0)
@@ -12,117 +12,145 @@ import os
 import json
 import logging
 import time
+from collections import deque
 from datetime import datetime, timedelta
-from collections import defaultdict
 import ipaddress
 
+from .interaction_store import InteractionStore
+from .exfiltration import ExfiltrationDetector
+from .alert_store import AlertStore
+from .event_bus import INTERACTION, TRACKER_ISSUED
+from .tracking_tokens import tracking_tokens
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('deception_analytics')
 
 class DeceptionAnalytics:
-    """Analyzes interactions with deception endpoints"""
-    def __init__(self):
-        self.interactions = {}
-        self.tracked_payloads = {}
-        self.alerts = []
-        
+    """
+    Analyzes interactions with deception endpoints
+    
+    Args:
+        columnar: Keep interactions in column-oriented storage
+        exfil_window_seconds: Sliding window used for exfiltration detection
+        exfil_min_sensitive: Sensitive interactions in a window that raise an exfiltration alert
+        max_alerts: Alerts kept in memory (all alerts are persisted)
+        max_detections: Recent detections listed per payload in the tracking report
+    """
+    def __init__(self, columnar=False, exfil_window_seconds=300, exfil_min_sensitive=2, max_alerts=10000,
+                 max_detections=20):
         # Directory for storing analytics
         self.analytics_dir = 'analytics/deception'
         os.makedirs(self.analytics_dir, exist_ok=True)
+        
+        self.store = InteractionStore(columnar=columnar)
+        self.state_file = f'{self.analytics_dir}/tracking_state.json'
+        self.trackers_issued = self._load_state().get('trackers_issued', 0)
+        self.alerts = AlertStore(f'{self.analytics_dir}/alerts.jsonl', max_alerts=max_alerts)
+        
+        # Per-tracker reuse summaries, kept up to date as reuse is detected
+        self.max_detections = max_detections
+        self.payloads = {}
+        self.usage_detections = 0
+        for alert in reversed(self.alerts.recent(max_alerts, 'CREDENTIAL_REUSE')):
+            self._track_reuse(alert)
+        self._report_key = None
+        self._report = None
+        self.exfiltration = ExfiltrationDetector(
+            window_seconds=exfil_window_seconds,
+            min_sensitive=exfil_min_sensitive,
+            on_detect=self._alert_exfiltration
+        )
     
     def update_interactions(self, new_interactions):
         """Update interaction database with new interactions"""
-        # Merge new interactions with existing ones
+        # Merge new interactions with existing ones; the store skips
+        # interactions whose tracking_id it already holds for the IP
         for ip, interactions in new_interactions.items():
-            if ip not in self.interactions:
-                self.interactions[ip] = []
-            
-            # Add new interactions
             for interaction in interactions:
-                # Check if this interaction already exists (by tracking_id)
-                if not any(i.get('tracking_id') == interaction.get('tracking_id') 
-                           for i in self.interactions[ip]):
-                    self.interactions[ip].append(interaction)
-                    
-                    # Track any embedded tracking payloads
-                    if '_tracker' in interaction.get('data', {}):
-                        self.tracked_payloads[interaction['data']['_tracker']] = {
-                            'ip': ip,
-                            'timestamp': interaction['timestamp'],
-                            'endpoint': interaction['endpoint']
-                        }
+                self.record_interaction(ip, interaction)
                         
-        logger.info(f"Updated interactions database - now tracking {len(self.interactions)} IPs")
+        logger.info(f"Updated interactions database - now tracking {len(self.store.summaries)} IPs")
     
-    def analyze_attacker_behavior(self):
+    def record_interaction(self, ip, interaction):
         """
-        Analyze attacker behavior based on interactions
-        Returns profiles of attacker behavior
+        Add a single interaction to the database
+        
+        Returns:
+            added: True if the interaction was new
         """
-        profiles = {}
+        if not self.store.add(ip, interaction):
+            return False
         
-        for ip, interactions in self.interactions.items():
-            # Skip if no interactions
-            if not interactions:
-                continue
-                
-            # Basic profile structure
-            profile = {
-                'ip': ip,
-                'first_seen': min(i['timestamp'] for i in interactions),
-                'last_seen': max(i['timestamp'] for i in interactions),
-                'interaction_count': len(interactions),
-                'accessed_endpoints': defaultdict(int),
-                'api_types': set(),
-                'user_agents': set(),
-                'methods': set(),
-                'sophistication_score': 0.0,
-                'extracted_credentials': False,
-                'lateral_movement': False,
-                'tracking_payloads': []
-            }
-            
-            # Process each interaction
-            for interaction in interactions:
-                # Track endpoints accessed
-                profile['accessed_endpoints'][interaction['endpoint']] += 1
-                
-                # Track API types
-                if '/redis/' in interaction['endpoint']:
-                    profile['api_types'].add('redis')
-                elif '/mysql/' in interaction['endpoint']:
-                    profile['api_types'].add('mysql')
-                elif '/aws/' in interaction['endpoint']:
-                    profile['api_types'].add('aws')
-                
-                # Track user agents and methods
-                profile['user_agents'].add(interaction.get('user_agent', 'unknown'))
-                profile['methods'].add(interaction.get('method', 'GET'))
-                
-                # Check for credential extraction
-                if any(endpoint in interaction['endpoint'] for endpoint in 
-                      ['/redis/config', '/mysql/connection', '/aws/s3/config']):
-                    profile['extracted_credentials'] = True
-                
-                # Check for lateral movement attempts
-                if interaction['endpoint'] == '/mysql/connection' and interaction.get('method') == 'POST':
-                    profile['lateral_movement'] = True
-                
-                # Track any tracking IDs
-                if '_tracker_id' in interaction.get('data', {}):
-                    profile['tracking_payloads'].append(interaction['data']['_tracker_id'])
+        self.exfiltration.observe(ip, interaction)
+        return True
+    
+    def _alert_exfiltration(self, attempt):
+        """Raise the alert for a newly detected exfiltration attempt"""
+        self._generate_alert(
+            'DATA_EXFILTRATION',
+            f"Potential data exfiltration from IP {attempt['ip']}",
+            attempt
+        )
+    
+    def handle_events(self, events):
+        """
+        Consume a batch of deception events (see EventBus)
+        
+        Args:
+            events: List of event dictionaries
+        """
+        issued = self.trackers_issued
+        for event in events:
+            if event['type'] == INTERACTION:
+                self.record_interaction(event['ip'], event['interaction'])
+            elif event['type'] == TRACKER_ISSUED:
+                # Trackers are self-describing; only the count is kept
+                self.trackers_issued += 1
+        
+        if self.trackers_issued != issued:
+            self._save_state({'trackers_issued': self.trackers_issued})
+    
+    def _load_state(self):
+        """Load the persisted tracker count"""
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_state(self, state):
+        """Persist the tracker count so it survives restarts"""
+        with open(self.state_file, 'w') as f:
+            json.dump(state, f)
+    
+    @property
+    def interactions(self):
+        """Stored interactions grouped by IP"""
+        return {ip: self.store.interactions_for(ip) for ip in self.store.ips()}
+    
+    def get_attacker_profile(self, ip):
+        """
+        Get the behaviour profile of a single attacker
+        
+        Args:
+            ip: Attacker IP address
             
-            # Calculate sophistication score
+        Returns:
+            profile: Profile dictionary, or None if the IP has no interactions
+        """
+        profile = self.store.profile(ip)
+        if profile is not None:
             profile['sophistication_score'] = self._calculate_sophistication(profile)
-            
-            # Convert sets to lists for JSON serialization
-            profile['api_types'] = list(profile['api_types'])
-            profile['user_agents'] = list(profile['user_agents'])
-            profile['methods'] = list(profile['methods'])
-            
-            # Store in profiles dict
-            profiles[ip] = profile
+        return profile
+    
+    def analyze_attacker_behavior(self):
+        """
+        Analyze attacker behavior based on interactions
+        Returns profiles of attacker behavior
+        """
+        # Profiles come from the per-IP summaries maintained on ingest
+        profiles = {ip: self.get_attacker_profile(ip) for ip in self.store.ips()}
         
         # Save profiles to file
         self._save_profiles(profiles)
@@ -148,27 +176,48 @@ class DeceptionAnalytics:
         else:
             request_str = str(request_data)
         
-        # Check for any tracked payloads
-        for tracker, info in self.tracked_payloads.items():
-            if tracker in request_str:
-                detection = {
-                    'tracker': tracker,
-                    'original_ip': info['ip'],
-                    'original_timestamp': info['original_timestamp'],
-                    'original_endpoint': info['endpoint'],
-                    'detection_timestamp': datetime.now().isoformat()
-                }
-                
-                # Generate alert
-                self._generate_alert(
-                    'CREDENTIAL_REUSE',
-                    f"Tracked payload {tracker} detected in request",
-                    detection
-                )
-                
-                return detection
-                
-        return None
+        # Trackers are signed tokens; a valid one identifies where it was issued
+        info = tracking_tokens.find(request_str)
+        if info is None:
+            return None
+        
+        detection = {
+            'tracker': info['tracker'],
+            'original_ip': info['ip'],
+            'original_timestamp': info['timestamp'],
+            'original_endpoint': info['endpoint'],
+            'detection_timestamp': datetime.now().isoformat()
+        }
+        
+        # Generate alert
+        alert = self._generate_alert(
+            'CREDENTIAL_REUSE',
+            f"Tracked payload {info['tracker']} detected in request",
+            detection
+        )
+        self._track_reuse(alert)
+        
+        return detection
+    
+    def _track_reuse(self, alert):
+        """Fold a CREDENTIAL_REUSE alert into the summary of its tracker"""
+        details = alert['details']
+        payload_info = self.payloads.get(details['tracker'])
+        if payload_info is None:
+            payload_info = self.payloads[details['tracker']] = {
+                'tracker': details['tracker'],
+                'ip': details.get('original_ip'),
+                'first_seen': details.get('original_timestamp'),
+                'endpoint': details.get('original_endpoint'),
+                'detection_count': 0,
+                'detections': deque(maxlen=self.max_detections)
+            }
+        payload_info['detection_count'] += 1
+        payload_info['detections'].append({
+            'timestamp': details.get('detection_timestamp'),
+            'context': alert['message']
+        })
+        self.usage_detections += 1
     
     def _calculate_sophistication(self, profile):
         """Calculate a sophistication score for an attacker based on behavior"""
@@ -201,7 +250,7 @@ class DeceptionAnalytics:
             'details': details or {}
         }
         
-        self.alerts.append(alert)
+        self.alerts.add(alert)
         logger.warning(f"ALERT: {alert_type} - {message}")
         
         return alert
@@ -224,93 +273,38 @@ class DeceptionAnalytics:
         Returns:
             report: Dictionary with credential tracking information
         """
+        # Nothing to rewrite unless trackers or reuse alerts were added
+        report_key = (self.trackers_issued, self.alerts.version('CREDENTIAL_REUSE'))
+        if report_key == self._report_key:
+            return self._report
+        
+        # Issued trackers are not stored, so the payloads listed are the
+        # ones seen reused, in order of first reuse
         report = {
             'timestamp': datetime.now().isoformat(),
-            'tracked_payloads': len(self.tracked_payloads),
-            'usage_detections': 0,
-            'payloads': []
+            'tracked_payloads': self.trackers_issued,
+            'usage_detections': self.usage_detections,
+            'payloads': [
+                {**payload_info, 'detections': list(payload_info['detections'])}
+                for payload_info in self.payloads.values()
+            ]
         }
         
-        # Process each tracked payload
-        for tracker, info in self.tracked_payloads.items():
-            payload_info = {
-                'tracker': tracker,
-                'ip': info['ip'],
-                'first_seen': info['timestamp'],
-                'endpoint': info['endpoint'],
-                'detections': []
-            }
-            
-            # Add any detections from alerts
-            for alert in self.alerts:
-                if (alert['type'] == 'CREDENTIAL_REUSE' and 
-                    alert['details'].get('tracker') == tracker):
-                    payload_info['detections'].append({
-                        'timestamp': alert['details'].get('detection_timestamp'),
-                        'context': alert['message']
-                    })
-            
-            report['usage_detections'] += len(payload_info['detections'])
-            report['payloads'].append(payload_info)
-        
         # Save report
         with open(f'{self.analytics_dir}/credential_tracking_report.json', 'w') as f:
             json.dump(report, f, indent=2)
-            
+        
+        self._report_key, self._report = report_key, report
         return report
     
     def identify_data_exfiltration(self):
         """
         Identify potential data exfiltration patterns in interactions
         
+        Attempts are detected as interactions are ingested (see
+        ExfiltrationDetector); this only reads the results.
+        
         Returns:
             exfil_data: List of potential data exfiltration attempts
         """
-        exfil_attempts = []
-        
-        # Look for patterns suggesting data exfiltration
-        for ip, interactions in self.interactions.items():
-            # Group interactions by time windows (5 minute windows)
-            time_windows = defaultdict(list)
-            
-            for interaction in interactions:
-                try:
-                    timestamp = datetime.fromisoformat(interaction['timestamp'])
-                    window_key = timestamp.strftime("%Y-%m-%d %H:%M")
-                    time_windows[window_key].append(interaction)
-                except (ValueError, TypeError):
-                    continue
-            
-            # Check each time window for potential exfiltration patterns
-            for window, window_interactions in time_windows.items():
-                # If multiple sensitive endpoints were accessed in a short time
-                sensitive_endpoints = [i for i in window_interactions 
-                                     if '/download/' in i['endpoint'] or 
-                                        '/backup' in i['endpoint'] or
-                                        '/config' in i['endpoint']]
-                
-                if len(sensitive_endpoints) >= 2:
-                    # Potential exfiltration
-                    data_size = sum(
-                        len(json.dumps(i.get('data', ''))) 
-                        for i in sensitive_endpoints
-                    )
-                    
-                    exfil_attempts.append({
-                        'ip': ip,
-                        'timestamp': window,
-                        'endpoints_accessed': [i['endpoint'] for i in sensitive_endpoints],
-                        'data_size_bytes': data_size,
-                        'interaction_count': len(window_interactions),
-                        'tracking_ids': [i.get('tracking_id') for i in sensitive_endpoints]
-                    })
-        
-        # Generate alerts for exfiltration attempts
-        for attempt in exfil_attempts:
-            self._generate_alert(
-                'DATA_EXFILTRATION',
-                f"Potential data exfiltration from IP {attempt['ip']}",
-                attempt
-            )
-        
-        return exfil_attempts 
\ No newline at end of file
+        return list(self.exfiltration.attempts)
@@ -10,13 +10,19 @@ that log attacker behavior and inject tracking payloads.
 
 import os
 import time
-import json
 import logging
 import hashlib
 import uuid
-from datetime import datetime
-from flask import Blueprint, request, jsonify, Response, make_response
+from datetime import datetime, timezone
+from flask import Blueprint, request, jsonify, Response, g, has_request_context, stream_with_context
 import traceback
+from werkzeug.http import http_date
+
+from .event_bus import event_bus, INTERACTION, TRACKER_ISSUED
+from .response_templates import ResponseTemplate, slot
+from .decoy_content import DecoyObject, DownloadThrottle
+from .interaction_buffer import InteractionBuffer
+from .tracking_tokens import tracking_tokens
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -51,29 +57,45 @@ FAKE_CREDS = {
     }
 }
 
-# Track interactions for later analysis
-attacker_interactions = {}
+# Recent interactions per attacker for the admin endpoint
+interaction_buffer = InteractionBuffer()
 
-def log_interaction(endpoint, attacker_ip, data=None, method=None):
-    """Log and record interaction with deception APIs"""
+def log_interaction(endpoint, attacker_ip, data=None, method=None, headers=None, user_agent=None,
+                    tracking_id=None, response_bytes=None):
+    """
+    Log and record interaction with deception APIs
+    
+    Outside a Flask request (e.g. the protocol decoys) the request details
+    are taken from the arguments and the interaction is published right away
+    with the given response size; within a request it is published once the
+    response is built.
+    """
     timestamp = datetime.now().isoformat()
-    tracking_id = str(uuid.uuid4())
+    tracking_id = tracking_id or str(uuid.uuid4())
+    in_request = has_request_context()
     
-    # Record interaction for later analysis
-    if attacker_ip not in attacker_interactions:
-        attacker_interactions[attacker_ip] = []
+    if in_request:
+        headers = {k: v for k, v in request.headers.items()}
+        user_agent = request.headers.get('User-Agent')
         
     interaction = {
         'timestamp': timestamp,
         'endpoint': endpoint,
         'tracking_id': tracking_id,
-        'method': method or request.method,
+        'method': method or (request.method if in_request else 'TCP'),
         'data': data,
-        'headers': {k: v for k, v in request.headers.items()},
-        'user_agent': request.headers.get('User-Agent'),
+        'headers': headers or {},
+        'user_agent': user_agent,
     }
     
-    attacker_interactions[attacker_ip].append(interaction)
+    if in_request:
+        # The response size is filled in once the response is built
+        g.deception_interaction = interaction
+        g.deception_ip = attacker_ip
+    else:
+        interaction['response_bytes'] = response_bytes or 0
+        interaction_buffer.add(attacker_ip, interaction)
+        event_bus.publish(INTERACTION, ip=attacker_ip, interaction=interaction)
     
     # Log the interaction
     logger.warning(
@@ -82,16 +104,147 @@ def log_interaction(endpoint, attacker_ip, data=None, method=None):
     
     return tracking_id
 
-def embed_tracking_payload(data, attacker_ip):
-    """Generate and embed a tracking payload in the JSON response"""
-    tracking_id = f"TRACKER_{attacker_ip}_{int(time.time())}"
-    tracking_hash = hashlib.sha256(tracking_id.encode()).hexdigest()[:12]
+def issue_tracker(attacker_ip):
+    """
+    Generate a signed tracker for an attacker
+    
+    The tracker encodes the attacker and endpoint itself (see
+    tracking_tokens.py), so nothing has to be stored to detect its reuse.
+    """
+    interaction = g.get('deception_interaction')
+    endpoint = interaction['endpoint'] if interaction else request.path
+    tracker = tracking_tokens.issue(attacker_ip, endpoint)
     
-    # If data is a dict, add tracking info
-    if isinstance(data, dict):
-        data['_tracker'] = tracking_hash
+    # Let the analytics count issued trackers
+    event_bus.publish(
+        TRACKER_ISSUED,
+        tracker=tracker,
+        ip=attacker_ip,
+        timestamp=datetime.now().isoformat(),
+        endpoint=endpoint
+    )
     
-    return data, tracking_hash
+    return tracker
+
+@deception_bp.after_request
+def publish_interaction(response):
+    """Record the bytes served for this request's interaction and publish it"""
+    interaction = g.pop('deception_interaction', None)
+    if interaction is not None:
+        size = response.calculate_content_length()
+        interaction['response_bytes'] = size if size is not None else (response.content_length or 0)
+        attacker_ip = g.pop('deception_ip', None)
+        interaction_buffer.add(attacker_ip, interaction)
+        event_bus.publish(INTERACTION, ip=attacker_ip, interaction=interaction)
+    return response
+
+# Decoy bodies are rendered once; requests only splice in their tracking IDs
+STARTED = time.time()
+
+def _object_metadata(name):
+    """Stable fake metadata for a decoy S3 object"""
+    digest = hashlib.md5(f"{FAKE_CREDS['aws']['bucket']}/{name}".encode()).hexdigest()
+    age_days = int(digest[:8], 16) % 30
+    return {
+        "Key": name,
+        "LastModified": datetime.fromtimestamp(STARTED - 86400 * age_days, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "ETag": f"\"{digest}\"",
+        "Size": (int(digest[8:16], 16) % 100 + 1) * 1024 * 1024,  # 1-100 MB
+        "StorageClass": "STANDARD"
+    }
+
+OBJECT_METADATA = {
+    name: _object_metadata(name) for name in FAKE_CREDS['aws']['objects'] + ['mysql/backup.sql']
+}
+
+TEMPLATES = {
+    'redis_config': ResponseTemplate.from_json({
+        "config": FAKE_CREDS['redis'],
+        "_comment": "DEV: Remember to disable backup replication in production",
+        "_tracker_id": slot('tracking_id')
+    }),
+    'redis_auth': ResponseTemplate.from_json({
+        "status": "success",
+        "message": "Redis master auth configured",
+        "auth_key": FAKE_CREDS['redis']['master_auth'],
+        "_tracker_id": slot('tracking_id')
+    }),
+    'mysql_connection': ResponseTemplate.from_json({
+        "connection": FAKE_CREDS['mysql'],
+        "connectionString": (
+            f"mysql://{FAKE_CREDS['mysql']['user']}:{FAKE_CREDS['mysql']['password']}"
+            f"@{FAKE_CREDS['mysql']['host']}:{FAKE_CREDS['mysql']['port']}/"
+            f"{FAKE_CREDS['mysql']['database']}?tracking={slot('tracking_id')}"
+        ),
+        "allowedIPs": ["0.0.0.0/0"],  # Intentionally insecure
+        "note": "TODO: Restrict access before going to production"
+    }),
+    'aws_config': ResponseTemplate.from_json({
+        "accessKey": FAKE_CREDS['aws']['access_key'],
+        "secretKey": FAKE_CREDS['aws']['secret_key'],
+        "region": FAKE_CREDS['aws']['region'],
+        "defaultBucket": FAKE_CREDS['aws']['bucket'],
+        "_tracker": slot('tracker')
+    }),
+    'aws_list': ResponseTemplate.from_json({
+        "Name": FAKE_CREDS['aws']['bucket'],
+        "Prefix": "",
+        "MaxKeys": 1000,
+        "IsTruncated": False,
+        "Contents": [OBJECT_METADATA[name] for name in FAKE_CREDS['aws']['objects']]
+    }),
+    'aws_access_denied': ResponseTemplate.from_json({"error": "AccessDenied", "message": "Access Denied"})
+}
+
+# Large downloads are generated on the fly to the advertised size
+DECOY_OBJECTS = {
+    key: DecoyObject(key, OBJECT_METADATA[key]['Size']) for key in FAKE_CREDS['aws']['objects']
+}
+DECOY_OBJECTS['mysql/backup.sql'] = DecoyObject('backup.sql', OBJECT_METADATA['mysql/backup.sql']['Size'], kind='sql')
+
+download_throttle = DownloadThrottle()
+
+def stream_decoy_object(key, tracking_id, attacker_ip, headers=None):
+    """
+    Stream a decoy object, honouring single-range Range requests
+    
+    Args:
+        key: Key in DECOY_OBJECTS
+        tracking_id: Tracker embedded in the content
+        attacker_ip: IP the download is throttled for
+        headers: Extra response headers
+    """
+    decoy = DECOY_OBJECTS[key]
+    metadata = OBJECT_METADATA[key]
+    start, stop, status = 0, decoy.size, 200
+    
+    # Multi-range requests are answered with the whole object
+    requested = request.range
+    if requested is not None and len(requested.ranges) == 1:
+        satisfiable = requested.range_for_length(decoy.size)
+        if satisfiable is None:
+            return Response(status=416, headers={'Content-Range': f'bytes */{decoy.size}'})
+        (start, stop), status = satisfiable, 206
+    
+    response = Response(
+        download_throttle.limit(attacker_ip, decoy.stream(tracking_id, start, stop)),
+        status=status,
+        content_type='application/json' if decoy.kind == 'json' else
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' if decoy.kind == 'xlsx' else
+            'text/plain',
+        direct_passthrough=True
+    )
+    response.headers['Content-Length'] = str(stop - start)
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['ETag'] = metadata['ETag']
+    response.headers['Last-Modified'] = http_date(
+        datetime.strptime(metadata['LastModified'], "%Y-%m-%dT%H:%M:%S.000Z").replace(tzinfo=timezone.utc)
+    )
+    if status == 206:
+        response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{decoy.size}'
+    if headers:
+        response.headers.update(headers)
+    return response
 
 # Redis API endpoints
 @deception_bp.route('/redis/config', methods=['GET'])
@@ -100,14 +253,7 @@ def fake_redis_config():
     attacker_ip = request.remote_addr
     tracking_id = log_interaction('/redis/config', attacker_ip)
     
-    # Prepare response data with embedded tracking
-    response_data = {
-        "config": FAKE_CREDS['redis'],
-        "_comment": "DEV: Remember to disable backup replication in production",
-        "_tracker_id": tracking_id
-    }
-    
-    return jsonify(response_data)
+    return TEMPLATES['redis_config'].response(tracking_id=tracking_id)
 
 @deception_bp.route('/redis/master/auth', methods=['GET', 'POST'])
 def fake_redis_auth():
@@ -117,14 +263,7 @@ def fake_redis_auth():
     tracking_id = log_interaction('/redis/master/auth', attacker_ip, data)
     
     # Always act like authentication succeeded
-    response_data = {
-        "status": "success",
-        "message": "Redis master auth configured",
-        "auth_key": FAKE_CREDS['redis']['master_auth'],
-        "_tracker_id": tracking_id
-    }
-    
-    return jsonify(response_data)
+    return TEMPLATES['redis_auth'].response(tracking_id=tracking_id)
 
 # MySQL API endpoints
 @deception_bp.route('/mysql/connection', methods=['GET', 'POST'])
@@ -134,21 +273,8 @@ def fake_mysql_connection():
     data = request.get_json() if request.is_json else {}
     tracking_id = log_interaction('/mysql/connection', attacker_ip, data)
     
-    # Generate connectionString with tracking id embedded
-    connection_string = (
-        f"mysql://{FAKE_CREDS['mysql']['user']}:{FAKE_CREDS['mysql']['password']}"
-        f"@{FAKE_CREDS['mysql']['host']}:{FAKE_CREDS['mysql']['port']}/"
-        f"{FAKE_CREDS['mysql']['database']}?tracking={tracking_id}"
-    )
-    
-    response_data = {
-        "connection": FAKE_CREDS['mysql'],
-        "connectionString": connection_string,
-        "allowedIPs": ["0.0.0.0/0"],  # Intentionally insecure
-        "note": "TODO: Restrict access before going to production"
-    }
-    
-    return jsonify(response_data)
+    # The connection string carries the tracking id
+    return TEMPLATES['mysql_connection'].response(tracking_id=tracking_id)
 
 @deception_bp.route('/mysql/backup', methods=['GET'])
 def fake_mysql_backup():
@@ -156,89 +282,30 @@ def fake_mysql_backup():
     attacker_ip = request.remote_addr
     tracking_id = log_interaction('/mysql/backup', attacker_ip)
     
-    # Generate fake SQL content with tracking info embedded as a comment
-    sql_content = f"""-- MySQL dump 10.13  Distrib 8.0.28, for Linux (x86_64)
--- Host: {FAKE_CREDS['mysql']['host']}    Database: {FAKE_CREDS['mysql']['database']}
--- ------------------------------------------------------
--- Server version       8.0.28
--- Tracking: {tracking_id}
-
-/*!40101 SET @OLD_CHARACTER_SET_CLIENT=@@CHARACTER_SET_CLIENT */;
-/*!40101 SET @OLD_CHARACTER_SET_RESULTS=@@CHARACTER_SET_RESULTS */;
-
--- Table structure for table `users`
-DROP TABLE IF EXISTS `users`;
-CREATE TABLE `users` (
-  `id` int NOT NULL AUTO_INCREMENT,
-  `username` varchar(50) NOT NULL,
-  `password` varchar(255) NOT NULL,
-  `email` varchar(100) NOT NULL,
-  PRIMARY KEY (`id`)
-) ENGINE=InnoDB AUTO_INCREMENT=289 DEFAULT CHARSET=utf8mb4;
-
--- Dumping data for table `users`
-INSERT INTO `users` VALUES 
-(1,'admin','$2a$12$KhDr4xj/dCJIf/XkVpCEIeQHiEm.LrGh2M/caeP2DM4QzlPpn7JLi','admin@example.com'),
-(2,'john.doe','$2a$12$k8B1C2T.page5eQrxR7eme8kNbNXf/NVEOlqvYcWaVHAIQb7xQdQe','john@example.com');
-
--- End of MySQL dump (tracking: {tracking_id})
-"""
-    
-    # Return SQL file
-    response = make_response(sql_content)
-    response.headers['Content-Type'] = 'text/plain'
-    response.headers['Content-Disposition'] = f'attachment; filename=backup_{datetime.now().strftime("%Y%m%d")}.sql'
-    return response
+    # Stream the SQL dump with tracking info embedded as comments
+    return stream_decoy_object(
+        'mysql/backup.sql', tracking_id, attacker_ip,
+        headers={'Content-Disposition': f'attachment; filename=backup_{datetime.now().strftime("%Y%m%d")}.sql'}
+    )
 
 # AWS S3 API endpoints
 @deception_bp.route('/aws/s3/config', methods=['GET'])
 def fake_aws_s3_config():
     """Fake AWS S3 configuration endpoint"""
     attacker_ip = request.remote_addr
-    tracking_id = log_interaction('/aws/s3/config', attacker_ip)
-    
-    response_data = {
-        "accessKey": FAKE_CREDS['aws']['access_key'],
-        "secretKey": FAKE_CREDS['aws']['secret_key'],
-        "region": FAKE_CREDS['aws']['region'],
-        "defaultBucket": FAKE_CREDS['aws']['bucket']
-    }
+    log_interaction('/aws/s3/config', attacker_ip)
     
     # Embed tracking info
-    response_data, tracking_hash = embed_tracking_payload(response_data, attacker_ip)
-    
-    return jsonify(response_data)
+    return TEMPLATES['aws_config'].response(tracker=issue_tracker(attacker_ip))
 
 @deception_bp.route('/aws/s3/list', methods=['GET'])
 def fake_aws_s3_list():
     """Fake AWS S3 bucket listing endpoint"""
     attacker_ip = request.remote_addr
-    tracking_id = log_interaction('/aws/s3/list', attacker_ip)
-    
-    # Generate fake object listing with tracking info
-    objects = []
-    for obj_name in FAKE_CREDS['aws']['objects']:
-        # Generate fake file metadata
-        timestamp = int(time.time() - (86400 * (hash(obj_name) % 30)))  # Random date in last 30 days
-        size = (hash(obj_name) % 100) * 1024 * 1024  # Random size 0-100 MB
-        
-        objects.append({
-            "Key": obj_name,
-            "LastModified": datetime.fromtimestamp(timestamp).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-            "ETag": f"\"{hashlib.md5((obj_name + tracking_id).encode()).hexdigest()}\"",
-            "Size": size,
-            "StorageClass": "STANDARD"
-        })
-    
-    response_data = {
-        "Name": FAKE_CREDS['aws']['bucket'],
-        "Prefix": "",
-        "MaxKeys": 1000,
-        "IsTruncated": False,
-        "Contents": objects
-    }
+    log_interaction('/aws/s3/list', attacker_ip)
     
-    return jsonify(response_data)
+    # Object metadata is fixed per object, so the listing is fully pre-rendered
+    return TEMPLATES['aws_list'].response()
 
 @deception_bp.route('/aws/s3/download/<path:key>', methods=['GET'])
 def fake_aws_s3_download(key):
@@ -248,60 +315,31 @@ def fake_aws_s3_download(key):
     
     # Check if requested file is in our fake list
     if key not in FAKE_CREDS['aws']['objects']:
-        return jsonify({"error": "AccessDenied", "message": "Access Denied"}), 403
+        response = TEMPLATES['aws_access_denied'].response()
+        response.status_code = 403
+        return response
     
-    # Generate fake content based on file type
-    content = ""
-    if key.endswith('.json'):
-        # Generate fake JSON
-        fake_data = {
-            "api_keys": [
-                {"service": "mailchimp", "key": "abcd1234-mock-key-5678", "active": True},
-                {"service": "stripe", "key": "sk_test_mockKeyWithTracker" + tracking_id, "active": True},
-            ],
-            "tracker": tracking_id  # Add tracker directly
-        }
-        content = json.dumps(fake_data, indent=2)
-        mimetype = 'application/json'
-        
-    elif key.endswith('.sql'):
-        # Generate fake SQL dump with embedded tracker
-        content = f"""-- SQL Dump with tracking ID: {tracking_id}
-CREATE TABLE accounts (id INT, username VARCHAR(100), password VARCHAR(100));
-INSERT INTO accounts VALUES (1, 'system_admin', 'S3cr3tP@ss!');
--- End tracked dump {tracking_id}
-"""
-        mimetype = 'text/plain'
-        
-    elif key.endswith('.xlsx'):
-        # For binary files like XLSX, just return a text representation
-        content = f"[This would be an Excel file in production. Tracking ID: {tracking_id}]"
-        mimetype = 'text/plain'
-    
-    # Return the fake content
-    response = make_response(content)
-    response.headers['Content-Type'] = mimetype
-    response.headers['ETag'] = f"\"{hashlib.md5(content.encode()).hexdigest()}\""
-    response.headers['X-Tracker'] = tracking_id  # Add tracker in header
-    return response
+    # Stream the fake content at its advertised size and ETag
+    return stream_decoy_object(key, tracking_id, attacker_ip, headers={'X-Tracker': tracking_id})
 
-# Endpoint to retrieve all recorded interactions (admin only)
+# Endpoint to retrieve recorded interactions (admin only)
 @deception_bp.route('/admin/interactions', methods=['GET'])
 def get_interactions():
-    """Admin endpoint to retrieve recorded interactions"""
+    """
+    Admin endpoint to retrieve recorded interactions
+    
+    Returns one page (?offset=&limit=, optionally ?ip=) of the buffered
+    interactions, streamed; older interactions are in the spill log.
+    """
     # In a real system, this would require authentication
     # For demo purposes, we're making it accessible
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
     
-    # Format the attacker interactions for display
-    formatted_interactions = {
-        ip: interactions for ip, interactions in attacker_interactions.items()
-    }
-    
-    return jsonify({
-        "total_attackers": len(attacker_interactions),
-        "total_interactions": sum(len(interactions) for interactions in attacker_interactions.values()),
-        "interactions": formatted_interactions
-    })
+    return Response(
+        stream_with_context(interaction_buffer.export(request.args.get('ip'), offset, limit)),
+        content_type='application/json'
+    )
 
 # Error handling
 @deception_bp.errorhandler(Exception)
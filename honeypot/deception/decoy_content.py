@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Decoy Download Content
+----------------------
+This module streams large, realistic-looking fake files (SQL dumps, JSON
+exports, XLSX workbooks) for the decoy endpoints. Content is generated on the
+fly from a per-object seed, so any byte range can be produced without
+holding the file in memory, and downloads are throttled per attacker.
+"""
+
+import os
+import time
+import random
+import string
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('decoy_content')
+
+CHUNK_SIZE = 65536
+
+# Rows in each object's pool; row i uses pool entry (i * ROW_STRIDE) % ROW_POOL_SIZE
+ROW_POOL_SIZE = 1024
+ROW_STRIDE = 2654435761
+
+HASH_ALPHABET = string.ascii_letters + string.digits + './'
+KEY_ALPHABET = string.ascii_letters + string.digits
+
+# File framing per kind; {tracking_id} and {key} are filled per request
+FRAMES = {
+    'sql': (
+        "-- MySQL dump 10.13  Distrib 8.0.28, for Linux (x86_64)\n"
+        "-- Host: db-master.internal    Database: production\n"
+        "-- ------------------------------------------------------\n"
+        "-- Server version       8.0.28\n"
+        "-- Dump of {key} (tracking: {tracking_id})\n\n"
+        "DROP TABLE IF EXISTS `customers`;\n"
+        "CREATE TABLE `customers` (\n"
+        "  `id` int NOT NULL AUTO_INCREMENT,\n"
+        "  `username` varchar(50) NOT NULL,\n"
+        "  `password` varchar(255) NOT NULL,\n"
+        "  `email` varchar(100) NOT NULL,\n"
+        "  PRIMARY KEY (`id`)\n"
+        ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;\n\n"
+        "INSERT INTO `customers` VALUES\n",
+        "(0000000000,'svc_backup','{tracking_id}','ops@example.com');\n"
+        "-- Dump completed (tracking: {tracking_id})\n"
+    ),
+    'json': (
+        '{{\n  "export": "{key}",\n  "tracker": "{tracking_id}",\n  "records": [\n',
+        '    {{"id": 0, "api_key": "{tracking_id}", "owner": "svc_backup"}}\n  ]\n}}\n'
+    ),
+    'xlsx': (
+        # Local file header of the first zip entry, as in a real workbook
+        "PK\x03\x04\x14\x00\x06\x00\x08\x00\x00\x00!\x00\x00\x00\x00\x00"
+        "\x00\x00\x00\x00\x00\x00\x00\x00\x13\x00\x00\x00[Content_Types].xml",
+        "PK\x05\x06\x00\x00\x00\x00\x01\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00"
+        "\x24\x00{tracking_id}"
+    )
+}
+
+def content_kind(key):
+    """Decoy content kind for an object name"""
+    if key.endswith('.json'):
+        return 'json'
+    if key.endswith('.xlsx'):
+        return 'xlsx'
+    return 'sql'
+
+class DecoyObject:
+    """
+    A large fake file generated on demand
+
+    The file is a header, fixed-width rows and a footer, padded to exactly
+    size bytes. Rows come from a pool generated once from the object's seed
+    (SQL and JSON rows also carry their row number), so the bytes at any
+    offset are computed directly and a Range request costs no more than the
+    bytes it returns. The tracking ID is spliced into the header and footer.
+
+    Args:
+        key: Object name
+        size: Total size in bytes
+        kind: 'sql', 'json' or 'xlsx' (defaults to the kind for the name)
+    """
+    def __init__(self, key, size, kind=None):
+        self.key = key
+        self.size = size
+        self.kind = kind or content_kind(key)
+        self.seed = int(hashlib.md5(key.encode()).hexdigest()[:16], 16)
+        self.pool = self._build_pool(random.Random(self.seed))
+        self.row_width = len(self._row(0))
+
+    def _build_pool(self, rng):
+        """Row bodies (everything after the row number)"""
+        def text(alphabet, length):
+            return ''.join(rng.choice(alphabet) for _ in range(length))
+
+        if self.kind == 'sql':
+            rows = []
+            for _ in range(ROW_POOL_SIZE):
+                user = f"user_{rng.getrandbits(32):08x}"
+                rows.append(f",'{user}','$2a$12${text(HASH_ALPHABET, 53)}','{user}@example.com'),\n")
+        elif self.kind == 'json':
+            rows = [
+                f', "api_key": "sk_live_{text(KEY_ALPHABET, 24)}", "owner": "user_{rng.getrandbits(32):08x}"}},\n'
+                for _ in range(ROW_POOL_SIZE)
+            ]
+        else:
+            # Incompressible bytes, like the deflated XML of a real workbook
+            return [rng.randbytes(64) for _ in range(ROW_POOL_SIZE)]
+        return [row.encode('ascii') for row in rows]
+
+    def _row(self, index):
+        body = self.pool[(index * ROW_STRIDE) % ROW_POOL_SIZE]
+        if self.kind == 'sql':
+            return b'(%010d' % (index + 1) + body
+        if self.kind == 'json':
+            return b'    {"id": %10d' % (index + 1) + body
+        return body
+
+    def _layout(self, tracking_id):
+        """Header, footer, row count and padding for one download"""
+        header, footer = (
+            part.format(key=self.key, tracking_id=tracking_id).encode('latin-1')
+            for part in FRAMES[self.kind]
+        )
+        if len(header) + len(footer) > self.size:
+            header = header[:self.size]
+            footer = footer[:self.size - len(header)]
+        rows = (self.size - len(header) - len(footer)) // self.row_width
+        padding = self.size - len(header) - len(footer) - rows * self.row_width
+        return header, footer, rows, padding
+
+    def stream(self, tracking_id, start=0, stop=None, chunk_size=CHUNK_SIZE):
+        """
+        Yield the bytes in [start, stop) in chunks
+
+        Args:
+            tracking_id: Tracker embedded in the file
+            start: First byte offset
+            stop: End offset (exclusive), defaults to the object size
+        """
+        stop = self.size if stop is None else min(stop, self.size)
+        layout = self._layout(tracking_id)
+        position = start
+        while position < stop:
+            end = min(stop, position + chunk_size)
+            yield self._read(layout, position, end)
+            position = end
+
+    def _read(self, layout, start, end):
+        header, footer, rows, padding = layout
+        pieces = []
+        rows_start = len(header)
+        padding_start = rows_start + rows * self.row_width
+        footer_start = padding_start + padding
+
+        if start < rows_start:
+            pieces.append(header[start:min(end, rows_start)])
+        if start < padding_start and end > rows_start:
+            first = (max(start, rows_start) - rows_start) // self.row_width
+            last = (min(end, padding_start) - 1 - rows_start) // self.row_width
+            block = b''.join(self._row(index) for index in range(first, last + 1))
+            offset = rows_start + first * self.row_width
+            pieces.append(block[max(start, rows_start) - offset:min(end, padding_start) - offset])
+        if start < footer_start and end > padding_start:
+            pieces.append(b'\n' * (min(end, footer_start) - max(start, padding_start)))
+        if end > footer_start:
+            pieces.append(footer[max(start, footer_start) - footer_start:end - footer_start])
+        return b''.join(pieces)
+
+class TokenBucket:
+    """
+    Byte-rate limiter
+
+    Tokens may go negative; the caller then sleeps until the debt is repaid,
+    which paces concurrent downloads sharing a bucket.
+    """
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, amount):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+class DownloadThrottle:
+    """
+    Per-attacker bandwidth limit for decoy downloads
+
+    All downloads from one IP share a token bucket. The rate (bytes per
+    second) defaults to the DECOY_DOWNLOAD_RATE environment variable;
+    0 disables throttling. A bucket idle long enough to have refilled is
+    indistinguishable from a new one, so idle buckets are dropped.
+
+    Args:
+        rate: Bytes per second per attacker
+        burst: Bytes an idle attacker may receive without waiting
+    """
+    def __init__(self, rate=None, burst=None):
+        if rate is None:
+            rate = int(os.environ.get('DECOY_DOWNLOAD_RATE', 1024 * 1024))
+        self.rate = rate
+        self.burst = burst or max(rate, CHUNK_SIZE)
+        self.buckets = OrderedDict()   # ip -> bucket, least recently requested first
+        self.lock = threading.Lock()
+
+    def _bucket(self, ip):
+        with self.lock:
+            now = time.monotonic()
+            while self.buckets:
+                oldest = next(iter(self.buckets.values()))
+                if oldest.tokens + (now - oldest.updated) * self.rate < self.burst:
+                    break
+                self.buckets.popitem(last=False)
+
+            bucket = self.buckets.get(ip)
+            if bucket is None:
+                bucket = self.buckets[ip] = TokenBucket(self.rate, self.burst)
+            else:
+                self.buckets.move_to_end(ip)
+            return bucket
+
+    def limit(self, ip, chunks):
+        """Wrap a chunk iterator so it is delivered at the attacker's rate"""
+        if not self.rate:
+            yield from chunks
+            return
+        bucket = self._bucket(ip)
+        for chunk in chunks:
+            bucket.consume(len(chunk))
+            yield chunk
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Deception Event Bus
+-------------------
+This module delivers events from the deception endpoints (interactions,
+issued trackers) to analytics as they happen, in batches, on a background
+consumer thread.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('deception_events')
+
+# Event types
+INTERACTION = 'interaction'
+TRACKER_ISSUED = 'tracker_issued'
+
+class EventBus:
+    """
+    Bounded in-process event queue with batch consumers
+
+    Publishing is a deque append, which is atomic in CPython, so request
+    threads never wait on a lock. When the queue is full the oldest events
+    are dropped (and counted). A daemon thread drains the queue in batches
+    of up to batch_size events and hands every batch to each subscriber.
+
+    Args:
+        max_events: Queue capacity
+        batch_size: Events delivered per subscriber call
+        flush_interval: Seconds the consumer sleeps when the queue is empty
+    """
+    def __init__(self, max_events=100000, batch_size=256, flush_interval=0.5):
+        self.queue = deque(maxlen=max_events)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.subscribers = []
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def subscribe(self, handler):
+        """Register a callable receiving lists of events"""
+        self.subscribers.append(handler)
+
+    def publish(self, event_type, **payload):
+        """Queue an event; returns immediately"""
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        payload['type'] = event_type
+        payload.setdefault('published_at', time.time())
+        self.queue.append(payload)
+        self.published += 1
+
+        # Wake the consumer when work arrives after an idle period or a batch is ready
+        pending = len(self.queue)
+        if pending == 1 or pending >= self.batch_size:
+            self.wakeup.set()
+
+    def start(self):
+        """Start the consumer thread"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._consume, name='deception-events', daemon=True)
+            self.thread.start()
+
+    def _consume(self):
+        while True:
+            if not self.drain():
+                self.wakeup.wait(self.flush_interval)
+                self.wakeup.clear()
+
+    def drain(self):
+        """
+        Deliver every queued event in the calling thread
+
+        Returns:
+            delivered: Number of events delivered
+        """
+        delivered = 0
+        while True:
+            batch = []
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.popleft())
+            except IndexError:
+                pass
+            if not batch:
+                return delivered
+
+            for handler in self.subscribers:
+                try:
+                    handler(batch)
+                except Exception as e:
+                    logger.error(f"Event handler {getattr(handler, '__name__', handler)} failed: {e}")
+            delivered += len(batch)
+            self.delivered += len(batch)
+
+    def stats(self):
+        """Queue counters"""
+        return {
+            'pending': len(self.queue),
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped
+        }
+
+# Shared bus for the deception endpoints
+event_bus = EventBus()
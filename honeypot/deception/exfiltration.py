@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Deception Exfiltration Detection
+--------------------------------
+This module watches decoy interactions as they are ingested and flags bursts
+of sensitive downloads from the same attacker as potential data exfiltration.
+"""
+
+import logging
+from collections import deque
+from datetime import datetime
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('deception_exfiltration')
+
+# Endpoint fragments that serve sensitive data
+SENSITIVE_ENDPOINTS = ['/download/', '/backup', '/config']
+
+def is_sensitive(endpoint):
+    """Check whether an endpoint serves sensitive data"""
+    return any(fragment in endpoint for fragment in SENSITIVE_ENDPOINTS)
+
+class ExfiltrationWindow:
+    """Sliding window of one attacker's recent interactions"""
+    __slots__ = ('events', 'sensitive', 'attempt')
+
+    def __init__(self):
+        self.events = deque()     # (epoch, sensitive, interaction)
+        self.sensitive = 0
+        self.attempt = None       # open attempt while the burst lasts
+
+class ExfiltrationDetector:
+    """
+    Streaming detector for data exfiltration from decoy endpoints
+
+    Every attacker has a sliding window over their recent interactions. When
+    the window holds min_sensitive or more sensitive interactions an attempt
+    is opened and reported once; later sensitive interactions extend the same
+    attempt until the window drops below the threshold again. Attempt sizes
+    are the bytes actually served, as recorded in each interaction's
+    response_bytes field.
+
+    Args:
+        window_seconds: Sliding window length
+        min_sensitive: Sensitive interactions in a window that count as exfiltration
+        on_detect: Callback receiving each new attempt
+    """
+    def __init__(self, window_seconds=300, min_sensitive=2, on_detect=None):
+        self.window_seconds = window_seconds
+        self.min_sensitive = min_sensitive
+        self.on_detect = on_detect
+        self.windows = {}         # ip -> ExfiltrationWindow
+        self.attempts = []
+
+    def observe(self, ip, interaction):
+        """
+        Add an interaction to the attacker's window
+
+        Returns:
+            attempt: The newly opened attempt, or None
+        """
+        try:
+            epoch = datetime.fromisoformat(interaction['timestamp']).timestamp()
+        except (KeyError, ValueError, TypeError):
+            return None
+
+        window = self.windows.get(ip)
+        if window is None:
+            window = self.windows[ip] = ExfiltrationWindow()
+
+        # Expire interactions that left the window
+        while window.events and window.events[0][0] <= epoch - self.window_seconds:
+            _, sensitive, _ = window.events.popleft()
+            window.sensitive -= sensitive
+        if window.sensitive < self.min_sensitive:
+            window.attempt = None
+
+        sensitive = is_sensitive(interaction['endpoint'])
+        window.events.append((epoch, sensitive, interaction))
+        window.sensitive += sensitive
+
+        if window.attempt is not None:
+            # Burst still running: extend the attempt already reported
+            window.attempt['interaction_count'] += 1
+            if sensitive:
+                self._add_sensitive(window.attempt, interaction)
+            return None
+
+        if window.sensitive < self.min_sensitive:
+            return None
+
+        attempt = {
+            'ip': ip,
+            'timestamp': datetime.fromtimestamp(window.events[0][0]).isoformat(),
+            'endpoints_accessed': [],
+            'data_size_bytes': 0,
+            'interaction_count': len(window.events),
+            'tracking_ids': []
+        }
+        for _, event_sensitive, event in window.events:
+            if event_sensitive:
+                self._add_sensitive(attempt, event)
+        window.attempt = attempt
+        self.attempts.append(attempt)
+
+        if self.on_detect is not None:
+            self.on_detect(attempt)
+        return attempt
+
+    @staticmethod
+    def _add_sensitive(attempt, interaction):
+        attempt['endpoints_accessed'].append(interaction['endpoint'])
+        attempt['data_size_bytes'] += interaction.get('response_bytes', 0)
+        attempt['tracking_ids'].append(interaction.get('tracking_id'))
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Deception Interaction Buffer
+----------------------------
+This module keeps the raw decoy interactions for the admin endpoint in
+bounded per-IP ring buffers. Request header sets are interned and stored once
+per distinct set, interactions pushed out of a buffer are spilled to a JSONL
+log on disk, and the buffers are exported page by page as streamed JSON.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import deque, OrderedDict
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('interaction_buffer')
+
+class HeaderTable:
+    """
+    Interned request header sets
+
+    Identical header sets (the same client sending the same request shape)
+    are stored once, keyed by a hash of their items, and reference counted
+    so a set is dropped once no buffered interaction uses it.
+    """
+    def __init__(self):
+        self.sets = {}      # header id -> headers
+        self.refs = {}      # header id -> buffered interactions using it
+
+    def __len__(self):
+        return len(self.sets)
+
+    def intern(self, headers):
+        """Store a header set and return its ID"""
+        if not headers:
+            return None
+        encoded = json.dumps(headers, sort_keys=True, separators=(',', ':'))
+        header_id = hashlib.sha1(encoded.encode()).hexdigest()[:16]
+        if header_id not in self.sets:
+            self.sets[header_id] = headers
+            self.refs[header_id] = 0
+        self.refs[header_id] += 1
+        return header_id
+
+    def get(self, header_id):
+        return self.sets.get(header_id, {}) if header_id else {}
+
+    def release(self, header_id):
+        """Drop one reference to a header set"""
+        if header_id is None:
+            return
+        self.refs[header_id] -= 1
+        if not self.refs[header_id]:
+            del self.refs[header_id]
+            del self.sets[header_id]
+
+class InteractionBuffer:
+    """
+    Bounded per-IP interaction history
+
+    Each IP keeps its depth most recent interactions; older ones, and whole
+    buffers of the least recently active IPs beyond max_ips, are appended to
+    the spill log with their headers expanded. Interactions are stored with a
+    header ID in place of the header dict.
+
+    Args:
+        depth: Interactions kept per IP (defaults to INTERACTION_BUFFER_DEPTH)
+        max_ips: IPs kept in memory (defaults to INTERACTION_BUFFER_MAX_IPS)
+        spill_path: JSONL file evicted interactions are appended to
+    """
+    def __init__(self, depth=None, max_ips=None, spill_path=None):
+        self.depth = depth or int(os.getenv('INTERACTION_BUFFER_DEPTH', '200'))
+        self.max_ips = max_ips or int(os.getenv('INTERACTION_BUFFER_MAX_IPS', '10000'))
+        self.spill_path = spill_path or os.getenv(
+            'INTERACTION_SPILL_PATH', 'analytics/deception/interactions.jsonl'
+        )
+        self.buffers = OrderedDict()    # ip -> deque of interactions, least recently active first
+        self.headers = HeaderTable()
+        self.total = 0
+        self.spilled = 0
+        self.lock = threading.Lock()
+        self.handle = None
+
+    def __len__(self):
+        return self.total
+
+    def __contains__(self, ip):
+        return ip in self.buffers
+
+    def add(self, ip, interaction):
+        """Record an interaction for an IP"""
+        record = {key: value for key, value in interaction.items() if key != 'headers'}
+        evicted = []
+        with self.lock:
+            record['headers_id'] = self.headers.intern(interaction.get('headers'))
+            buffer = self.buffers.get(ip)
+            if buffer is None:
+                buffer = self.buffers[ip] = deque()
+                if len(self.buffers) > self.max_ips:
+                    stale_ip, stale = self.buffers.popitem(last=False)
+                    evicted.extend((stale_ip, old) for old in stale)
+            else:
+                self.buffers.move_to_end(ip)
+            buffer.append(record)
+            self.total += 1
+            if len(buffer) > self.depth:
+                evicted.append((ip, buffer.popleft()))
+            if evicted:
+                self._spill(evicted)
+
+    def _spill(self, evicted):
+        """Append evicted interactions to the spill log (caller holds the lock)"""
+        if self.handle is None:
+            os.makedirs(os.path.dirname(self.spill_path) or '.', exist_ok=True)
+            self.handle = open(self.spill_path, 'a')
+        for ip, record in evicted:
+            self.handle.write(json.dumps({'ip': ip, **self._expand(record)}, default=str) + '\n')
+            self.headers.release(record['headers_id'])
+        self.handle.flush()
+        self.total -= len(evicted)
+        self.spilled += len(evicted)
+
+    def _expand(self, record):
+        """The interaction as logged, with its headers restored"""
+        interaction = {key: value for key, value in record.items() if key != 'headers_id'}
+        interaction['headers'] = self.headers.get(record['headers_id'])
+        return interaction
+
+    def interactions_for(self, ip):
+        """Buffered interactions of an IP, oldest first"""
+        with self.lock:
+            return [self._expand(record) for record in self.buffers.get(ip, ())]
+
+    def stats(self):
+        with self.lock:
+            return {
+                'total_attackers': len(self.buffers),
+                'total_interactions': self.total,
+                'spilled_interactions': self.spilled,
+                'header_sets': len(self.headers),
+                'depth': self.depth,
+                'spill_path': self.spill_path
+            }
+
+    def export(self, ip=None, offset=0, limit=100):
+        """
+        Stream one page of buffered interactions as a JSON document
+
+        Interactions are paged in IP order, oldest first within an IP. The
+        page is copied under the lock and serialized piece by piece, so the
+        document is never built in memory.
+
+        Args:
+            ip: Only export this IP
+            offset: Interactions to skip
+            limit: Interactions in the page
+        """
+        with self.lock:
+            ips = [ip] if ip is not None else sorted(self.buffers)
+            total = sum(len(self.buffers.get(address, ())) for address in ips)
+            page, skip, remaining = [], offset, limit
+            for address in ips:
+                if not remaining:
+                    break
+                buffer = self.buffers.get(address, ())
+                if skip >= len(buffer):
+                    skip -= len(buffer)
+                    continue
+                records = [buffer[index] for index in range(skip, min(len(buffer), skip + remaining))]
+                page.append((address, [self._expand(record) for record in records]))
+                remaining -= len(records)
+                skip = 0
+            attackers = len(ips) if ip is None else int(ip in self.buffers)
+            spilled = self.spilled
+
+        count = limit - remaining
+        next_offset = offset + count if offset + count < total else None
+        yield (
+            f'{{"total_attackers":{attackers},"total_interactions":{total},'
+            f'"spilled_interactions":{spilled},"offset":{offset},"limit":{limit},'
+            f'"next_offset":{json.dumps(next_offset)},"interactions":{{'
+        )
+        for index, (address, records) in enumerate(page):
+            yield f'{"," if index else ""}{json.dumps(address)}:['
+            for position, record in enumerate(records):
+                yield ('' if not position else ',') + json.dumps(record, default=str)
+            yield ']'
+        yield '}}\n'
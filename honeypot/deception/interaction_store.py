@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Deception Interaction Store
+---------------------------
+This module stores interactions with deception endpoints, indexed by attacker
+IP and tracking ID, and keeps a running behaviour summary for every attacker.
+"""
+
+import logging
+from array import array
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('deception_interactions')
+
+# Endpoints that hand out credentials
+CREDENTIAL_ENDPOINTS = ['/redis/config', '/mysql/connection', '/aws/s3/config']
+
+# Endpoint prefix -> decoy API type
+API_TYPES = [('/redis/', 'redis'), ('/mysql/', 'mysql'), ('/aws/', 'aws')]
+
+# Columns kept for every interaction in columnar mode
+COLUMNS = ['timestamp', 'endpoint', 'tracking_id', 'method', 'data', 'headers', 'user_agent']
+
+# Low-cardinality columns stored as codes into a value table
+INTERNED_COLUMNS = ['endpoint', 'method', 'user_agent']
+
+class InteractionSummary:
+    """Running behaviour summary of one attacker, updated per interaction"""
+    __slots__ = ('first_seen', 'last_seen', 'count', 'endpoints', 'api_types', 'user_agents',
+                 'methods', 'extracted_credentials', 'lateral_movement', 'tracking_payloads',
+                 'tracking_ids')
+
+    def __init__(self):
+        self.first_seen = None
+        self.last_seen = None
+        self.count = 0
+        self.endpoints = {}
+        self.api_types = set()
+        self.user_agents = set()
+        self.methods = set()
+        self.extracted_credentials = False
+        self.lateral_movement = False
+        self.tracking_payloads = []
+        self.tracking_ids = set()
+
+    def add(self, interaction):
+        """Fold one interaction into the summary"""
+        timestamp = interaction['timestamp']
+        endpoint = interaction['endpoint']
+        method = interaction.get('method', 'GET')
+
+        if self.first_seen is None or timestamp < self.first_seen:
+            self.first_seen = timestamp
+        if self.last_seen is None or timestamp > self.last_seen:
+            self.last_seen = timestamp
+        self.count += 1
+        self.endpoints[endpoint] = self.endpoints.get(endpoint, 0) + 1
+
+        for prefix, api_type in API_TYPES:
+            if prefix in endpoint:
+                self.api_types.add(api_type)
+                break
+
+        self.user_agents.add(interaction.get('user_agent', 'unknown'))
+        self.methods.add(method)
+
+        if any(credential_endpoint in endpoint for credential_endpoint in CREDENTIAL_ENDPOINTS):
+            self.extracted_credentials = True
+        if endpoint == '/mysql/connection' and method == 'POST':
+            self.lateral_movement = True
+
+        data = interaction.get('data') or {}
+        if '_tracker_id' in data:
+            self.tracking_payloads.append(data['_tracker_id'])
+
+    def to_profile(self, ip):
+        """Export the summary in the DeceptionAnalytics profile format"""
+        return {
+            'ip': ip,
+            'first_seen': self.first_seen,
+            'last_seen': self.last_seen,
+            'interaction_count': self.count,
+            'accessed_endpoints': dict(self.endpoints),
+            'api_types': list(self.api_types),
+            'user_agents': list(self.user_agents),
+            'methods': list(self.methods),
+            'sophistication_score': 0.0,
+            'extracted_credentials': self.extracted_credentials,
+            'lateral_movement': self.lateral_movement,
+            'tracking_payloads': list(self.tracking_payloads)
+        }
+
+class InteractionStore:
+    """
+    Interactions with deception endpoints, grouped by attacker IP
+
+    Every attacker has a set of the tracking IDs already stored, so
+    de-duplicating a new interaction is a hash lookup, and an
+    InteractionSummary that is updated as interactions arrive, so profiling an
+    attacker does not rescan their interactions.
+
+    In columnar mode interactions are kept as one list per field (endpoint,
+    method and user agent as codes into a value table) instead of one dict
+    per interaction, which keeps large histories compact.
+
+    Args:
+        columnar: Store interactions column-wise instead of as dicts
+    """
+    def __init__(self, columnar=False):
+        self.columnar = columnar
+        self.summaries = {}       # ip -> InteractionSummary
+        self.rows = {}            # ip -> interaction dicts, or row numbers in columnar mode
+
+        if columnar:
+            self.columns = {name: [] for name in COLUMNS if name not in INTERNED_COLUMNS}
+            self.codes = {name: array('I') for name in INTERNED_COLUMNS}
+            self.values = {name: [] for name in INTERNED_COLUMNS}
+            self.value_codes = {name: {} for name in INTERNED_COLUMNS}
+
+    def __len__(self):
+        return sum(summary.count for summary in self.summaries.values())
+
+    def __contains__(self, ip):
+        return ip in self.summaries
+
+    def add(self, ip, interaction):
+        """
+        Store an interaction unless its tracking ID is already stored for the IP
+
+        Returns:
+            added: True if the interaction was new
+        """
+        summary = self.summaries.get(ip)
+        if summary is None:
+            summary = self.summaries[ip] = InteractionSummary()
+            self.rows[ip] = array('I') if self.columnar else []
+
+        tracking_id = interaction.get('tracking_id')
+        if tracking_id in summary.tracking_ids:
+            return False
+        summary.tracking_ids.add(tracking_id)
+        summary.add(interaction)
+
+        if self.columnar:
+            self.rows[ip].append(self._append_row(interaction))
+        else:
+            self.rows[ip].append(interaction)
+        return True
+
+    def _append_row(self, interaction):
+        row = len(self.columns['timestamp'])
+        for name, column in self.columns.items():
+            column.append(interaction.get(name))
+        for name in INTERNED_COLUMNS:
+            value = interaction.get(name)
+            code = self.value_codes[name].get(value)
+            if code is None:
+                code = self.value_codes[name][value] = len(self.values[name])
+                self.values[name].append(value)
+            self.codes[name].append(code)
+        return row
+
+    def _row(self, row):
+        interaction = {name: column[row] for name, column in self.columns.items()}
+        for name in INTERNED_COLUMNS:
+            interaction[name] = self.values[name][self.codes[name][row]]
+        return interaction
+
+    def ips(self):
+        """IPs with at least one stored interaction"""
+        return list(self.summaries)
+
+    def interactions_for(self, ip):
+        """Get an attacker's interactions in arrival order"""
+        rows = self.rows.get(ip, [])
+        if self.columnar:
+            return [self._row(row) for row in rows]
+        return list(rows)
+
+    def summary(self, ip):
+        """Get an attacker's running summary, or None if unknown"""
+        return self.summaries.get(ip)
+
+    def profile(self, ip):
+        """Get an attacker's profile dictionary, or None if unknown"""
+        summary = self.summaries.get(ip)
+        return summary.to_profile(ip) if summary is not None else None
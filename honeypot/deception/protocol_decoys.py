@@ -0,0 +1,619 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Native Protocol Decoys
+----------------------
+This module runs fake Redis (RESP) and MySQL servers on an asyncio event
+loop, so attackers who pick up the leaked redis:// and mysql:// URLs and
+connect with real clients are logged like any other decoy interaction.
+"""
+
+import os
+import re
+import json
+import uuid
+import struct
+import asyncio
+import hashlib
+import fnmatch
+import logging
+import argparse
+import threading
+from urllib.parse import urlsplit
+
+from .api_honeypot import FAKE_CREDS, log_interaction
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('protocol_decoys')
+
+# Longest argument or query kept in a logged interaction
+MAX_LOGGED_CHARS = 1024
+
+def _truncate(value):
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', errors='replace')
+    return value[:MAX_LOGGED_CHARS]
+
+class ProtocolError(Exception):
+    """Malformed or oversized client input; the connection is dropped"""
+    pass
+
+# ---------------------------------------------------------------------------
+# Redis (RESP)
+# ---------------------------------------------------------------------------
+
+REDIS_PASSWORD = urlsplit(FAKE_CREDS['redis']['url']).password
+REDIS_USER = urlsplit(FAKE_CREDS['redis']['url']).username
+
+REDIS_CONFIG = {
+    'masterauth': FAKE_CREDS['redis']['master_auth'],
+    'requirepass': REDIS_PASSWORD,
+    'maxmemory': FAKE_CREDS['redis']['max_memory'],
+    'dir': '/var/lib/redis',
+    'dbfilename': 'dump.rdb',
+    'bind': '0.0.0.0',
+    'protected-mode': 'no',
+    'appendonly': 'yes'
+}
+
+# Per-request tracking ID placeholder in fake data
+TRACKING_SLOT = '{tracking_id}'
+
+# Fake keyspace
+REDIS_KEYS = {
+    'session:admin': json.dumps({"user": "admin", "role": "superuser", "token": TRACKING_SLOT}),
+    'backup:aws_credentials': json.dumps({
+        "access_key": FAKE_CREDS['aws']['access_key'],
+        "secret_key": FAKE_CREDS['aws']['secret_key'],
+        "bucket": FAKE_CREDS['aws']['bucket'],
+        "tracking": TRACKING_SLOT
+    }),
+    'config:mysql': (
+        f"mysql://{FAKE_CREDS['mysql']['user']}:{FAKE_CREDS['mysql']['password']}"
+        f"@{FAKE_CREDS['mysql']['host']}:{FAKE_CREDS['mysql']['port']}/{FAKE_CREDS['mysql']['database']}"
+        f"?tracking={TRACKING_SLOT}"
+    ),
+    'queue:billing:jobs': '[]',
+}
+
+REDIS_INFO = "\r\n".join([
+    "# Server",
+    "redis_version:6.2.6",
+    "redis_mode:standalone",
+    "os:Linux 5.15.0-1034-aws x86_64",
+    "arch_bits:64",
+    "tcp_port:6379",
+    "uptime_in_days:41",
+    "# Clients",
+    "connected_clients:7",
+    "# Memory",
+    f"maxmemory_human:{FAKE_CREDS['redis']['max_memory']}",
+    "# Replication",
+    "role:master",
+    f"connected_slaves:{len(FAKE_CREDS['redis']['replicas'])}",
+] + [
+    f"slave{index}:ip={replica},port=6379,state=online,offset=83921733,lag=0"
+    for index, replica in enumerate(FAKE_CREDS['redis']['replicas'])
+] + ["# Keyspace", f"db0:keys={len(REDIS_KEYS)},expires=0,avg_ttl=0", ""])
+
+# Commands answered before AUTH, as on a real server with requirepass
+REDIS_NOAUTH_COMMANDS = {'AUTH', 'QUIT'}
+
+def resp_simple(text):
+    return f"+{text}\r\n".encode()
+
+def resp_error(text):
+    return f"-{text}\r\n".encode()
+
+def resp_integer(value):
+    return f":{value}\r\n".encode()
+
+def resp_bulk(value):
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, str):
+        value = value.encode()
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+def resp_array(values):
+    return b"*%d\r\n" % len(values) + b''.join(resp_bulk(value) for value in values)
+
+# ---------------------------------------------------------------------------
+# MySQL
+# ---------------------------------------------------------------------------
+
+CLIENT_LONG_PASSWORD = 0x00000001
+CLIENT_FOUND_ROWS = 0x00000002
+CLIENT_LONG_FLAG = 0x00000004
+CLIENT_CONNECT_WITH_DB = 0x00000008
+CLIENT_PROTOCOL_41 = 0x00000200
+CLIENT_TRANSACTIONS = 0x00002000
+CLIENT_SECURE_CONNECTION = 0x00008000
+CLIENT_MULTI_RESULTS = 0x00020000
+CLIENT_PLUGIN_AUTH = 0x00080000
+CLIENT_CONNECT_ATTRS = 0x00100000
+CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA = 0x00200000
+
+SERVER_CAPABILITIES = (
+    CLIENT_LONG_PASSWORD | CLIENT_FOUND_ROWS | CLIENT_LONG_FLAG | CLIENT_CONNECT_WITH_DB
+    | CLIENT_PROTOCOL_41 | CLIENT_TRANSACTIONS | CLIENT_SECURE_CONNECTION | CLIENT_MULTI_RESULTS
+    | CLIENT_PLUGIN_AUTH | CLIENT_CONNECT_ATTRS | CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA
+)
+
+MYSQL_VERSION = '8.0.28'
+MYSQL_CHARSET = 0x21  # utf8_general_ci
+MYSQL_STATUS_AUTOCOMMIT = 0x0002
+NATIVE_PASSWORD_PLUGIN = 'mysql_native_password'
+
+COM_QUIT = 0x01
+COM_INIT_DB = 0x02
+COM_QUERY = 0x03
+COM_FIELD_LIST = 0x04
+COM_PING = 0x0e
+
+# Fake tables
+MYSQL_TABLES = {
+    'users': (
+        ['id', 'username', 'password', 'email'],
+        [
+            ['1', 'admin', '$2a$12$KhDr4xj/dCJIf/XkVpCEIeQHiEm.LrGh2M/caeP2DM4QzlPpn7JLi', 'admin@example.com'],
+            ['2', 'john.doe', '$2a$12$k8B1C2T.page5eQrxR7eme8kNbNXf/NVEOlqvYcWaVHAIQb7xQdQe', 'john@example.com'],
+        ]
+    ),
+    'customers': (
+        ['id', 'name', 'email', 'card_last4'],
+        [
+            ['1', 'Acme Corp', 'billing@acme.example', '4242'],
+            ['2', 'Globex', 'finance@globex.example', '1881'],
+        ]
+    ),
+    'api_tokens': (
+        ['service', 'token'],
+        [
+            ['stripe', f'sk_live_{TRACKING_SLOT}'],
+            ['aws', FAKE_CREDS['aws']['access_key']],
+        ]
+    ),
+}
+
+MYSQL_DATABASES = ['information_schema', 'mysql', 'performance_schema', FAKE_CREDS['mysql']['database']]
+
+SELECT_FROM = re.compile(r'\bfrom\s+`?(?:(\w+)`?\.`?)?(\w+)`?', re.IGNORECASE)
+LIMIT_CLAUSE = re.compile(r'\s+limit\s+', re.IGNORECASE)
+
+def lenenc_int(value):
+    if value < 0xfb:
+        return bytes([value])
+    if value < 1 << 16:
+        return b'\xfc' + struct.pack('<H', value)
+    if value < 1 << 24:
+        return b'\xfd' + struct.pack('<I', value)[:3]
+    return b'\xfe' + struct.pack('<Q', value)
+
+def lenenc_str(value):
+    if isinstance(value, str):
+        value = value.encode()
+    return lenenc_int(len(value)) + value
+
+def read_lenenc_int(data, pos):
+    first = data[pos]
+    if first < 0xfb:
+        return first, pos + 1
+    if first == 0xfc:
+        return struct.unpack_from('<H', data, pos + 1)[0], pos + 3
+    if first == 0xfd:
+        return int.from_bytes(data[pos + 1:pos + 4], 'little'), pos + 4
+    return struct.unpack_from('<Q', data, pos + 1)[0], pos + 9
+
+def read_null_str(data, pos):
+    end = data.index(b'\x00', pos)
+    return data[pos:end], end + 1
+
+def native_password_scramble(password, salt):
+    """Client proof for mysql_native_password: SHA1(pw) XOR SHA1(salt + SHA1(SHA1(pw)))"""
+    stage1 = hashlib.sha1(password.encode()).digest()
+    stage2 = hashlib.sha1(stage1).digest()
+    mask = hashlib.sha1(salt + stage2).digest()
+    return bytes(a ^ b for a, b in zip(stage1, mask))
+
+def mysql_ok(affected_rows=0):
+    return b'\x00' + lenenc_int(affected_rows) + lenenc_int(0) + struct.pack('<HH', MYSQL_STATUS_AUTOCOMMIT, 0)
+
+def mysql_err(code, sql_state, message):
+    return b'\xff' + struct.pack('<H', code) + b'#' + sql_state.encode() + message.encode()
+
+def mysql_eof():
+    return b'\xfe' + struct.pack('<HH', 0, MYSQL_STATUS_AUTOCOMMIT)
+
+def mysql_column(name, table=''):
+    return (
+        lenenc_str('def') + lenenc_str(FAKE_CREDS['mysql']['database'] if table else '')
+        + lenenc_str(table) + lenenc_str(table) + lenenc_str(name) + lenenc_str(name)
+        + b'\x0c' + struct.pack('<HIBHB', MYSQL_CHARSET, 255, 0xfd, 0, 0) + b'\x00\x00'
+    )
+
+def mysql_result_set(columns, rows, table=''):
+    """Text protocol result set as a list of packet payloads"""
+    packets = [lenenc_int(len(columns))]
+    packets += [mysql_column(name, table) for name in columns]
+    packets.append(mysql_eof())
+    for row in rows:
+        packets.append(b''.join(b'\xfb' if value is None else lenenc_str(value) for value in row))
+    packets.append(mysql_eof())
+    return packets
+
+class ProtocolDecoyServer:
+    """
+    Fake Redis and MySQL servers on one asyncio event loop
+
+    Each connection is a coroutine, so thousands of idle or slow clients cost
+    only their buffers. Reads are bounded by max_buffer (line, bulk string
+    and packet sizes), write buffers by the same limit, and connections are
+    closed after idle_timeout seconds or max_commands commands. Every AUTH
+    attempt, login, command and query is recorded with log_interaction.
+
+    Args:
+        host: Address to listen on
+        redis_port: Port of the Redis decoy (None disables it)
+        mysql_port: Port of the MySQL decoy (None disables it)
+        max_connections: Concurrent connections across both decoys
+        max_buffer: Per-connection cap on buffered input and output, in bytes
+        idle_timeout: Seconds a connection may stay silent
+        max_commands: Commands accepted per connection
+    """
+    def __init__(self, host='0.0.0.0', redis_port=6379, mysql_port=3306, max_connections=5000,
+                 max_buffer=65536, idle_timeout=120, max_commands=1000):
+        self.host = host
+        self.redis_port = redis_port
+        self.mysql_port = mysql_port
+        self.max_connections = max_connections
+        self.max_buffer = max_buffer
+        self.idle_timeout = idle_timeout
+        self.max_commands = max_commands
+
+        self.active = 0
+        self.total = 0
+        self.rejected = 0
+        self.servers = []
+        self.loop = None
+        self.thread = None
+        self.ready = threading.Event()
+
+    # -- lifecycle ----------------------------------------------------------
+
+    async def start_servers(self):
+        """Bind the listeners on the running event loop"""
+        listeners = [(self.redis_port, self._handle_redis), (self.mysql_port, self._handle_mysql)]
+        for port, handler in listeners:
+            if port is None:
+                continue
+            server = await asyncio.start_server(
+                lambda reader, writer, handler=handler: self._guard(handler, reader, writer),
+                self.host, port, limit=self.max_buffer
+            )
+            self.servers.append(server)
+            logger.info(f"Protocol decoy listening on {self.host}:{port}")
+
+    async def serve_forever(self):
+        self.loop = asyncio.get_running_loop()
+        await self.start_servers()
+        self.ready.set()
+        await asyncio.gather(*(server.serve_forever() for server in self.servers))
+
+    def start(self):
+        """Run the decoys on an event loop in a background thread"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(
+                target=lambda: asyncio.run(self.serve_forever()), name='protocol-decoys', daemon=True
+            )
+            self.thread.start()
+            self.ready.wait(5)
+
+    def stop(self):
+        """Close the listeners"""
+        if self.loop is not None:
+            for server in self.servers:
+                self.loop.call_soon_threadsafe(server.close)
+
+    def stats(self):
+        return {'active': self.active, 'total': self.total, 'rejected': self.rejected}
+
+    async def _guard(self, handler, reader, writer):
+        """Connection wrapper: admission, limits and cleanup"""
+        if self.active >= self.max_connections:
+            self.rejected += 1
+            writer.close()
+            return
+
+        self.active += 1
+        self.total += 1
+        writer.transport.set_write_buffer_limits(high=self.max_buffer)
+        peer = writer.get_extra_info('peername')
+        ip = peer[0] if peer else 'unknown'
+        try:
+            await handler(reader, writer, ip)
+        except (ProtocolError, ValueError, IndexError, struct.error, asyncio.IncompleteReadError,
+                asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"Protocol decoy error for {ip}: {e}")
+        finally:
+            self.active -= 1
+            writer.close()
+
+    async def _read(self, awaitable):
+        return await asyncio.wait_for(awaitable, self.idle_timeout)
+
+    # -- Redis --------------------------------------------------------------
+
+    async def _read_resp_command(self, reader):
+        """Read one command (RESP array or inline) as a list of byte strings"""
+        line = await self._read(reader.readline())
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.split()
+
+        count = int(line[1:])
+        if not 0 < count <= 1024:
+            raise ProtocolError("bad argument count")
+        args, total = [], 0
+        for _ in range(count):
+            header = await self._read(reader.readline())
+            if not header.startswith(b'$'):
+                raise ProtocolError("expected bulk string")
+            length = int(header[1:])
+            total += length
+            if length < 0 or total > self.max_buffer:
+                raise ProtocolError("command too large")
+            args.append((await self._read(reader.readexactly(length + 2)))[:-2])
+        return args
+
+    async def _handle_redis(self, reader, writer, ip):
+        authenticated = False
+        for _ in range(self.max_commands):
+            args = await self._read_resp_command(reader)
+            if args is None:
+                return
+            if not args:
+                continue
+
+            command = args[0].decode('utf-8', errors='replace').upper()
+            params = [arg.decode('utf-8', errors='replace') for arg in args[1:]]
+            tracking_id = str(uuid.uuid4())
+            data = {'command': command, 'args': [_truncate(param) for param in params[:16]]}
+
+            if not authenticated and command not in REDIS_NOAUTH_COMMANDS:
+                reply = resp_error("NOAUTH Authentication required.")
+            elif command == 'AUTH':
+                password = params[-1] if params else ''
+                username = params[0] if len(params) == 2 else 'default'
+                authenticated = (
+                    password in (REDIS_PASSWORD, FAKE_CREDS['redis']['master_auth'])
+                    and username in ('default', REDIS_USER)
+                )
+                data = {'username': username, 'password': _truncate(password), 'success': authenticated}
+                reply = resp_simple("OK") if authenticated else resp_error(
+                    "WRONGPASS invalid username-password pair or user is disabled."
+                )
+            else:
+                reply = self._redis_reply(command, params, tracking_id)
+
+            writer.write(reply)
+            log_interaction(
+                f'/redis/tcp/{command.lower()}', ip, data=data, method='RESP',
+                user_agent='redis-client', tracking_id=tracking_id, response_bytes=len(reply)
+            )
+            await self._read(writer.drain())
+            if command == 'QUIT':
+                return
+
+    def _redis_reply(self, command, params, tracking_id):
+        """Reply to an authenticated command"""
+        if command == 'PING':
+            return resp_bulk(params[0]) if params else resp_simple("PONG")
+        if command in ('QUIT', 'SELECT', 'SET', 'DEL', 'FLUSHALL', 'FLUSHDB', 'SAVE', 'BGSAVE',
+                       'SLAVEOF', 'REPLICAOF', 'CLIENT'):
+            return resp_simple("OK")
+        if command == 'INFO':
+            return resp_bulk(REDIS_INFO)
+        if command == 'DBSIZE':
+            return resp_integer(len(REDIS_KEYS))
+        if command == 'KEYS':
+            pattern = params[0] if params else '*'
+            return resp_array([key for key in REDIS_KEYS if fnmatch.fnmatchcase(key, pattern)])
+        if command == 'SCAN':
+            return b"*2\r\n" + resp_bulk("0") + resp_array(list(REDIS_KEYS))
+        if command == 'GET':
+            value = REDIS_KEYS.get(params[0]) if params else None
+            return resp_bulk(value.replace(TRACKING_SLOT, tracking_id) if value is not None else None)
+        if command == 'TYPE':
+            return resp_simple("string" if params and params[0] in REDIS_KEYS else "none")
+        if command == 'EXISTS':
+            return resp_integer(sum(param in REDIS_KEYS for param in params))
+        if command == 'CONFIG':
+            action = params[0].upper() if params else ''
+            if action == 'GET':
+                pattern = params[1] if len(params) > 1 else '*'
+                matched = [item for key, value in REDIS_CONFIG.items()
+                           if fnmatch.fnmatchcase(key, pattern) for item in (key, value)]
+                return resp_array(matched)
+            if action in ('SET', 'RESETSTAT', 'REWRITE'):
+                return resp_simple("OK")
+        if command == 'COMMAND':
+            return b"*0\r\n"
+        return resp_error(f"ERR unknown command '{command.lower()}'")
+
+    # -- MySQL --------------------------------------------------------------
+
+    async def _read_packet(self, reader):
+        header = await self._read(reader.readexactly(4))
+        length = int.from_bytes(header[:3], 'little')
+        if length > self.max_buffer:
+            raise ProtocolError("packet too large")
+        return header[3], await self._read(reader.readexactly(length))
+
+    @staticmethod
+    def _write_packets(writer, payloads, sequence):
+        """Write payloads as consecutive packets; returns the bytes written"""
+        data = b''.join(
+            len(payload).to_bytes(3, 'little') + bytes([(sequence + index) & 0xff]) + payload
+            for index, payload in enumerate(payloads)
+        )
+        writer.write(data)
+        return len(data)
+
+    async def _handle_mysql(self, reader, writer, ip):
+        # Printable, NUL-free salt like a real server's
+        salt = bytes(byte % 94 + 33 for byte in os.urandom(20))
+        connection_id = self.total & 0xffffffff
+        handshake = (
+            b'\x0a' + MYSQL_VERSION.encode() + b'\x00' + struct.pack('<I', connection_id)
+            + salt[:8] + b'\x00' + struct.pack('<H', SERVER_CAPABILITIES & 0xffff)
+            + bytes([MYSQL_CHARSET]) + struct.pack('<H', MYSQL_STATUS_AUTOCOMMIT)
+            + struct.pack('<H', SERVER_CAPABILITIES >> 16) + bytes([21]) + b'\x00' * 10
+            + salt[8:] + b'\x00' + NATIVE_PASSWORD_PLUGIN.encode() + b'\x00'
+        )
+        self._write_packets(writer, [handshake], 0)
+        await self._read(writer.drain())
+
+        sequence, response = await self._read_packet(reader)
+        capabilities = struct.unpack_from('<I', response, 0)[0]
+        if not capabilities & CLIENT_PROTOCOL_41:
+            raise ProtocolError("pre-4.1 client")
+
+        user, pos = read_null_str(response, 32)
+        if capabilities & CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA:
+            length, pos = read_lenenc_int(response, pos)
+        elif capabilities & CLIENT_SECURE_CONNECTION:
+            length, pos = response[pos], pos + 1
+        else:
+            length = response.index(b'\x00', pos) - pos
+        auth_response = response[pos:pos + length]
+        pos += length
+        database = ''
+        if capabilities & CLIENT_CONNECT_WITH_DB and pos < len(response):
+            database, pos = read_null_str(response, pos)
+            database = database.decode('utf-8', errors='replace')
+        plugin = NATIVE_PASSWORD_PLUGIN
+        if capabilities & CLIENT_PLUGIN_AUTH and pos < len(response):
+            plugin, pos = read_null_str(response, pos)
+            plugin = plugin.decode('utf-8', errors='replace')
+
+        # Clients defaulting to another plugin are switched to mysql_native_password
+        if plugin != NATIVE_PASSWORD_PLUGIN:
+            self._write_packets(writer, [b'\xfe' + NATIVE_PASSWORD_PLUGIN.encode() + b'\x00' + salt + b'\x00'],
+                                sequence + 1)
+            await self._read(writer.drain())
+            sequence, auth_response = await self._read_packet(reader)
+
+        user = user.decode('utf-8', errors='replace')
+        authenticated = (
+            user == FAKE_CREDS['mysql']['user']
+            and auth_response == native_password_scramble(FAKE_CREDS['mysql']['password'], salt)
+        )
+        if authenticated:
+            reply = mysql_ok()
+        else:
+            reply = mysql_err(
+                1045, '28000',
+                f"Access denied for user '{user}'@'{ip}' (using password: {'YES' if auth_response else 'NO'})"
+            )
+        sent = self._write_packets(writer, [reply], sequence + 1)
+        log_interaction(
+            '/mysql/tcp/login', ip, method='MYSQL', user_agent='mysql-client', response_bytes=sent,
+            data={'user': _truncate(user), 'database': _truncate(database), 'client_plugin': plugin,
+                  'success': authenticated}
+        )
+        await self._read(writer.drain())
+        if not authenticated:
+            return
+
+        database = database or FAKE_CREDS['mysql']['database']
+        for _ in range(self.max_commands):
+            sequence, packet = await self._read_packet(reader)
+            if not packet or packet[0] == COM_QUIT:
+                return
+
+            tracking_id = str(uuid.uuid4())
+            command = packet[0]
+            if command == COM_QUERY:
+                query = packet[1:].decode('utf-8', errors='replace')
+                payloads, database = self._mysql_query(query, database, user, ip, tracking_id)
+                endpoint, data = '/mysql/tcp/query', {'query': _truncate(query), 'database': database}
+            elif command == COM_INIT_DB:
+                database = packet[1:].decode('utf-8', errors='replace')
+                payloads = [mysql_ok()]
+                endpoint, data = '/mysql/tcp/init_db', {'database': _truncate(database)}
+            elif command == COM_PING:
+                payloads = [mysql_ok()]
+                endpoint, data = '/mysql/tcp/ping', {}
+            elif command == COM_FIELD_LIST:
+                payloads = [mysql_eof()]
+                endpoint, data = '/mysql/tcp/field_list', {'table': _truncate(packet[1:].split(b'\x00')[0])}
+            else:
+                payloads = [mysql_err(1047, '08S01', "Unknown command")]
+                endpoint, data = '/mysql/tcp/command', {'command': command}
+
+            sent = self._write_packets(writer, payloads, 1)
+            log_interaction(
+                endpoint, ip, data=data, method='MYSQL', user_agent='mysql-client',
+                tracking_id=tracking_id, response_bytes=sent
+            )
+            await self._read(writer.drain())
+
+    def _mysql_query(self, query, database, user, ip, tracking_id):
+        """
+        Answer a text query
+
+        Returns:
+            result: (packet payloads, current database)
+        """
+        statement = query.strip().rstrip(';').strip()
+        lowered = statement.lower()
+
+        if lowered.startswith('use '):
+            return [mysql_ok()], statement[4:].strip(' `')
+        if lowered.startswith('show databases') or lowered.startswith('show schemas'):
+            return mysql_result_set(['Database'], [[name] for name in MYSQL_DATABASES]), database
+        if lowered.startswith('show tables'):
+            return mysql_result_set([f'Tables_in_{database}'], [[name] for name in MYSQL_TABLES]), database
+        if not lowered.startswith('select'):
+            # Writes, DDL, SET and transactions all "succeed"
+            return [mysql_ok()], database
+
+        match = SELECT_FROM.search(statement)
+        if match:
+            schema, table = match.group(1) or database, match.group(2)
+            if table.lower() not in MYSQL_TABLES or schema != FAKE_CREDS['mysql']['database']:
+                return [mysql_err(1146, '42S02', f"Table '{schema}.{table}' doesn't exist")], database
+            columns, rows = MYSQL_TABLES[table.lower()]
+            rows = [[value.replace(TRACKING_SLOT, tracking_id) for value in row] for row in rows]
+            return mysql_result_set(columns, rows, table.lower()), database
+
+        # Expression-only SELECTs (client probes such as @@version_comment)
+        expression = LIMIT_CLAUSE.split(statement[6:].strip())[0].strip()
+        probes = {
+            '@@version_comment': 'MySQL Community Server - GPL',
+            '@@version': MYSQL_VERSION,
+            'version()': MYSQL_VERSION,
+            'database()': database,
+            'user()': f'{user}@{ip}',
+            'current_user()': f'{user}@%',
+            '@@hostname': FAKE_CREDS['mysql']['host'],
+        }
+        value = probes.get(expression.lower(), expression if expression.isdigit() else None)
+        return mysql_result_set([expression], [[value]]), database
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the Redis and MySQL protocol decoys")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--redis-port', type=int, default=6379)
+    parser.add_argument('--mysql-port', type=int, default=3306)
+    parser.add_argument('--max-connections', type=int, default=5000)
+    args = parser.parse_args()
+
+    server = ProtocolDecoyServer(args.host, args.redis_port, args.mysql_port, args.max_connections)
+    asyncio.run(server.serve_forever())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Decoy Response Templates
+------------------------
+This module pre-renders decoy response bodies once, at startup, into fixed
+byte segments with slots for the per-request values (tracking IDs and
+trackers), so a response is produced by a single join instead of rebuilding
+and serializing the body on every request.
+"""
+
+import re
+import json
+from flask import Response
+
+SLOT_PATTERN = re.compile(rb'@@slot:(\w+)@@')
+
+def slot(name):
+    """Marker for a per-request value inside a template source"""
+    return f'@@slot:{name}@@'
+
+class ResponseTemplate:
+    """
+    A response body split into static segments and named slots
+
+    Slot values are spliced in as-is, so they must not need escaping in the
+    body format (tracking IDs are hex digits and dashes, and trackers are
+    trk_ tokens of base64url characters).
+
+    Args:
+        body: Rendered body containing slot() markers
+        content_type: Content type of the response
+        headers: Static response headers
+    """
+    def __init__(self, body, content_type='application/json', headers=None):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        parts = SLOT_PATTERN.split(body)
+        self.segments = parts[0::2]
+        self.slots = [name.decode('ascii') for name in parts[1::2]]
+        self.content_type = content_type
+        self.headers = headers or {}
+
+    @classmethod
+    def from_json(cls, data, **kwargs):
+        """Pre-render a JSON body the way jsonify does"""
+        return cls(json.dumps(data, sort_keys=True, separators=(',', ':')) + '\n', **kwargs)
+
+    @classmethod
+    def from_text(cls, text, content_type='text/plain', **kwargs):
+        """Pre-render a text body"""
+        return cls(text, content_type=content_type, **kwargs)
+
+    def render(self, **values):
+        """Build the body for one request"""
+        encoded = {name: str(value).encode('utf-8') for name, value in values.items()}
+        parts = [None] * (2 * len(self.segments) - 1)
+        parts[0::2] = self.segments
+        parts[1::2] = [encoded[name] for name in self.slots]
+        return b''.join(parts)
+
+    def response(self, headers=None, **values):
+        """Build the Flask response for one request"""
+        response = Response(self.render(**values), content_type=self.content_type)
+        response.headers.update(self.headers)
+        if headers:
+            response.headers.update(headers)
+        return response
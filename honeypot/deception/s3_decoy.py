@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+S3-Compatible Decoy
+-------------------
+This module serves the decoy bucket over the S3 REST API (path-style), so
+tools configured with the leaked AWS key reach it: ListObjects(V2),
+GetObject, HeadObject, PutObject and DeleteObject, with SigV4 and SigV2
+authorization headers parsed and checked against the leaked secret.
+"""
+
+import re
+import hmac
+import uuid
+import bisect
+import hashlib
+import logging
+from datetime import datetime, timezone
+from urllib.parse import quote, parse_qsl
+from xml.sax.saxutils import escape
+from flask import Blueprint, request, Response
+from werkzeug.http import http_date
+
+from .api_honeypot import (
+    FAKE_CREDS, OBJECT_METADATA, DECOY_OBJECTS, log_interaction, publish_interaction, stream_decoy_object
+)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('s3_decoy')
+
+BUCKET = FAKE_CREDS['aws']['bucket']
+S3_NAMESPACE = 'http://s3.amazonaws.com/doc/2006-03-01/'
+
+# Virtual bucket: the listed decoy objects in key order
+BUCKET_KEYS = sorted(FAKE_CREDS['aws']['objects'])
+
+# Upload bodies are read and discarded in chunks of this size
+UPLOAD_CHUNK_SIZE = 65536
+
+SIGV4_HEADER = re.compile(
+    r'AWS4-HMAC-SHA256\s+Credential=(?P<credential>[^,\s]+),\s*'
+    r'SignedHeaders=(?P<signed_headers>[^,\s]+),\s*Signature=(?P<signature>[0-9a-f]+)'
+)
+SIGV2_HEADER = re.compile(r'AWS\s+(?P<access_key>[^:\s]+):(?P<signature>\S+)')
+
+s3_decoy_bp = Blueprint('s3_decoy', __name__)
+
+# Decoy interactions are published once the response size is known
+s3_decoy_bp.after_request(publish_interaction)
+
+def _uri_encode(value, safe='-_.~'):
+    return quote(value, safe=safe)
+
+def _signing_key(secret, date, region, service):
+    key = ('AWS4' + secret).encode()
+    for part in (date, region, service, 'aws4_request'):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    return key
+
+def parse_authorization():
+    """
+    Extract the caller's credentials from the Authorization header or a presigned URL
+
+    Returns:
+        auth: Dictionary with scheme, access_key, region and, for SigV4,
+            whether the signature matches the leaked secret
+    """
+    header = request.headers.get('Authorization', '')
+    match = SIGV4_HEADER.match(header)
+    if match:
+        credential = match.group('credential')
+        signed_headers = match.group('signed_headers')
+        signature = match.group('signature')
+        amz_date = request.headers.get('X-Amz-Date', '')
+        payload_hash = request.headers.get('X-Amz-Content-Sha256', 'UNSIGNED-PAYLOAD')
+        presigned = False
+    elif request.args.get('X-Amz-Algorithm') == 'AWS4-HMAC-SHA256':
+        credential = request.args.get('X-Amz-Credential', '')
+        signed_headers = request.args.get('X-Amz-SignedHeaders', 'host')
+        signature = request.args.get('X-Amz-Signature', '')
+        amz_date = request.args.get('X-Amz-Date', '')
+        payload_hash = 'UNSIGNED-PAYLOAD'
+        presigned = True
+    else:
+        match = SIGV2_HEADER.match(header)
+        if match:
+            return {'scheme': 'SigV2', 'access_key': match.group('access_key'), 'region': None,
+                    'signature_valid': None}
+        return {'scheme': 'anonymous', 'access_key': None, 'region': None, 'signature_valid': None}
+
+    parts = credential.split('/')
+    if len(parts) != 5:
+        return {'scheme': 'SigV4', 'access_key': parts[0], 'region': None, 'signature_valid': False}
+    access_key, date, region, service, _ = parts
+
+    valid = None
+    if access_key == FAKE_CREDS['aws']['access_key']:
+        valid = _verify_sigv4(signed_headers, signature, amz_date, payload_hash, presigned,
+                              date, region, service)
+    return {'scheme': 'SigV4', 'access_key': access_key, 'region': region, 'signature_valid': valid,
+            'signed_headers': signed_headers, 'presigned': presigned}
+
+def _verify_sigv4(signed_headers, signature, amz_date, payload_hash, presigned, date, region, service):
+    """Recompute a SigV4 signature with the leaked secret key"""
+    query = [
+        (key, value) for key, value in parse_qsl(request.query_string.decode('latin-1'), keep_blank_values=True)
+        if not (presigned and key == 'X-Amz-Signature')
+    ]
+    canonical_query = '&'.join(
+        f'{_uri_encode(key)}={_uri_encode(value)}' for key, value in sorted(query)
+    )
+    canonical_headers = ''.join(
+        f"{name}:{' '.join(request.headers.get(name, '').split())}\n"
+        for name in signed_headers.split(';')
+    )
+    canonical_request = '\n'.join([
+        request.method, _uri_encode(request.path, safe='/-_.~'), canonical_query,
+        canonical_headers, signed_headers, payload_hash
+    ])
+    string_to_sign = '\n'.join([
+        'AWS4-HMAC-SHA256', amz_date, f'{date}/{region}/{service}/aws4_request',
+        hashlib.sha256(canonical_request.encode()).hexdigest()
+    ])
+    expected = hmac.new(
+        _signing_key(FAKE_CREDS['aws']['secret_key'], date, region, service),
+        string_to_sign.encode(), hashlib.sha256
+    ).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+def _request_id():
+    return uuid.uuid4().hex[:16].upper()
+
+def _xml_response(body, status=200, headers=None):
+    response = Response(
+        '<?xml version="1.0" encoding="UTF-8"?>\n' + body, status=status, content_type='application/xml'
+    )
+    response.headers.update(_s3_headers())
+    if headers:
+        response.headers.update(headers)
+    return response
+
+def _s3_headers():
+    request_id = _request_id()
+    return {
+        'x-amz-request-id': request_id,
+        'x-amz-id-2': hashlib.sha256(request_id.encode()).hexdigest(),
+        'Server': 'AmazonS3'
+    }
+
+def s3_error(code, message, status, resource=None):
+    """S3 error document"""
+    body = (
+        f'<Error><Code>{code}</Code><Message>{escape(message)}</Message>'
+        f'<Resource>{escape(resource or request.path)}</Resource><RequestId>{_request_id()}</RequestId></Error>'
+    )
+    return _xml_response(body, status=status)
+
+def _record(operation, endpoint, auth, tracking_id=None, **details):
+    """Log the S3 call as a decoy interaction"""
+    data = {'operation': operation, 'bucket': BUCKET, **details, **auth}
+    return log_interaction(endpoint, request.remote_addr, data=data, tracking_id=tracking_id)
+
+def _authorize(auth):
+    """Reject anonymous and unknown keys the way S3 would"""
+    if auth['access_key'] is None:
+        return s3_error('AccessDenied', 'Access Denied', 403)
+    if auth['access_key'] != FAKE_CREDS['aws']['access_key']:
+        return s3_error('InvalidAccessKeyId',
+                        'The AWS Access Key Id you provided does not exist in our records.', 403)
+    return None
+
+def _object_xml(key):
+    metadata = OBJECT_METADATA[key]
+    etag = escape(metadata['ETag'], {'"': '&quot;'})
+    return (
+        f"<Contents><Key>{escape(key)}</Key><LastModified>{metadata['LastModified']}</LastModified>"
+        f"<ETag>{etag}</ETag><Size>{metadata['Size']}</Size>"
+        f"<StorageClass>STANDARD</StorageClass></Contents>"
+    )
+
+@s3_decoy_bp.route(f'/{BUCKET}', methods=['GET', 'HEAD'])
+@s3_decoy_bp.route(f'/{BUCKET}/', methods=['GET', 'HEAD'])
+def bucket_operation():
+    """ListObjects / ListObjectsV2, HeadBucket and GetBucketLocation"""
+    auth = parse_authorization()
+
+    if request.method == 'HEAD':
+        _record('HeadBucket', '/aws/s3/head', auth)
+        denied = _authorize(auth)
+        if denied:
+            return denied
+        response = Response(status=200)
+        response.headers.update(_s3_headers())
+        response.headers['x-amz-bucket-region'] = FAKE_CREDS['aws']['region']
+        return response
+
+    if 'location' in request.args:
+        _record('GetBucketLocation', '/aws/s3/location', auth)
+        return _authorize(auth) or _xml_response(
+            f'<LocationConstraint xmlns="{S3_NAMESPACE}">{FAKE_CREDS["aws"]["region"]}</LocationConstraint>'
+        )
+
+    v2 = request.args.get('list-type') == '2'
+    prefix = request.args.get('prefix', '')
+    delimiter = request.args.get('delimiter', '')
+    max_keys = max(0, min(request.args.get('max-keys', 1000, type=int), 1000))
+    start = request.args.get('continuation-token') or request.args.get('start-after') if v2 \
+        else request.args.get('marker')
+    _record('ListObjectsV2' if v2 else 'ListObjects', '/aws/s3/list', auth, prefix=prefix)
+    denied = _authorize(auth)
+    if denied:
+        return denied
+
+    # Keys after the start marker that match the prefix, rolled up by delimiter
+    position = bisect.bisect_right(BUCKET_KEYS, start) if start else 0
+    contents, prefixes, last = [], [], None
+    truncated = False
+    for key in BUCKET_KEYS[position:]:
+        if not key.startswith(prefix):
+            continue
+        if len(contents) + len(prefixes) >= max_keys:
+            truncated = True
+            break
+        cut = key.find(delimiter, len(prefix)) if delimiter else -1
+        if cut >= 0:
+            common = key[:cut + len(delimiter)]
+            if common not in prefixes:
+                prefixes.append(common)
+        else:
+            contents.append(key)
+        last = key
+
+    body = [f'<ListBucketResult xmlns="{S3_NAMESPACE}"><Name>{BUCKET}</Name><Prefix>{escape(prefix)}</Prefix>']
+    if v2:
+        body.append(f'<KeyCount>{len(contents) + len(prefixes)}</KeyCount>')
+        if request.args.get('continuation-token'):
+            body.append(f'<ContinuationToken>{escape(request.args["continuation-token"])}</ContinuationToken>')
+        if truncated:
+            body.append(f'<NextContinuationToken>{escape(last)}</NextContinuationToken>')
+    else:
+        body.append(f'<Marker>{escape(start or "")}</Marker>')
+        if truncated:
+            body.append(f'<NextMarker>{escape(last)}</NextMarker>')
+    if delimiter:
+        body.append(f'<Delimiter>{escape(delimiter)}</Delimiter>')
+    body.append(f'<MaxKeys>{max_keys}</MaxKeys><IsTruncated>{"true" if truncated else "false"}</IsTruncated>')
+    body.extend(_object_xml(key) for key in contents)
+    body.extend(f'<CommonPrefixes><Prefix>{escape(common)}</Prefix></CommonPrefixes>' for common in prefixes)
+    body.append('</ListBucketResult>')
+    return _xml_response(''.join(body))
+
+@s3_decoy_bp.route(f'/{BUCKET}/<path:key>', methods=['GET', 'HEAD', 'PUT', 'DELETE'])
+def object_operation(key):
+    """GetObject, HeadObject, PutObject and DeleteObject"""
+    auth = parse_authorization()
+
+    if request.method == 'PUT':
+        # Drain the upload in chunks; nothing is kept
+        digest, size = hashlib.md5(), 0
+        while True:
+            chunk = request.stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+        _record('PutObject', f'/aws/s3/upload/{key}', auth, key=key, size=size,
+                content_type=request.headers.get('Content-Type'))
+        denied = _authorize(auth)
+        if denied:
+            return denied
+        response = Response(status=200)
+        response.headers.update(_s3_headers())
+        response.headers['ETag'] = f'"{digest.hexdigest()}"'
+        return response
+
+    if request.method == 'DELETE':
+        _record('DeleteObject', f'/aws/s3/delete/{key}', auth, key=key)
+        denied = _authorize(auth)
+        if denied:
+            return denied
+        response = Response(status=204)
+        response.headers.update(_s3_headers())
+        return response
+
+    operation = 'HeadObject' if request.method == 'HEAD' else 'GetObject'
+    endpoint = f'/aws/s3/head/{key}' if request.method == 'HEAD' else f'/aws/s3/download/{key}'
+    tracking_id = _record(operation, endpoint, auth, key=key, range=request.headers.get('Range'))
+    denied = _authorize(auth)
+    if denied:
+        return denied
+    if key not in DECOY_OBJECTS or key not in BUCKET_KEYS:
+        return s3_error('NoSuchKey', 'The specified key does not exist.', 404, resource=key)
+
+    if request.method == 'HEAD':
+        metadata = OBJECT_METADATA[key]
+        response = Response(status=200, content_type='binary/octet-stream')
+        response.headers.update(_s3_headers())
+        response.headers['Content-Length'] = str(metadata['Size'])
+        response.headers['ETag'] = metadata['ETag']
+        response.headers['Last-Modified'] = http_date(
+            datetime.strptime(metadata['LastModified'], "%Y-%m-%dT%H:%M:%S.000Z").replace(tzinfo=timezone.utc)
+        )
+        response.headers['Accept-Ranges'] = 'bytes'
+        return response
+
+    # Streamed at the object's advertised size, throttled per attacker
+    return stream_decoy_object(key, tracking_id, request.remote_addr, headers=_s3_headers())
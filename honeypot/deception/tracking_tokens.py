@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Deception Tracking Tokens
+-------------------------
+This module issues the trackers embedded in decoy credentials as stateless,
+HMAC-signed tokens. A token carries the attacker IP, decoy endpoint, issue
+time and a nonce, so a request reusing it can be recognised by pattern and
+attributed by verifying the signature, without keeping issued trackers.
+"""
+
+import os
+import re
+import hmac
+import time
+import struct
+import base64
+import hashlib
+import ipaddress
+import logging
+from datetime import datetime
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('tracking_tokens')
+
+TOKEN_PREFIX = 'trk_'
+TOKEN_VERSION = 2
+# Lookahead, so a candidate swallowing a later token does not hide it
+TOKEN_PATTERN = re.compile(r'trk_(?=([A-Za-z0-9_-]{32,}))')
+
+NONCE_SIZE = 6
+MAC_SIZE = 10
+MAX_ENDPOINT_BYTES = 64
+
+# version, issue time (seconds), nonce, IP length, endpoint length
+HEADER = struct.Struct(f'>BI{NONCE_SIZE}sBB')
+
+# Encoded characters that always hold the whole header
+HEADER_CHARS = (HEADER.size + 2) // 3 * 4
+
+def _encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+def _decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+def _encoded_length(text):
+    """Length of the token at the start of text (without prefix), read from its header"""
+    try:
+        header = _decode(text[:HEADER_CHARS])
+    except ValueError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    _, _, _, ip_length, endpoint_length = HEADER.unpack_from(header)
+    size = HEADER.size + ip_length + endpoint_length + MAC_SIZE
+    return (size * 4 + 2) // 3
+
+class TrackingTokens:
+    """
+    Issue and verify signed tracking tokens
+
+    A token is trk_ followed by the unpadded base64url encoding of
+    version | issue time | nonce | IP and endpoint lengths | IP | endpoint |
+    HMAC-SHA256 (truncated), about 50 characters for a typical decoy
+    endpoint. The lengths delimit the token, so it is still recognised with
+    text appended to it. Every worker and restart sharing the key recognises
+    the others' tokens.
+
+    Args:
+        key: HMAC key (defaults to TRACKING_TOKEN_KEY, then FLASK_SECRET_KEY,
+            then a random per-process key)
+    """
+    def __init__(self, key=None):
+        key = key or os.getenv('TRACKING_TOKEN_KEY') or os.getenv('FLASK_SECRET_KEY')
+        if not key:
+            # A published default would let anyone forge trackers
+            logger.warning(
+                "No TRACKING_TOKEN_KEY or FLASK_SECRET_KEY set; using a random key, so "
+                "trackers issued by other workers or before a restart will not be recognised"
+            )
+            key = os.urandom(32)
+        self.key = key.encode() if isinstance(key, str) else key
+
+    def _mac(self, body):
+        return hmac.new(self.key, body, hashlib.sha256).digest()[:MAC_SIZE]
+
+    def issue(self, ip, endpoint, issued=None):
+        """
+        Create a token for a decoy response
+
+        Args:
+            ip: Attacker IP address
+            endpoint: Decoy endpoint the token is served from
+            issued: Issue time (defaults to now)
+        """
+        try:
+            packed_ip = ipaddress.ip_address(ip).packed
+        except ValueError:
+            packed_ip = b''
+        issued = int(issued if issued is not None else time.time())
+        packed_endpoint = endpoint.encode('utf-8')[:MAX_ENDPOINT_BYTES]
+        body = (
+            HEADER.pack(TOKEN_VERSION, issued, os.urandom(NONCE_SIZE), len(packed_ip), len(packed_endpoint))
+            + packed_ip
+            + packed_endpoint
+        )
+        return TOKEN_PREFIX + _encode(body + self._mac(body))
+
+    def verify(self, token):
+        """
+        Check a token's signature and decode it
+
+        Returns:
+            info: Dictionary with tracker, ip, timestamp and endpoint, or None
+                if the token is malformed or was not signed with this key
+        """
+        if token.startswith(TOKEN_PREFIX):
+            token = token[len(TOKEN_PREFIX):]
+        try:
+            raw = _decode(token)
+        except ValueError:
+            return None
+        if len(raw) < HEADER.size + MAC_SIZE:
+            return None
+
+        body, mac = raw[:-MAC_SIZE], raw[-MAC_SIZE:]
+        if not hmac.compare_digest(mac, self._mac(body)):
+            return None
+        version, issued, _, ip_length, endpoint_length = HEADER.unpack_from(body)
+        if version != TOKEN_VERSION or ip_length not in (0, 4, 16) \
+                or len(body) != HEADER.size + ip_length + endpoint_length:
+            return None
+
+        packed_ip = body[HEADER.size:HEADER.size + ip_length]
+        return {
+            'tracker': TOKEN_PREFIX + token,
+            'ip': str(ipaddress.ip_address(packed_ip)) if packed_ip else None,
+            'timestamp': datetime.fromtimestamp(issued).isoformat(),
+            'endpoint': body[HEADER.size + ip_length:].decode('utf-8', errors='replace')
+        }
+
+    def find(self, text):
+        """
+        Find the first valid token in a piece of text
+
+        Returns:
+            info: Decoded token (see verify), or None
+        """
+        if TOKEN_PREFIX not in text:
+            return None
+        for match in TOKEN_PATTERN.finditer(text):
+            # The pattern also swallows any token characters that follow it
+            candidate = match.group(1)
+            length = _encoded_length(candidate)
+            if length is None or length > len(candidate):
+                continue
+            info = self.verify(candidate[:length])
+            if info is not None:
+                return info
+        return None
+
+# Shared instance used by the decoy endpoints and analytics
+tracking_tokens = TrackingTokens()
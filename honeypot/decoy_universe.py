@@ -0,0 +1,499 @@
+import os
+import hmac
+import base64
+import struct
+import hashlib
+from urllib.parse import urlencode
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+
+from faker import Faker
+
+from data_generator import (
+    CORPORATE_DOMAINS, JOB_TITLES, TRANSACTION_TYPES, CURRENCIES, TRANSACTION_STATUSES,
+    TRANSACTION_STATUS_WEIGHTS, PAYMENT_CATEGORIES, LOG_TYPES, LOG_SERVICES, ACCESS_PATHS,
+    ACCESS_METHODS, ACCESS_STATUSES, ERROR_MESSAGES, SECURITY_MESSAGES, ERROR_LEVEL_WEIGHTS,
+    SECURITY_LEVEL_WEIGHTS, LOG_LEVELS
+)
+
+MASK64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+# Record streams; each record of each stream has its own PRNG sequence
+USERS, TRANSACTIONS, LOGS, TOTALS = 1, 2, 3, 4
+
+VOCAB_SIZE = 1024
+
+# Log levels per log type (counts of INFO, WARNING, ERROR, CRITICAL), following
+# the access statuses and the error, system and security level weights
+LOG_LEVEL_COUNTS = {
+    "access": [9, 9, 2, 0],
+    "error": [0] + [round(weight * 20) for weight in ERROR_LEVEL_WEIGHTS],
+    "system": [17, 3, 0, 0],
+    "security": [0] + [round(weight * 20) for weight in SECURITY_LEVEL_WEIGHTS]
+}
+
+# Access statuses logged at each level
+ACCESS_STATUSES_BY_LEVEL = {
+    level: [status for status in ACCESS_STATUSES
+            if ("INFO" if status < 400 else "WARNING" if status < 500 else "ERROR") == level]
+    for level in LOG_LEVELS
+}
+
+# Fields that listings can be filtered on. Their values are dealt to records
+# in shuffled blocks holding each value (combination) count times, so the
+# k-th record matching a filter is found without scanning. Counts given as a
+# dict depend on the value of the stream's first field.
+CATEGORIES = {
+    USERS: [("job_title", JOB_TITLES, [1] * len(JOB_TITLES))],
+    TRANSACTIONS: [
+        ("type", TRANSACTION_TYPES, [1] * len(TRANSACTION_TYPES)),
+        ("status", TRANSACTION_STATUSES, [round(w * 20) for w in TRANSACTION_STATUS_WEIGHTS])
+    ],
+    LOGS: [
+        ("type", LOG_TYPES, [1] * len(LOG_TYPES)),
+        ("service", LOG_SERVICES, [1] * len(LOG_SERVICES)),
+        ("level", LOG_LEVELS, LOG_LEVEL_COUNTS)
+    ]
+}
+
+# Sort keys a listing honours; all of them follow record index order, which
+# runs in INDEX_ORDER of time (users oldest first, the rest newest first).
+# Other sort keys are rejected rather than silently ignored.
+SORT_KEYS = {
+    USERS: {"created_at", "registered", "registration_date"},
+    TRANSACTIONS: {"created_at", "date", "timestamp"},
+    LOGS: {"date", "time", "timestamp"}
+}
+INDEX_ORDER = {USERS: "asc", TRANSACTIONS: "desc", LOGS: "desc"}
+
+MAX_PER_PAGE = 100
+
+def splitmix64(x):
+    x = (x + GOLDEN_GAMMA) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+class CounterRNG:
+    """
+    Random values for one record, derived from (seed, stream, index)
+
+    Any record can be regenerated on its own, in O(1), with no state kept
+    between calls.
+    """
+    def __init__(self, seed, stream, index):
+        self.state = splitmix64(seed ^ splitmix64((stream << 48) ^ index))
+
+    def next(self):
+        self.state = (self.state + GOLDEN_GAMMA) & MASK64
+        return splitmix64(self.state)
+
+    def below(self, n):
+        return self.next() % n
+
+    def random(self):
+        return (self.next() >> 11) / (1 << 53)
+
+    def randint(self, a, b):
+        return a + self.below(b - a + 1)
+
+    def choice(self, values):
+        return values[self.below(len(values))]
+
+    def weighted(self, values, weights):
+        roll = self.random() * sum(weights)
+        for value, weight in zip(values, weights):
+            roll -= weight
+            if roll < 0:
+                return value
+        return values[-1]
+
+@lru_cache(maxsize=1)
+def vocabulary():
+    # Drawn from a fixed Faker seed, so every worker builds the same words
+    faker = Faker()
+    faker.seed_instance(0)
+    return {
+        "names": [faker.name() for _ in range(VOCAB_SIZE)],
+        "user_names": [faker.user_name() for _ in range(VOCAB_SIZE)],
+        "domains": [faker.domain_name() for _ in range(VOCAB_SIZE)],
+        "passwords": [faker.password(length=8 + i % 7) for i in range(VOCAB_SIZE)],
+        "base_passwords": [faker.password(length=8) for _ in range(VOCAB_SIZE)],
+        "companies": [faker.company() for _ in range(VOCAB_SIZE)]
+    }
+
+@lru_cache(maxsize=4096)
+def _shuffled_block(seed, stream, block, pattern):
+    values = list(pattern)
+    rng = CounterRNG(seed, stream | 0x80, block)
+    for i in range(len(values) - 1, 0, -1):
+        j = rng.below(i + 1)
+        values[i], values[j] = values[j], values[i]
+    return values
+
+class BlockCategories:
+    """
+    Categorical fields of a record stream, assigned by index
+
+    Indexes are split into blocks holding every combination of field values
+    its share of times, shuffled per block. A record's values, the number of
+    records matching a filter and the k-th match each cost O(block size).
+
+    Args:
+        seed: Universe seed
+        stream: Record stream
+        fields: (name, values, counts per block) for each field
+    """
+    def __init__(self, seed, stream, fields):
+        self.seed = seed
+        self.stream = stream
+        self.fields = fields
+        combinations = [()]
+        for _, values, counts in fields:
+            combinations = [
+                previous + ((value_index, count),)
+                for previous in combinations
+                for value_index, count in enumerate(self._counts(counts, previous))
+            ]
+        self.combinations = [tuple(value_index for value_index, _ in combo) for combo in combinations]
+        pattern = []
+        for code, combo in enumerate(combinations):
+            copies = 1
+            for _, count in combo:
+                copies *= count
+            pattern.extend([code] * copies)
+        self.pattern = tuple(pattern)
+        self.block_size = len(pattern)
+
+    def _counts(self, counts, previous):
+        if isinstance(counts, dict):
+            _, first_values, _ = self.fields[0]
+            return counts[first_values[previous[0][0]]]
+        return counts
+
+    def _block(self, block):
+        return _shuffled_block(self.seed, self.stream, block, self.pattern)
+
+    def values(self, index):
+        """Field values of a record"""
+        combo = self.combinations[self._block(index // self.block_size)[index % self.block_size]]
+        return {name: values[value_index] for (name, values, _), value_index in zip(self.fields, combo)}
+
+    def match(self, filters):
+        """
+        Codes of the value combinations a filter accepts
+
+        Args:
+            filters: Field name -> value (case-insensitive); unknown names are ignored
+
+        Returns:
+            codes: Set of combination codes, or None when nothing is filtered
+        """
+        wanted = {}
+        for position, (name, values, _) in enumerate(self.fields):
+            if filters.get(name) is not None:
+                lowered = [value.lower() for value in values]
+                value = filters[name].lower()
+                wanted[position] = lowered.index(value) if value in lowered else -1
+        if not wanted:
+            return None
+        return frozenset(
+            code for code, combo in enumerate(self.combinations)
+            if all(combo[position] == value_index for position, value_index in wanted.items())
+        )
+
+    def count(self, total, codes):
+        """Records among the first total that match"""
+        if codes is None:
+            return total
+        per_block = sum(1 for code in self.pattern if code in codes)
+        blocks, rest = divmod(total, self.block_size)
+        partial = sum(1 for code in self._block(blocks)[:rest] if code in codes) if rest else 0
+        return blocks * per_block + partial
+
+    def nth(self, k, codes):
+        """Index of the k-th matching record"""
+        if codes is None:
+            return k
+        per_block = sum(1 for code in self.pattern if code in codes)
+        block, k = divmod(k, per_block)
+        for offset, code in enumerate(self._block(block)):
+            if code in codes:
+                if not k:
+                    return block * self.block_size + offset
+                k -= 1
+
+def _query_args(args, **changes):
+    query = {key: value for key, value in args.items() if key not in ("page", "cursor")}
+    query.update(changes)
+    return urlencode(query)
+
+def _int_arg(args, name, default):
+    try:
+        return int(args.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+def _hex(rng, digits):
+    return ''.join(f"{rng.next():016x}" for _ in range((digits + 15) // 16))[:digits]
+
+class DecoyUniverse:
+    """
+    A consistent virtual dataset for one attacker or session
+
+    The seed is an HMAC of the key, so the same key sees the same users,
+    transactions and logs on every request and every worker. Records are
+    generated on demand from a counter-based PRNG and never stored: a page
+    costs O(page size) however large the dataset. Times are relative to the
+    start of the current day, so they hold still between requests.
+
+    Args:
+        key: Attacker IP or session ID
+        secret: Seed key (defaults to DECOY_UNIVERSE_SECRET, then FLASK_SECRET_KEY)
+    """
+    def __init__(self, key, secret=None):
+        secret = secret or os.getenv('DECOY_UNIVERSE_SECRET') or os.getenv(
+            'FLASK_SECRET_KEY', 'honeypot_secret_key_change_in_production'
+        )
+        digest = hmac.new(secret.encode(), str(key).encode(), hashlib.sha256).digest()
+        self.seed = int.from_bytes(digest[:8], 'big')
+        self.id_mask = int.from_bytes(digest[8:12], 'big')
+
+        totals = CounterRNG(self.seed, TOTALS, 0)
+        self.user_count = totals.randint(50000, 1000000)
+        self.transaction_count = totals.randint(50000, 1000000)
+        self.log_count = totals.randint(500, 2000)
+        self.vocab = vocabulary()
+        self.categories = {
+            stream: BlockCategories(self.seed, stream, fields) for stream, fields in CATEGORIES.items()
+        }
+        self.counts = {
+            USERS: self.user_count, TRANSACTIONS: self.transaction_count, LOGS: self.log_count
+        }
+        self.builders = {USERS: self.user, TRANSACTIONS: self.transaction, LOGS: self.log}
+
+    @property
+    def anchor(self):
+        return datetime.combine(date.today(), datetime.min.time())
+
+    def _cursor_tag(self, query_key, position):
+        digest = hashlib.blake2b(f"{query_key}|{position}".encode(), digest_size=4,
+                                 key=self.seed.to_bytes(8, 'big'))
+        return digest.digest()
+
+    def encode_cursor(self, query_key, position):
+        raw = struct.pack('>I', position) + self._cursor_tag(query_key, position)
+        return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+    def decode_cursor(self, query_key, cursor):
+        """Position a cursor points at; ValueError if it was not issued for this query"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        if len(raw) != 8:
+            raise ValueError("Invalid cursor")
+        position = struct.unpack('>I', raw[:4])[0]
+        if not hmac.compare_digest(raw[4:], self._cursor_tag(query_key, position)):
+            raise ValueError("Invalid cursor")
+        return position
+
+    def listing(self, stream, args, path, default_per_page=50):
+        """
+        One page of a record stream, as requested by query arguments
+
+        Supports ?page= or ?cursor=, ?per_page= / ?limit= (at most
+        MAX_PER_PAGE), filters on the stream's CATEGORIES fields, and
+        ?sort= (a SORT_KEYS key, optionally prefixed with -) with
+        ?order=asc|desc. Other sort keys are rejected; other parameters
+        are ignored. Any page costs O(page size) however deep it is.
+
+        Args:
+            stream: USERS, TRANSACTIONS or LOGS
+            args: Query arguments (mapping)
+            path: Path the page links point to
+
+        Returns:
+            listing: Dictionary with items, total, page, per_page,
+                next_cursor, links (rel -> URL) and etag
+
+        Raises:
+            ValueError: If the cursor or sort key is invalid
+        """
+        categories = self.categories[stream]
+        per_page = max(1, min(_int_arg(args, 'per_page', _int_arg(args, 'limit', default_per_page)), MAX_PER_PAGE))
+
+        sort = args.get('sort') or ''
+        order = (args.get('order') or '').lower()
+        if sort.startswith('-'):
+            sort, order = sort[1:], 'desc'
+        if sort and sort not in SORT_KEYS[stream]:
+            raise ValueError(f"Unsupported sort field: {sort}")
+        if order not in ('asc', 'desc'):
+            order = INDEX_ORDER[stream]
+        descending = order != INDEX_ORDER[stream]
+
+        codes = categories.match(args)
+        total = categories.count(self.counts[stream], codes)
+        query_key = f"{stream}|{sorted(codes) if codes is not None else ''}|{descending}|{per_page}"
+
+        cursor = args.get('cursor')
+        if cursor:
+            start = self.decode_cursor(query_key, cursor)
+            page = start // per_page + 1
+        else:
+            page = max(1, _int_arg(args, 'page', 1))
+            start = (page - 1) * per_page
+
+        build = self.builders[stream]
+        items = []
+        for position in range(start, min(start + per_page, total)):
+            k = total - 1 - position if descending else position
+            items.append(build(categories.nth(k, codes)))
+
+        pages = max(1, (total + per_page - 1) // per_page)
+        next_cursor = self.encode_cursor(query_key, start + per_page) if start + per_page < total else None
+        links = {"first": f"{path}?{_query_args(args, page=1)}"}
+        if cursor:
+            if next_cursor:
+                links["next"] = f"{path}?{_query_args(args, cursor=next_cursor)}"
+        else:
+            if page > 1:
+                links["prev"] = f"{path}?{_query_args(args, page=min(page - 1, pages))}"
+            if page < pages:
+                links["next"] = f"{path}?{_query_args(args, page=page + 1)}"
+            links["last"] = f"{path}?{_query_args(args, page=pages)}"
+
+        etag = hashlib.blake2b(
+            f"{self.seed}|{query_key}|{start}|{self.anchor.date()}".encode(), digest_size=12
+        ).hexdigest()
+        return {
+            "items": items,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "next_cursor": next_cursor,
+            "links": links,
+            "etag": etag
+        }
+
+    def user(self, index):
+        rng = CounterRNG(self.seed, USERS, index)
+        vocab = self.vocab
+
+        # 30% gmail, 40% corporate, 30% other domains
+        domain_type = rng.random()
+        if domain_type < 0.3:
+            email_domain = "gmail.com"
+        elif domain_type < 0.7:
+            email_domain = rng.choice(CORPORATE_DOMAINS)
+        else:
+            email_domain = rng.choice(vocab["domains"])
+
+        # Users are in registration order across the decade so far
+        anchor = self.anchor
+        decade = date(anchor.year - anchor.year % 10, 1, 1)
+        span = (anchor.date() - decade).days + 1
+        registered = decade + timedelta(days=int((index + rng.random()) * span / self.user_count))
+        date_format = "%m/%d/%Y" if rng.random() < 0.5 else "%d-%m-%Y"
+
+        # 15% reuse a base password with a suffix
+        if rng.random() < 0.15:
+            password = rng.choice(vocab["base_passwords"]) + rng.choice(['!', '1', '123', '@'])
+        else:
+            password = rng.choice(vocab["passwords"])
+
+        return {
+            "id": self._uuid(rng),
+            "name": rng.choice(vocab["names"]),
+            "email": f"{rng.choice(vocab['user_names'])}@{email_domain}",
+            "job_title": self.categories[USERS].values(index)["job_title"],
+            "registration_date": registered.strftime(date_format),
+            "last_login": (anchor - timedelta(seconds=rng.below(30 * 86400))).isoformat(),
+            "password_hash": f"$2a$10${_hex(rng, 32)}",
+            "password_hint": password if rng.random() < 0.05 else None
+        }
+
+    def _uuid(self, rng):
+        digits = _hex(rng, 32)
+        return f"{digits[:8]}-{digits[8:12]}-4{digits[13:16]}-a{digits[17:20]}-{digits[20:]}"
+
+    def transaction_id(self, index):
+        # The masked index is the start of the last group; the rest authenticates it
+        tag = splitmix64(self.seed ^ (TRANSACTIONS << 56) ^ index)
+        digits = f"{tag:016x}{splitmix64(tag):016x}"
+        return f"{digits[:8]}-{digits[8:12]}-4{digits[12:15]}-a{digits[15:18]}-{index ^ self.id_mask:08x}{digits[18:22]}"
+
+    def transaction(self, index):
+        rng = CounterRNG(self.seed, TRANSACTIONS, index)
+        values = self.categories[TRANSACTIONS].values(index)
+        transaction_type = values["type"]
+
+        # Transactions are a timeline over the last month, newest first
+        slot = 31 * 86400 / self.transaction_count
+        transaction = {
+            "id": self.transaction_id(index),
+            "type": transaction_type,
+            "amount": round(10 + rng.random() * 9990, 2),
+            "currency": rng.choice(CURRENCIES),
+            "status": values["status"],
+            "timestamp": (self.anchor - timedelta(seconds=(index + rng.random()) * slot)).isoformat()
+        }
+        if transaction_type == "transfer":
+            transaction["source_account"] = f"ACCT-{rng.below(100000):05d}"
+            transaction["destination_account"] = f"ACCT-{rng.below(100000):05d}"
+        elif transaction_type == "payment":
+            transaction["merchant"] = rng.choice(self.vocab["companies"])
+            transaction["category"] = rng.choice(PAYMENT_CATEGORIES)
+        return transaction
+
+    def transaction_by_id(self, transaction_id):
+        """Look up a transaction by ID in O(1); None if it is not in this universe"""
+        try:
+            index = int(transaction_id.split('-')[4][:8], 16) ^ self.id_mask
+        except (IndexError, ValueError):
+            return None
+        if index >= self.transaction_count or self.transaction_id(index) != transaction_id.lower():
+            return None
+        return self.transaction(index)
+
+    def log(self, index):
+        rng = CounterRNG(self.seed, LOGS, index)
+        values = self.categories[LOGS].values(index)
+        log_type = values["type"]
+        service = values["service"]
+        level = values["level"]
+
+        # The level is a listing category; the message is drawn to match it
+        if log_type == "access":
+            status = rng.choice(ACCESS_STATUSES_BY_LEVEL[level])
+            message = f"{rng.choice(ACCESS_METHODS)} {rng.choice(ACCESS_PATHS)} {status}"
+        elif log_type == "system" and level == "WARNING":
+            message = rng.choice([f"Memory usage: {rng.randint(81, 99)}%", f"CPU usage: {rng.randint(81, 100)}%"])
+        elif log_type == "system":
+            message = rng.choice([
+                "System started", "System shutdown", "Backup completed", "Cache cleared",
+                f"Memory usage: {rng.randint(10, 80)}%", f"CPU usage: {rng.randint(5, 80)}%"
+            ])
+        else:
+            message = rng.choice(ERROR_MESSAGES if log_type == "error" else SECURITY_MESSAGES)
+
+        # Logs are a timeline over the last week, newest first
+        slot = 7 * 86400 / self.log_count
+        timestamp = self.anchor - timedelta(seconds=(index + rng.random()) * slot)
+        host = rng.next()
+        return {
+            "timestamp": timestamp.isoformat(),
+            "service": service,
+            "type": log_type,
+            "level": level,
+            "message": message,
+            "host": f"{host >> 24 & 255}.{host >> 16 & 255}.{host >> 8 & 255}.{host & 255}"
+                if rng.random() < 0.7 else "localhost"
+        }
+
+@lru_cache(maxsize=4096)
+def universe_for(key):
+    """The decoy universe of an attacker or session"""
+    return DecoyUniverse(key)
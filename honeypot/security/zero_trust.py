@@ -19,7 +19,6 @@ from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify, session, g, redirect, url_for
 import jwt
-import requests
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
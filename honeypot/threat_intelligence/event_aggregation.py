@@ -0,0 +1,165 @@
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class AggregatedEvent:
+    """An open MISP event collecting every attack from one IP in one time window"""
+    def __init__(self, ip, event, opened_at):
+        self.ip = ip
+        self.event = event
+        self.opened_at = opened_at
+        self.event_id = (
+            f"mock_event_{datetime.fromtimestamp(opened_at).strftime('%Y%m%d_%H%M%S')}_"
+            f"{ip.replace('.', '_').replace(':', '_')}_{uuid.uuid4().hex[:8]}"
+        )
+        self.first_seen = datetime.fromtimestamp(opened_at).isoformat()
+        self.last_seen = self.first_seen
+        self.sighting_count = 0
+        self.threat_score = 0.0
+        self.threat_indicators = set()
+        self.attack_types = set()
+        self.reported = False
+
+    def summary(self):
+        """Aggregated attack data in the same shape as a single attack_data dict"""
+        return {
+            "ip": self.ip,
+            "threat_score": self.threat_score,
+            "threat_indicators": sorted(self.threat_indicators),
+            "attack_types": sorted(self.attack_types),
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "sighting_count": self.sighting_count
+        }
+
+class EventAggregator:
+    """
+    Keeps one open MISP event per attacker per time window
+
+    New attacks from an IP with an open event are merged into it: attributes
+    are deduplicated by (type, value) and counted as sightings instead of
+    producing a new event. Events are flushed once their window closes,
+    checked on every attack and, once started, every flush_interval seconds
+    by a background thread, so a quiet attacker's event is still submitted.
+    """
+    def __init__(self, event_factory, window_seconds=3600, flush_callback=None, flush_interval=60):
+        self.event_factory = event_factory
+        self.window_seconds = window_seconds
+        self.flush_callback = flush_callback
+        self.flush_interval = min(flush_interval, window_seconds)
+        self.thread = None
+
+        # Insertion order is open order, and every window has the same length,
+        # so the oldest open event is always the next one to expire
+        self.open_events = OrderedDict()
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the thread flushing expired events"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name='misp-event-flush', daemon=True)
+            self.thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush_expired()
+
+    def add(self, attack_data, attributes, tags, now=None):
+        """
+        Merge an attack into the attacker's open event
+
+        Args:
+            attack_data: Dictionary containing attack information
+            attributes: MISPAttribute objects describing this attack
+            tags: Event-level tags for this attack
+            now: Epoch timestamp of the attack (defaults to current time)
+
+        Returns:
+            record: The AggregatedEvent the attack was merged into
+            is_new: True if a new event was opened for this attack
+        """
+        now = now or time.time()
+        ip = attack_data['ip']
+
+        with self.lock:
+            expired = self._pop_expired(now)
+
+            record = self.open_events.get(ip)
+            is_new = record is None
+            if is_new:
+                record = AggregatedEvent(ip, self.event_factory(ip), now)
+                self.open_events[ip] = record
+
+            timestamp = datetime.fromtimestamp(now).isoformat()
+            for attribute in attributes:
+                record.event.add_or_sight_attribute(attribute, timestamp)
+            for tag in tags:
+                record.event.add_tag(tag)
+
+            record.last_seen = timestamp
+            record.sighting_count += 1
+            record.threat_score = max(record.threat_score, attack_data.get('threat_score', 0))
+            record.threat_indicators.update(attack_data.get('threat_indicators', []))
+            record.attack_types.update(attack_data.get('attack_types', []))
+
+        # Submit closed events outside the lock so file I/O never blocks ingestion
+        self._flush_records(expired)
+
+        return record, is_new
+
+    def flush_expired(self, now=None):
+        """Flush every event whose window has closed"""
+        with self.lock:
+            expired = self._pop_expired(now or time.time())
+        return self._flush_records(expired)
+
+    def claim_report(self, record):
+        """Mark an event as reported; True only for the first caller"""
+        with self.lock:
+            if record.reported:
+                return False
+            record.reported = True
+            return True
+
+    def flush_all(self):
+        """Flush every open event, e.g. on shutdown"""
+        with self.lock:
+            records = list(self.open_events.values())
+            self.open_events.clear()
+        return self._flush_records(records)
+
+    def _pop_expired(self, now):
+        """Remove and return open events whose window has closed"""
+        expired = []
+        while self.open_events:
+            ip, record = next(iter(self.open_events.items()))
+            if now - record.opened_at < self.window_seconds:
+                break
+            del self.open_events[ip]
+            expired.append(record)
+        return expired
+
+    def _flush_records(self, records):
+        """Hand closed events to the flush callback"""
+        event_ids = []
+        for record in records:
+            if self.flush_callback:
+                try:
+                    self.flush_callback(record)
+                except Exception as e:
+                    logger.error(f"Error flushing aggregated event {record.event_id}: {e}")
+                    continue
+            event_ids.append(record.event_id)
+
+        if event_ids:
+            logger.info(f"Flushed {len(event_ids)} aggregated MISP events")
+        return event_ids
@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from datetime import datetime, timezone
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def format_date_added(ts):
+    """Format an epoch timestamp as a TAXII date_added string"""
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+def parse_date_added(value):
+    """Parse a TAXII timestamp into an epoch float"""
+    value = value.strip()
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+class IndicatorStore:
+    """
+    Append-only store of STIX objects indexed by date_added
+
+    Objects are appended to a log file as "<date_added>\\t<json>" lines. Only
+    the date_added timestamps and file offsets are kept in memory, so a page
+    of results is a binary search plus a few seeks, and object bodies are
+    served as stored without being re-serialized.
+    """
+    def __init__(self, store_dir='threat_intel/taxii'):
+        self.store_dir = store_dir
+        self.log_file = os.path.join(store_dir, 'objects.log')
+        os.makedirs(store_dir, exist_ok=True)
+
+        self.added = []      # date_added epoch per entry, strictly increasing
+        self.offsets = []    # byte offset of the JSON body per entry
+        self.lengths = []    # byte length of the JSON body per entry
+        self.versions = {}   # object id -> latest stored 'modified'
+        self.latest = {}     # object id -> entry of the latest stored version
+        self.lock = threading.Lock()
+
+        self._load()
+
+    def __len__(self):
+        return len(self.added)
+
+    def _load(self):
+        """Rebuild the in-memory index from the log file"""
+        if not os.path.exists(self.log_file):
+            return
+
+        offset = 0
+        with open(self.log_file, 'rb') as f:
+            for line in f:
+                tab = line.find(b'\t')
+                if tab > 0 and line.endswith(b'\n'):
+                    try:
+                        obj = json.loads(line[tab + 1:])
+                        self.added.append(parse_date_added(line[:tab].decode()))
+                        self.offsets.append(offset + tab + 1)
+                        self.lengths.append(len(line) - tab - 2)
+                        self.versions[obj['id']] = obj.get('modified', '')
+                        self.latest[obj['id']] = len(self.added) - 1
+                    except (ValueError, KeyError):
+                        logger.warning(f"Skipping corrupt entry at offset {offset} in {self.log_file}")
+                offset += len(line)
+
+        logger.info(f"Loaded {len(self.added)} indexed STIX objects from {self.log_file}")
+
+    def add(self, stix_object):
+        """
+        Append a STIX object unless this version is already stored
+
+        Returns:
+            date_added: The date_added string, or None if the object was skipped
+        """
+        body = json.dumps(stix_object, separators=(',', ':')).encode('utf-8')
+        modified = stix_object.get('modified', '')
+
+        with self.lock:
+            if stix_object['id'] in self.versions and self.versions[stix_object['id']] >= modified:
+                return None
+
+            # date_added must be unique and increasing for added_after paging
+            now = time.time()
+            if self.added and now <= self.added[-1]:
+                now = self.added[-1] + 1e-6
+            date_added = format_date_added(now)
+            prefix = date_added.encode('ascii') + b'\t'
+
+            with open(self.log_file, 'ab') as f:
+                offset = f.tell()
+                f.write(prefix + body + b'\n')
+
+            self.added.append(now)
+            self.offsets.append(offset + len(prefix))
+            self.lengths.append(len(body))
+            self.versions[stix_object['id']] = modified
+            self.latest[stix_object['id']] = len(self.added) - 1
+
+        return date_added
+
+    def get(self, object_id):
+        """
+        Get the latest stored version of an object
+
+        Returns:
+            stix_object: The object, or None if it is not stored
+        """
+        with self.lock:
+            entry = self.latest.get(object_id)
+            if entry is None:
+                return None
+            offset, length = self.offsets[entry], self.lengths[entry]
+
+        with open(self.log_file, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def query(self, added_after=None, limit=100, start=None):
+        """
+        Get a page of objects added after a timestamp
+
+        Args:
+            added_after: Only include objects added strictly after this timestamp
+            limit: Maximum number of objects to return
+            start: Entry position to resume from (the 'next' token of a previous page)
+
+        Returns:
+            page: Dictionary with raw object bodies, date_added bounds and paging info
+        """
+        with self.lock:
+            total = len(self.added)
+            if start is None:
+                start = bisect.bisect_right(self.added, added_after) if added_after is not None else 0
+            end = min(start + limit, total)
+            spans = list(zip(self.offsets[start:end], self.lengths[start:end]))
+            added = self.added[start:end]
+
+        bodies = []
+        if spans:
+            with open(self.log_file, 'rb') as f:
+                for offset, length in spans:
+                    f.seek(offset)
+                    bodies.append(f.read(length))
+
+        return {
+            "objects": bodies,
+            "date_added": [format_date_added(ts) for ts in added],
+            "date_added_first": format_date_added(added[0]) if added else None,
+            "date_added_last": format_date_added(added[-1]) if added else None,
+            "more": end < total,
+            "next": end if end < total else None,
+            "total": total
+        }
@@ -1,9 +1,16 @@
 import os
 import json
+import time
+import atexit
 import logging
-import requests
+import threading
 from datetime import datetime
 
+from threat_intelligence.event_aggregation import EventAggregator
+from threat_intelligence.stix_export import StixBundleExporter, stix_id, stix_timestamp
+from threat_intelligence.indicator_store import IndicatorStore
+from utils.http_client import get_http_client
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,12 +21,31 @@ class MISPEvent:
         self.info = ""
         self.attributes = []
         self.tags = []
+        self._attribute_index = {}
         
     def add_attribute(self, attribute):
         self.attributes.append(attribute)
+        self._attribute_index[(attribute.type, attribute.value)] = attribute
+        
+    def get_attribute(self, attr_type, value):
+        return self._attribute_index.get((attr_type, value))
+        
+    def add_or_sight_attribute(self, attribute, timestamp):
+        """Add an attribute, or record a sighting if the event already has it"""
+        existing = self.get_attribute(attribute.type, attribute.value)
+        if existing is None:
+            attribute.add_sighting(timestamp)
+            self.add_attribute(attribute)
+            return attribute
+        
+        existing.add_sighting(timestamp)
+        for tag in attribute.tags:
+            existing.add_tag(tag)
+        return existing
         
     def add_tag(self, tag):
-        self.tags.append(tag)
+        if tag not in self.tags:
+            self.tags.append(tag)
         
     def to_dict(self):
         return {
@@ -35,20 +61,37 @@ class MISPAttribute:
         self.value = ""
         self.comment = ""
         self.tags = []
+        self.first_seen = None
+        self.last_seen = None
+        self.sighting_count = 0
         
     def add_tag(self, tag):
-        self.tags.append(tag)
+        if tag not in self.tags:
+            self.tags.append(tag)
+        
+    def add_sighting(self, timestamp):
+        if self.first_seen is None:
+            self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.sighting_count += 1
         
     def to_dict(self):
-        return {
+        attr_dict = {
             "type": self.type,
             "value": self.value,
             "comment": self.comment,
             "tags": self.tags
         }
+        if self.sighting_count:
+            attr_dict.update({
+                "first_seen": self.first_seen,
+                "last_seen": self.last_seen,
+                "sighting_count": self.sighting_count
+            })
+        return attr_dict
 
 class ThreatIntelSender:
-    def __init__(self, misp_url=None, misp_key=None, abuseipdb_key=None):
+    def __init__(self, misp_url=None, misp_key=None, abuseipdb_key=None, aggregation_window=None):
         self.misp_url = misp_url or os.getenv('MISP_URL', 'https://misp.example.com')
         self.misp_key = misp_key or os.getenv('MISP_KEY', 'demo_key')
         self.abuseipdb_key = abuseipdb_key or os.getenv('ABUSEIPDB_KEY', 'demo_key')
@@ -58,78 +101,129 @@ class ThreatIntelSender:
         
         # Directory for storing shared threat intel
         os.makedirs('threat_intel', exist_ok=True)
+        
+        # One open event per attacker per window instead of one event per attack
+        self.aggregation_window = aggregation_window or int(os.getenv('MISP_AGGREGATION_WINDOW', '3600'))
+        self.aggregator = EventAggregator(
+            event_factory=self._new_event,
+            window_seconds=self.aggregation_window,
+            flush_callback=self._submit_aggregated_event
+        ).start()
+        atexit.register(self.flush_events)
+        
+        # Bulk STIX bundles for feed consumers, exported on a schedule once started
+        self.stix_exporter = StixBundleExporter()
+        self.bundle_interval = int(os.getenv('STIX_BUNDLE_INTERVAL', '86400'))
+        self.bundle_thread = None
+        
+        # Indexed store of generated indicators, served by the TAXII endpoint
+        self.indicator_store = IndicatorStore()
+        
+        # Indicators queued from the request path, exported by a background thread
+        self.indicator_interval = float(os.getenv('STIX_INDICATOR_INTERVAL', '10'))
+        self.pending_indicators = {}
+        self.indicator_lock = threading.Lock()
+        self.indicator_thread = threading.Thread(
+            target=self._export_indicators,
+            name='stix-indicators',
+            daemon=True
+        )
+        self.indicator_thread.start()
+        atexit.register(self.flush_indicators)
     
     def create_event(self, attack_data):
         """
-        Create a MISP event for a detected attack
+        Record a detected attack in the attacker's open MISP event
+        
+        Attacks from the same IP within the aggregation window share one event:
+        new indicators are appended as attributes and repeated indicators are
+        counted as sightings. The event is submitted when its window closes.
         
         Args:
             attack_data: Dictionary containing attack information
         
         Returns:
-            event_id: ID of the created event
+            event_id: ID of the (open) event the attack was recorded in
         """
-        logger.info(f"Creating MISP event for attack from {attack_data['ip']}")
-        
         try:
-            # Create MISP event
-            event = MISPEvent()
-            event.info = f"Honeypot Attack: {attack_data['ip']}"
-            
-            # Add IP as IOC
-            attr_ip = MISPAttribute()
-            attr_ip.type = "ip-dst"
-            attr_ip.value = attack_data['ip']
-            attr_ip.comment = f"Source IP of attack with threat score {attack_data.get('threat_score', 0)}"
-            
-            # Add tags based on threat score
-            if attack_data.get('threat_score', 0) > 0.7:
-                attr_ip.add_tag("tlp:amber")
-                attr_ip.add_tag("honeypot:high-threat")
-            else:
-                attr_ip.add_tag("tlp:white")
-                attr_ip.add_tag("honeypot:low-threat")
-                
-            event.add_attribute(attr_ip)
-            
-            # Add user-agent if available
-            if attack_data.get('user_agent'):
-                attr_ua = MISPAttribute()
-                attr_ua.type = "user-agent"
-                attr_ua.value = attack_data['user_agent']
-                event.add_attribute(attr_ua)
-            
-            # Add HTTP method and path if available
-            if attack_data.get('method') and attack_data.get('path'):
-                attr_http = MISPAttribute()
-                attr_http.type = "http-method"
-                attr_http.value = f"{attack_data['method']} {attack_data['path']}"
-                event.add_attribute(attr_http)
-            
-            # Add attack types
-            for attack_type in attack_data.get('attack_types', []):
-                event.add_tag(f"attack-type:{attack_type}")
-            
-            # In a real implementation, we would submit this to MISP
-            # event_id = self.misp.add_event(event)
+            attributes = self._build_attributes(attack_data)
+            tags = [f"attack-type:{attack_type}" for attack_type in attack_data.get('attack_types', [])]
             
-            # For demo, save to file
-            event_id = self._mock_submit_event(event, attack_data)
+            record, is_new = self.aggregator.add(attack_data, attributes, tags)
+            if is_new:
+                logger.info(f"Opened MISP event {record.event_id} for attack from {attack_data['ip']}")
             
-            # Report to AbuseIPDB if appropriate
-            if attack_data.get('threat_score', 0) > 0.5:
+            # Report to AbuseIPDB once per event if appropriate
+            if attack_data.get('threat_score', 0) > 0.5 and self.aggregator.claim_report(record):
                 self.report_to_abuseipdb(attack_data)
             
-            return event_id
+            return record.event_id
             
         except Exception as e:
             logger.error(f"Error creating MISP event: {e}")
             return None
     
-    def _mock_submit_event(self, event, attack_data):
+    def flush_events(self):
+        """Submit every open event, regardless of its window"""
+        return self.aggregator.flush_all()
+    
+    def _new_event(self, ip):
+        """Create an empty MISP event for an attacker"""
+        event = MISPEvent()
+        event.info = f"Honeypot Attack: {ip}"
+        return event
+    
+    def _threat_tags(self, threat_score):
+        """Tags for the source IP attribute based on threat score"""
+        if threat_score > 0.7:
+            return ["tlp:amber", "honeypot:high-threat"]
+        return ["tlp:white", "honeypot:low-threat"]
+    
+    def _build_attributes(self, attack_data):
+        """Build the MISP attributes describing a single attack"""
+        attributes = []
+        
+        # Add IP as IOC
+        attr_ip = MISPAttribute()
+        attr_ip.type = "ip-dst"
+        attr_ip.value = attack_data['ip']
+        attributes.append(attr_ip)
+        
+        # Add user-agent if available
+        if attack_data.get('user_agent'):
+            attr_ua = MISPAttribute()
+            attr_ua.type = "user-agent"
+            attr_ua.value = attack_data['user_agent']
+            attributes.append(attr_ua)
+        
+        # Add HTTP method and path if available
+        if attack_data.get('method') and attack_data.get('path'):
+            attr_http = MISPAttribute()
+            attr_http.type = "http-method"
+            attr_http.value = f"{attack_data['method']} {attack_data['path']}"
+            attributes.append(attr_http)
+        
+        return attributes
+    
+    def _submit_aggregated_event(self, record):
+        """Finalize an event whose window has closed and submit it"""
+        # Tag and describe the source IP using the highest score seen in the window
+        attr_ip = record.event.get_attribute("ip-dst", record.ip)
+        if attr_ip is not None:
+            attr_ip.comment = f"Source IP of attack with threat score {record.threat_score}"
+            attr_ip.tags = self._threat_tags(record.threat_score)
+        
+        # In a real implementation, we would submit this to MISP
+        # self.misp.add_event(record.event)
+        
+        # For demo, save to file
+        return self._mock_submit_event(record.event, record.summary(), record.event_id)
+    
+    def _mock_submit_event(self, event, attack_data, event_id=None):
         """Mock submission to MISP by saving to a file"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        event_id = f"mock_event_{timestamp}_{attack_data['ip'].replace('.', '_')}"
+        if event_id is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            event_id = f"mock_event_{timestamp}_{attack_data['ip'].replace('.', '_')}"
         
         # Convert event to dict for serialization
         event_dict = event.to_dict()
@@ -141,6 +235,9 @@ class ThreatIntelSender:
             "threat_indicators": attack_data.get('threat_indicators', []),
             "attack_types": attack_data.get('attack_types', [])
         }
+        for key in ('first_seen', 'last_seen', 'sighting_count'):
+            if key in attack_data:
+                event_dict['honeypot_data'][key] = attack_data[key]
         
         # Save to file
         with open(f'threat_intel/misp_event_{event_id}.json', 'w') as f:
@@ -186,7 +283,8 @@ class ThreatIntelSender:
                 comment += f", targeting {attack_data['path']}"
             
             # Submit to AbuseIPDB
-            response = requests.post(
+            response = get_http_client().post(
+                'abuseipdb',
                 'https://api.abuseipdb.com/api/v2/report',
                 headers={
                     'Key': self.abuseipdb_key,
@@ -211,6 +309,10 @@ class ThreatIntelSender:
         """
         Export attack data in STIX format
         
+        The indicator keeps the creation time of its first version, and a
+        new version is only stored (and served over TAXII) when its labels
+        or confidence change.
+        
         Args:
             attack_data: Dictionary containing attack information
             
@@ -220,30 +322,116 @@ class ThreatIntelSender:
         # In a real implementation, use the stix2 library
         # Here we implement a simple mock
         
-        timestamp = datetime.now().isoformat()
+        indicator_id = stix_id("indicator", attack_data['ip'])
+        labels = list(attack_data.get('attack_types') or ["suspicious-activity"])
+        confidence = int(attack_data.get('threat_score', 0.5) * 100)
+        
+        previous = self.indicator_store.get(indicator_id)
+        if previous and previous.get('labels') == labels and previous.get('confidence') == confidence:
+            return previous
+        
+        timestamp = stix_timestamp()
+        created = previous['created'] if previous else stix_timestamp(attack_data.get('first_seen'))
         
         # Create STIX Indicator
         stix_data = {
             "type": "indicator",
-            "id": f"indicator--{attack_data['ip'].replace('.', '-')}",
-            "created": timestamp,
+            "spec_version": "2.1",
+            "id": indicator_id,
+            "created": created,
             "modified": timestamp,
             "name": f"Malicious IP: {attack_data['ip']}",
             "description": f"IP address observed conducting suspicious activities against honeypot",
             "indicator_types": ["malicious-activity"],
             "pattern": f"[ipv4-addr:value = '{attack_data['ip']}']",
             "pattern_type": "stix",
-            "valid_from": timestamp,
-            "labels": attack_data.get('attack_types', ["suspicious-activity"]),
-            "confidence": int(attack_data.get('threat_score', 0.5) * 100),
+            "valid_from": created,
+            "labels": labels,
+            "confidence": confidence,
             "object_marking_refs": [
-                "marking-definition--613f2e26-407d-48c7-9eca-b8e91df99dc9" # TLP:GREEN
+                "marking-definition--34098fce-860f-48ae-8e50-ebd3cc5e41da" # TLP:GREEN
             ]
         }
         
+        # Index for TAXII consumers
+        self.indicator_store.add(stix_data)
+        
         # Save to file
         with open(f'threat_intel/stix_{attack_data["ip"].replace(".", "_")}.json', 'w') as f:
             json.dump(stix_data, f, indent=2)
             
         logger.info(f"Saved STIX data for {attack_data['ip']}")
-        return stix_data 
\ No newline at end of file
+        return stix_data
+    
+    def queue_stix(self, attack_data):
+        """
+        Queue an attacker's indicator for export by the background thread
+        
+        Only the latest attack data per IP is kept, so an attacker sending
+        many requests between exports costs one export.
+        
+        Args:
+            attack_data: Dictionary containing attack information
+        """
+        with self.indicator_lock:
+            self.pending_indicators[attack_data['ip']] = attack_data
+    
+    def flush_indicators(self):
+        """Export every queued indicator"""
+        with self.indicator_lock:
+            pending = list(self.pending_indicators.values())
+            self.pending_indicators.clear()
+        
+        for attack_data in pending:
+            try:
+                self.export_stix(attack_data)
+            except Exception as e:
+                logger.error(f"Error exporting STIX indicator for {attack_data['ip']}: {e}")
+        return len(pending)
+    
+    def _export_indicators(self):
+        while True:
+            time.sleep(self.indicator_interval)
+            self.flush_indicators()
+    
+    def export_stix_bundle(self, attackers, incremental=True):
+        """
+        Export all attackers as a single compressed STIX 2.1 bundle
+        
+        Args:
+            attackers: Dictionary of attacker profiles (e.g. AttackDetector.attackers)
+            incremental: Only export attackers seen since the previous bundle
+            
+        Returns:
+            result: Dictionary with the bundle path and object counts
+        """
+        return self.stix_exporter.export(
+            attackers,
+            incremental=incremental,
+            on_indicator=self.indicator_store.add
+        )
+    
+    def schedule_stix_bundles(self, attackers, interval=None):
+        """
+        Export an incremental STIX bundle every interval seconds in a background thread
+        
+        Args:
+            attackers: Dictionary of attacker profiles (e.g. AttackDetector.attackers)
+            interval: Seconds between bundles (defaults to STIX_BUNDLE_INTERVAL, one day)
+        """
+        if self.bundle_thread is None:
+            self.bundle_thread = threading.Thread(
+                target=self._export_bundles,
+                args=(attackers, interval or self.bundle_interval),
+                name='stix-bundles',
+                daemon=True
+            )
+            self.bundle_thread.start()
+    
+    def _export_bundles(self, attackers, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.export_stix_bundle(attackers)
+            except Exception as e:
+                logger.error(f"Error exporting STIX bundle: {e}")
@@ -0,0 +1,278 @@
+import os
+import re
+import glob
+import heapq
+import time
+import socket
+import logging
+import argparse
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEX_MAGIC = b'SHREP\x01\x00\x00'
+HEADER_SIZE = 16
+BUCKET_BITS = 16
+BUCKET_COUNT = 1 << BUCKET_BITS
+
+# "1.2.3.4", "1.2.3.0/24" or "1.2.3.4-1.2.3.9", optionally followed by a score
+FEED_LINE = re.compile(
+    r'^\s*(?P<start>\d{1,3}(?:\.\d{1,3}){3})'
+    r'(?:\s*(?:/(?P<prefix>\d{1,2})|-\s*(?P<end>\d{1,3}(?:\.\d{1,3}){3})))?'
+    r'(?:[\s,;]+(?P<score>\d*\.?\d+))?'
+)
+
+def ip_to_int(ip):
+    """Convert a dotted IPv4 address to an integer, or None if it is not IPv4"""
+    try:
+        return int.from_bytes(socket.inet_aton(ip), 'big') if ip.count('.') == 3 else None
+    except (OSError, AttributeError):
+        return None
+
+class ReputationIngestor:
+    """
+    Builds a compact IP reputation index from local blocklist files
+
+    Each feed line holds an address, CIDR block or address range, optionally
+    followed by a score in [0, 1]. Overlapping entries keep the highest score.
+    """
+    def __init__(self, feeds_dir='threat_intel/feeds', default_score=0.5):
+        self.feeds_dir = feeds_dir
+        self.default_score = default_score
+
+    def parse_feed(self, path):
+        """Yield (start, end, score) ranges from a feed file"""
+        skipped = 0
+        with open(path, 'r', errors='ignore') as f:
+            for line in f:
+                line = line.split('#', 1)[0]
+                if not line.strip():
+                    continue
+
+                match = FEED_LINE.match(line)
+                start = ip_to_int(match.group('start')) if match else None
+                if start is None:
+                    skipped += 1
+                    continue
+
+                if match.group('prefix') is not None:
+                    prefix = int(match.group('prefix'))
+                    if prefix > 32:
+                        skipped += 1
+                        continue
+                    host_bits = 32 - prefix
+                    start = (start >> host_bits) << host_bits
+                    end = start + (1 << host_bits) - 1
+                elif match.group('end') is not None:
+                    end = ip_to_int(match.group('end'))
+                    if end is None or end < start:
+                        skipped += 1
+                        continue
+                else:
+                    end = start
+
+                score = float(match.group('score')) if match.group('score') else self.default_score
+                yield start, end, min(max(score, 0.0), 1.0)
+
+        if skipped:
+            logger.warning(f"Skipped {skipped} unparseable or non-IPv4 lines in {path}")
+
+    def build(self, output_path='threat_intel/reputation.idx'):
+        """
+        Ingest every feed in the feeds directory and write the index file
+
+        Returns:
+            range_count: Number of ranges in the written index
+        """
+        ranges = []
+        for path in sorted(glob.glob(os.path.join(self.feeds_dir, '*'))):
+            if os.path.isfile(path):
+                before = len(ranges)
+                ranges.extend(self.parse_feed(path))
+                logger.info(f"Loaded {len(ranges) - before} entries from {path}")
+
+        starts, ends, scores = self._flatten(ranges)
+        self._write(output_path, starts, ends, scores)
+
+        logger.info(f"Wrote reputation index with {len(starts)} ranges to {output_path}")
+        return len(starts)
+
+    def _flatten(self, ranges):
+        """
+        Turn overlapping scored ranges into sorted, disjoint ranges
+
+        Ranges are also split at bucket boundaries so every range belongs to
+        exactly one bucket of the lookup directory.
+        """
+        ranges.sort()
+        starts, ends, scores = [], [], []
+
+        def emit(start, end, score):
+            # Extend the previous range when contiguous with the same score
+            if starts and ends[-1] + 1 == start and scores[-1] == score and \
+                    (starts[-1] >> BUCKET_BITS) == (end >> BUCKET_BITS):
+                ends[-1] = end
+                return
+            while (start >> BUCKET_BITS) != (end >> BUCKET_BITS):
+                bucket_end = ((start >> BUCKET_BITS) + 1 << BUCKET_BITS) - 1
+                starts.append(start)
+                ends.append(bucket_end)
+                scores.append(score)
+                start = bucket_end + 1
+            starts.append(start)
+            ends.append(end)
+            scores.append(score)
+
+        # Sweep over range boundaries, keeping the active ranges in a max-heap
+        active = []
+        i = 0
+        position = ranges[0][0] if ranges else 0
+        while i < len(ranges) or active:
+            if not active:
+                position = max(position, ranges[i][0])
+            while i < len(ranges) and ranges[i][0] <= position:
+                heapq.heappush(active, (-ranges[i][2], ranges[i][1]))
+                i += 1
+            while active and active[0][1] < position:
+                heapq.heappop(active)
+            if not active:
+                continue
+
+            score = -active[0][0]
+            # The current segment ends where the best range ends or the next range starts
+            segment_end = active[0][1]
+            if i < len(ranges):
+                segment_end = min(segment_end, ranges[i][0] - 1)
+            emit(position, segment_end, score)
+            position = segment_end + 1
+
+        return starts, ends, scores
+
+    def _write(self, output_path, starts, ends, scores):
+        """Write the index atomically in the memory-mappable format"""
+        starts = np.asarray(starts, dtype=np.uint32)
+        ends = np.asarray(ends, dtype=np.uint32)
+        scores = np.asarray(scores, dtype=np.float32)
+
+        buckets = np.searchsorted(
+            starts >> BUCKET_BITS,
+            np.arange(BUCKET_COUNT + 1, dtype=np.uint32),
+            side='left'
+        ).astype(np.uint32)
+
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(np.uint64(len(starts)).tobytes())
+            f.write(buckets.tobytes())
+            f.write(starts.tobytes())
+            f.write(ends.tobytes())
+            f.write(scores.tobytes())
+        os.replace(tmp_path, output_path)
+
+class ReputationIndex:
+    """
+    Memory-mapped IP reputation lookup
+
+    A directory of 2^16 bucket offsets narrows every lookup to the ranges
+    sharing the address's /16, so a lookup is one bucket read plus a search
+    over a handful of ranges regardless of index size.
+
+    Lookups check the file's mtime at most every check_interval seconds and
+    remap it once the ingestion job has replaced it, so a rebuilt index is
+    picked up without a restart.
+    """
+    def __init__(self, path='threat_intel/reputation.idx', check_interval=60):
+        self.path = path
+        self.check_interval = check_interval
+        self.checked = time.monotonic()
+        self.mtime = None
+        self.count = 0
+        # (buckets, starts, ends, scores), swapped as one so a lookup racing
+        # a reload never mixes two indexes
+        self.table = None
+        self.load()
+
+    def load(self):
+        """Map the index file, leaving the index empty if it does not exist"""
+        if not os.path.exists(self.path):
+            logger.info(f"No reputation index at {self.path}, reputation scoring disabled")
+            return False
+
+        try:
+            with open(self.path, 'rb') as f:
+                header = f.read(HEADER_SIZE)
+            if header[:8] != INDEX_MAGIC:
+                raise ValueError("bad magic")
+            count = int(np.frombuffer(header[8:16], dtype=np.uint64)[0])
+
+            data = np.memmap(self.path, dtype=np.uint8, mode='r')
+            offset = HEADER_SIZE
+            buckets = data[offset:offset + (BUCKET_COUNT + 1) * 4].view(np.uint32)
+            offset += (BUCKET_COUNT + 1) * 4
+            starts = data[offset:offset + count * 4].view(np.uint32)
+            offset += count * 4
+            ends = data[offset:offset + count * 4].view(np.uint32)
+            offset += count * 4
+            scores = data[offset:offset + count * 4].view(np.float32)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading reputation index {self.path}: {e}")
+            return False
+
+        self.table = (buckets, starts, ends, scores)
+        self.count = count
+        self.mtime = os.path.getmtime(self.path)
+        logger.info(f"Mapped reputation index with {count} ranges from {self.path}")
+        return True
+
+    def reload_if_changed(self):
+        """Remap the index if the ingestion job has replaced the file"""
+        try:
+            if os.path.getmtime(self.path) != self.mtime:
+                return self.load()
+        except OSError:
+            pass
+        return False
+
+    def lookup(self, ip):
+        """
+        Get the reputation score for an IP
+
+        Returns:
+            score: Highest blocklist score covering the IP, 0.0 if not listed
+        """
+        now = time.monotonic()
+        if now - self.checked >= self.check_interval:
+            self.checked = now
+            self.reload_if_changed()
+
+        table = self.table
+        if table is None:
+            return 0.0
+        buckets, starts, ends, scores = table
+
+        value = ip_to_int(ip)
+        if value is None:
+            return 0.0
+
+        bucket = value >> BUCKET_BITS
+        lo, hi = int(buckets[bucket]), int(buckets[bucket + 1])
+        if lo == hi:
+            return 0.0
+
+        i = lo + int(np.searchsorted(starts[lo:hi], value, side='right')) - 1
+        if i >= lo and value <= ends[i]:
+            return round(float(scores[i]), 4)
+        return 0.0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the IP reputation index from local blocklists")
+    parser.add_argument('--feeds', default='threat_intel/feeds', help="Directory of blocklist files")
+    parser.add_argument('--output', default='threat_intel/reputation.idx', help="Index file to write")
+    parser.add_argument('--default-score', type=float, default=0.5, help="Score for entries without one")
+    args = parser.parse_args()
+
+    ReputationIngestor(args.feeds, args.default_score).build(args.output)
@@ -0,0 +1,245 @@
+import os
+import gzip
+import json
+import uuid
+import logging
+import argparse
+from datetime import datetime
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Namespace for deterministic STIX identifiers, so the same IP or attack type
+# always maps to the same object id across exports
+STIX_NAMESPACE = uuid.UUID("7c5f7a7e-3c1b-4a8e-9d43-5b3e7f6a2c10")
+
+TLP_GREEN = "marking-definition--34098fce-860f-48ae-8e50-ebd3cc5e41da"
+
+def stix_id(object_type, key):
+    """Deterministic STIX identifier for an object type and natural key"""
+    return f"{object_type}--{uuid.uuid5(STIX_NAMESPACE, f'{object_type}|{key}')}"
+
+def stix_timestamp(value=None):
+    """Convert an ISO timestamp (UTC, no offset) to STIX RFC 3339 format"""
+    try:
+        timestamp = datetime.fromisoformat(value) if value else datetime.utcnow()
+    except (ValueError, TypeError):
+        timestamp = datetime.utcnow()
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%S.") + f"{timestamp.microsecond // 1000:03d}Z"
+
+class StixBundleExporter:
+    """
+    Streams attacker state into a gzip-compressed STIX 2.1 bundle
+
+    Objects are serialized one at a time straight into the compressed file, so
+    memory use does not grow with the number of attackers. Incremental exports
+    only include attackers seen since the previous run.
+    """
+    def __init__(self, output_dir='threat_intel/bundles', identity_name="SwiftHost Honeypot"):
+        self.output_dir = output_dir
+        self.state_file = os.path.join(output_dir, 'export_state.json')
+        self.identity = {
+            "type": "identity",
+            "spec_version": "2.1",
+            "id": stix_id("identity", identity_name),
+            "created": "2023-01-01T00:00:00.000Z",
+            "modified": "2023-01-01T00:00:00.000Z",
+            "name": identity_name,
+            "identity_class": "system"
+        }
+        os.makedirs(output_dir, exist_ok=True)
+
+    def export(self, attackers, incremental=True, on_indicator=None):
+        """
+        Export attackers as a STIX bundle
+
+        Args:
+            attackers: Dictionary of attacker profiles (e.g. AttackDetector.attackers)
+            incremental: Only export attackers seen since the last export
+            on_indicator: Optional callback invoked with every indicator written
+
+        Returns:
+            result: Dictionary with the bundle path and object counts
+        """
+        export_started = datetime.utcnow().isoformat()
+        since = self._load_state().get('last_export') if incremental else None
+
+        suffix = "_delta" if since else ""
+        filename = (
+            f"stix_bundle_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}{suffix}.json.gz"
+        )
+        path = os.path.join(self.output_dir, filename)
+        tmp_path = f"{path}.tmp"
+
+        counts = {"attackers": 0, "objects": 0}
+        attack_patterns = set()
+
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                f.write(f'{{"type": "bundle", "id": "bundle--{uuid.uuid4()}", "objects": [')
+                first = True
+
+                def write(obj):
+                    nonlocal first
+                    f.write(('' if first else ',') + '\n' + json.dumps(obj, separators=(',', ':')))
+                    first = False
+                    counts["objects"] += 1
+
+                write(self.identity)
+
+                # Snapshot the keys only: the live dict may grow while we stream
+                for ip in list(attackers.keys()):
+                    profile = attackers.get(ip)
+                    if not profile:
+                        continue
+                    if since and profile.get('last_seen', '') <= since:
+                        continue
+
+                    for obj in self._attacker_objects(ip, profile):
+                        if obj["type"] == "relationship":
+                            attack_type = obj.pop("_attack_type")
+                            if attack_type not in attack_patterns:
+                                attack_patterns.add(attack_type)
+                                write(self._attack_pattern(attack_type))
+                        write(obj)
+                        if obj["type"] == "indicator" and on_indicator:
+                            on_indicator(obj)
+
+                    counts["attackers"] += 1
+
+                f.write('\n]}\n')
+
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Never leave a partial bundle behind
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self._save_state({'last_export': export_started, 'last_bundle': path})
+
+        logger.info(
+            f"Exported {counts['attackers']} attackers ({counts['objects']} STIX objects) to {path}"
+        )
+        return {"path": path, "incremental": bool(since), "since": since, **counts}
+
+    def _attacker_objects(self, ip, profile):
+        """Yield the STIX objects describing a single attacker"""
+        first_seen = stix_timestamp(profile.get('first_seen'))
+        last_seen = stix_timestamp(profile.get('last_seen'))
+        attack_types = sorted(profile.get('attack_types', []))
+        threat_score = profile.get('threat_score', 0.5)
+        count = max(int(profile.get('count', 1)), 1)
+
+        address_type = "ipv6-addr" if ':' in ip else "ipv4-addr"
+        address_id = stix_id(address_type, ip)
+        indicator_id = stix_id("indicator", ip)
+        observed_id = stix_id("observed-data", f"{ip}|{first_seen}")
+
+        yield {
+            "type": address_type,
+            "spec_version": "2.1",
+            "id": address_id,
+            "value": ip
+        }
+
+        yield {
+            "type": "indicator",
+            "spec_version": "2.1",
+            "id": indicator_id,
+            "created_by_ref": self.identity["id"],
+            "created": first_seen,
+            "modified": last_seen,
+            "name": f"Malicious IP: {ip}",
+            "description": "IP address observed conducting suspicious activities against honeypot",
+            "indicator_types": ["malicious-activity"],
+            "pattern": f"[{address_type}:value = '{ip}']",
+            "pattern_type": "stix",
+            "valid_from": first_seen,
+            "labels": attack_types or ["suspicious-activity"],
+            "confidence": int(threat_score * 100),
+            "object_marking_refs": [TLP_GREEN]
+        }
+
+        yield {
+            "type": "observed-data",
+            "spec_version": "2.1",
+            "id": observed_id,
+            "created_by_ref": self.identity["id"],
+            "created": first_seen,
+            "modified": last_seen,
+            "first_observed": first_seen,
+            "last_observed": last_seen,
+            "number_observed": count,
+            "object_refs": [address_id]
+        }
+
+        yield {
+            "type": "sighting",
+            "spec_version": "2.1",
+            "id": stix_id("sighting", f"{ip}|{first_seen}"),
+            "created_by_ref": self.identity["id"],
+            "created": first_seen,
+            "modified": last_seen,
+            "first_seen": first_seen,
+            "last_seen": last_seen,
+            "count": count,
+            "sighting_of_ref": indicator_id,
+            "observed_data_refs": [observed_id],
+            "where_sighted_refs": [self.identity["id"]]
+        }
+
+        for attack_type in attack_types:
+            yield {
+                "type": "relationship",
+                "spec_version": "2.1",
+                "id": stix_id("relationship", f"{ip}|indicates|{attack_type}"),
+                "created": first_seen,
+                "modified": last_seen,
+                "relationship_type": "indicates",
+                "source_ref": indicator_id,
+                "target_ref": stix_id("attack-pattern", attack_type),
+                "_attack_type": attack_type
+            }
+
+    def _attack_pattern(self, attack_type):
+        """Build the attack-pattern object for an attack type"""
+        return {
+            "type": "attack-pattern",
+            "spec_version": "2.1",
+            "id": stix_id("attack-pattern", attack_type),
+            "created_by_ref": self.identity["id"],
+            "created": "2023-01-01T00:00:00.000Z",
+            "modified": "2023-01-01T00:00:00.000Z",
+            "name": attack_type
+        }
+
+    def _load_state(self):
+        """Load the incremental export state"""
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state):
+        """Persist the incremental export state"""
+        with open(self.state_file, 'w') as f:
+            json.dump(state, f, indent=2)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export attacker profiles as a STIX 2.1 bundle")
+    parser.add_argument('--input', default='analytics/attacker_profiles.json',
+                        help="Attacker profiles saved by AttackDetector")
+    parser.add_argument('--output-dir', default='threat_intel/bundles', help="Directory the bundle is written to")
+    parser.add_argument('--full', action='store_true', help="Export every attacker, not only those seen since the last bundle")
+    args = parser.parse_args()
+
+    with open(args.input, 'r') as f:
+        attackers = json.load(f)
+
+    result = StixBundleExporter(output_dir=args.output_dir).export(attackers, incremental=not args.full)
+    print(json.dumps(result, indent=2))
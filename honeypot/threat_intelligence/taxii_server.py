@@ -0,0 +1,189 @@
+import gzip
+import json
+import hashlib
+import logging
+from flask import Blueprint, request, Response, url_for
+
+from threat_intelligence.indicator_store import parse_date_added
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TAXII_MEDIA_TYPE = "application/taxii+json;version=2.1"
+STIX_MEDIA_TYPE = "application/stix+json;version=2.1"
+
+INDICATORS_COLLECTION = {
+    "id": "5a8c1f3e-2d4b-4f6a-9e7c-3b1d0a9f8e21",
+    "title": "Honeypot Indicators",
+    "description": "Indicators generated from attacks observed by the honeypot",
+    "can_read": True,
+    "can_write": False,
+    "media_types": [STIX_MEDIA_TYPE]
+}
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+GZIP_MIN_SIZE = 1024
+
+def create_taxii_blueprint(store):
+    """
+    Create a read-only TAXII 2.1 style blueprint serving an IndicatorStore
+
+    Args:
+        store: IndicatorStore backing the indicators collection
+
+    Returns:
+        taxii_bp: Flask Blueprint to register (e.g. under /taxii2)
+    """
+    taxii_bp = Blueprint('taxii', __name__)
+
+    def taxii_response(payload, status=200, headers=None, etag=None):
+        """Build a TAXII response with ETag revalidation and optional gzip"""
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+
+        etag = etag or hashlib.sha1(body).hexdigest()
+        etag = f'"{etag}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            return Response(status=304, headers={'ETag': etag})
+
+        response_headers = {
+            'Content-Type': TAXII_MEDIA_TYPE,
+            'ETag': etag,
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding'
+        }
+        response_headers.update(headers or {})
+
+        if len(body) >= GZIP_MIN_SIZE and 'gzip' in request.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            response_headers['Content-Encoding'] = 'gzip'
+
+        return Response(body, status=status, headers=response_headers)
+
+    def taxii_error(status, title, description):
+        return taxii_response({"title": title, "description": description}, status=status)
+
+    def read_page_args():
+        """Parse added_after/limit/next query parameters"""
+        added_after = request.args.get('added_after')
+        added_after = parse_date_added(added_after) if added_after else None
+
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        start = request.args.get('next')
+        start = int(start) if start is not None else None
+        if start is not None and start < 0:
+            raise ValueError("next must not be negative")
+
+        return added_after, limit, start
+
+    def page_etag(added_after, limit, start, page):
+        """A page only changes when objects are appended after it"""
+        key = f"{added_after}|{limit}|{start}|{page['date_added_last']}|{page['more']}"
+        if not page['more']:
+            key += f"|{page['total']}"
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def page_headers(page):
+        headers = {}
+        if page['date_added_first']:
+            headers['X-TAXII-Date-Added-First'] = page['date_added_first']
+            headers['X-TAXII-Date-Added-Last'] = page['date_added_last']
+        return headers
+
+    def envelope_prefix(page):
+        prefix = {"more": page['more']}
+        if page['next'] is not None:
+            prefix["next"] = str(page['next'])
+        return json.dumps(prefix)[:-1].encode('utf-8')
+
+    @taxii_bp.route('/', methods=['GET'])
+    def discovery():
+        """TAXII server discovery"""
+        api_root = url_for('.api_root', _external=True)
+        return taxii_response({
+            "title": "Honeypot Threat Intelligence",
+            "description": "Read-only TAXII feed of honeypot indicators",
+            "default": api_root,
+            "api_roots": [api_root]
+        })
+
+    @taxii_bp.route('/api/', methods=['GET'])
+    def api_root():
+        """API root information"""
+        return taxii_response({
+            "title": "Honeypot Indicators API Root",
+            "versions": [TAXII_MEDIA_TYPE],
+            "max_content_length": 0
+        })
+
+    @taxii_bp.route('/api/collections/', methods=['GET'])
+    def collections():
+        """List available collections"""
+        return taxii_response({"collections": [INDICATORS_COLLECTION]})
+
+    @taxii_bp.route('/api/collections/<collection_id>/', methods=['GET'])
+    def collection(collection_id):
+        """Get a single collection"""
+        if collection_id != INDICATORS_COLLECTION['id']:
+            return taxii_error(404, "Collection not found", f"No collection with id {collection_id}")
+        return taxii_response(INDICATORS_COLLECTION)
+
+    @taxii_bp.route('/api/collections/<collection_id>/objects/', methods=['GET'])
+    def collection_objects(collection_id):
+        """Get a page of objects from the collection"""
+        if collection_id != INDICATORS_COLLECTION['id']:
+            return taxii_error(404, "Collection not found", f"No collection with id {collection_id}")
+
+        try:
+            added_after, limit, start = read_page_args()
+        except ValueError as e:
+            return taxii_error(400, "Invalid query parameter", str(e))
+
+        page = store.query(added_after=added_after, limit=limit, start=start)
+
+        # Objects are spliced in as stored, without re-serializing them
+        body = envelope_prefix(page) + b', "objects": [' + b','.join(page['objects']) + b']}'
+
+        return taxii_response(
+            body,
+            headers=page_headers(page),
+            etag=page_etag(added_after, limit, start, page)
+        )
+
+    @taxii_bp.route('/api/collections/<collection_id>/manifest/', methods=['GET'])
+    def collection_manifest(collection_id):
+        """Get manifest entries for a page of objects"""
+        if collection_id != INDICATORS_COLLECTION['id']:
+            return taxii_error(404, "Collection not found", f"No collection with id {collection_id}")
+
+        try:
+            added_after, limit, start = read_page_args()
+        except ValueError as e:
+            return taxii_error(400, "Invalid query parameter", str(e))
+
+        page = store.query(added_after=added_after, limit=limit, start=start)
+
+        entries = []
+        for raw, date_added in zip(page['objects'], page['date_added']):
+            obj = json.loads(raw)
+            entries.append({
+                "id": obj['id'],
+                "date_added": date_added,
+                "version": obj.get('modified', obj.get('created', '')),
+                "media_type": STIX_MEDIA_TYPE
+            })
+
+        payload = {"more": page['more'], "objects": entries}
+        if page['next'] is not None:
+            payload["next"] = str(page['next'])
+
+        return taxii_response(
+            payload,
+            headers=page_headers(page),
+            etag=page_etag(added_after, limit, start, page)
+        )
+
+    return taxii_bp
@@ -1,9 +1,10 @@
 import os
 import json
-import requests
 import logging
 from datetime import datetime, timedelta
 
+from utils.http_client import get_http_client
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -73,7 +74,8 @@ class IPGeolocation:
             
             # Use the ipstack API if we have a key
             if self.api_key != 'demo_key':
-                response = requests.get(
+                response = get_http_client().get(
+                    'ipstack',
                     f"http://api.ipstack.com/{ip}",
                     params={"access_key": self.api_key}
                 )
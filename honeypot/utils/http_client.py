@@ -0,0 +1,251 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-provider policy for outbound integrations. Timeouts are (connect, read)
+# in seconds; retries only apply to idempotent methods.
+PROVIDER_DEFAULTS = {
+    "default": {
+        "connect_timeout": 3.0,
+        "read_timeout": 10.0,
+        "retries": 1,
+        "max_concurrency": 10,
+        "failure_threshold": 5,
+        "reset_timeout": 60
+    },
+    "ipstack": {
+        "connect_timeout": 2.0,
+        "read_timeout": 4.0,
+        "retries": 2,
+        "max_concurrency": 8,
+        "failure_threshold": 5,
+        "reset_timeout": 60
+    },
+    "abuseipdb": {
+        "connect_timeout": 3.0,
+        "read_timeout": 8.0,
+        "retries": 0,
+        "max_concurrency": 4,
+        "failure_threshold": 3,
+        "reset_timeout": 300
+    }
+}
+
+class CircuitOpenError(requests.RequestException):
+    """Raised when a provider's circuit breaker is open"""
+
+class ConcurrencyLimitError(requests.RequestException):
+    """Raised when a provider already has too many requests in flight"""
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets a single probe through after a cool-down"""
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self):
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+            self.probing = False
+
+class ProviderMetrics:
+    """Request counts and latency statistics for one provider"""
+    def __init__(self, window=512):
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.recent = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record(self, latency, error=False):
+        with self.lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            self.recent.append(latency)
+
+    def record_rejected(self):
+        with self.lock:
+            self.rejected += 1
+
+    def snapshot(self):
+        with self.lock:
+            recent = sorted(self.recent)
+            requests_made = self.requests
+            snapshot = {
+                "requests": requests_made,
+                "errors": self.errors,
+                "rejected": self.rejected,
+                "avg_latency_ms": (self.total_latency / requests_made * 1000) if requests_made else 0.0,
+                "max_latency_ms": self.max_latency * 1000
+            }
+        for name, quantile in (("p50_latency_ms", 0.5), ("p95_latency_ms", 0.95)):
+            snapshot[name] = recent[min(int(len(recent) * quantile), len(recent) - 1)] * 1000 if recent else 0.0
+        return snapshot
+
+class Provider:
+    """Session, limits and health state for one outbound integration"""
+    def __init__(self, name, config):
+        self.name = name
+        self.timeout = (config["connect_timeout"], config["read_timeout"])
+        self.max_concurrency = config["max_concurrency"]
+        self.semaphore = threading.BoundedSemaphore(config["max_concurrency"])
+        self.breaker = CircuitBreaker(config["failure_threshold"], config["reset_timeout"])
+        self.metrics = ProviderMetrics()
+
+        # Keep-alive pool sized to the concurrency limit
+        retry = Retry(
+            total=config["retries"],
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=config["max_concurrency"],
+            max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+class OutboundHTTPClient:
+    """
+    Shared client for every outbound integration in the honeypot
+
+    Each provider gets its own pooled keep-alive session, default timeouts,
+    retry policy for idempotent requests, circuit breaker, concurrency limit
+    and latency metrics.
+    """
+    def __init__(self, provider_config=None, acquire_timeout=None):
+        self.provider_config = {name: dict(config) for name, config in PROVIDER_DEFAULTS.items()}
+        for name, config in (provider_config or {}).items():
+            self.provider_config.setdefault(name, dict(PROVIDER_DEFAULTS["default"])).update(config)
+
+        # How long a caller waits for a free concurrency slot before giving up
+        self.acquire_timeout = acquire_timeout or float(os.getenv('HTTP_CLIENT_ACQUIRE_TIMEOUT', '2'))
+        self.providers = {}
+        self.lock = threading.Lock()
+
+    def _provider(self, name):
+        provider = self.providers.get(name)
+        if provider is None:
+            with self.lock:
+                provider = self.providers.get(name)
+                if provider is None:
+                    config = self.provider_config.get(name, self.provider_config["default"])
+                    provider = Provider(name, config)
+                    self.providers[name] = provider
+        return provider
+
+    def request(self, provider_name, method, url, **kwargs):
+        """
+        Send a request on behalf of a provider
+
+        Raises:
+            CircuitOpenError: The provider is failing and is being skipped
+            ConcurrencyLimitError: No concurrency slot freed up in time
+            requests.RequestException: The request itself failed
+        """
+        provider = self._provider(provider_name)
+
+        if not provider.semaphore.acquire(timeout=self.acquire_timeout):
+            provider.metrics.record_rejected()
+            raise ConcurrencyLimitError(f"Too many concurrent requests to provider {provider_name}")
+
+        if not provider.breaker.allow_request():
+            provider.semaphore.release()
+            provider.metrics.record_rejected()
+            raise CircuitOpenError(f"Circuit open for provider {provider_name}")
+
+        kwargs.setdefault("timeout", provider.timeout)
+        start = time.perf_counter()
+        try:
+            response = provider.session.request(method, url, **kwargs)
+        except Exception:
+            provider.metrics.record(time.perf_counter() - start, error=True)
+            provider.breaker.record_failure()
+            raise
+        finally:
+            provider.semaphore.release()
+
+        failed = response.status_code >= 500
+        provider.metrics.record(time.perf_counter() - start, error=failed)
+        if failed:
+            provider.breaker.record_failure()
+        else:
+            provider.breaker.record_success()
+        return response
+
+    def get(self, provider_name, url, **kwargs):
+        return self.request(provider_name, "GET", url, **kwargs)
+
+    def post(self, provider_name, url, **kwargs):
+        return self.request(provider_name, "POST", url, **kwargs)
+
+    def get_metrics(self):
+        """Latency, error and circuit state per provider"""
+        return {
+            name: {
+                **provider.metrics.snapshot(),
+                "circuit": provider.breaker.state,
+                "max_concurrency": provider.max_concurrency,
+                "timeout": provider.timeout
+            }
+            for name, provider in list(self.providers.items())
+        }
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_http_client():
+    """Get the process-wide outbound HTTP client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OutboundHTTPClient()
+    return _client